@@ -1,17 +1,34 @@
 # app.py
 import streamlit as st
-from src.rag_engine import MarathiRAG
+from src.startup import start_engine
 
 # Page Config
 st.set_page_config(page_title="SCERT Marathi Sahayak", layout="centered")
 st.title("🇮🇳 SCERT Website Assistant")
 
-# Initialize RAG Engine (Cached so it doesn't reload on every click)
+# Initialize RAG Engine in the background (Cached so it only starts once).
+# The page renders right away; see src/startup.py for phases and readiness.
 @st.cache_resource
-def get_engine():
-    return MarathiRAG()
+def get_loader():
+    return start_engine()
 
-engine = get_engine()
+loader = get_loader()
+
+with st.sidebar:
+    status = loader.status()
+    if loader.ready:
+        st.caption(f"✅ Ready (startup {status['total_s']:.1f}s)")
+    elif status["state"] == "failed":
+        st.error(f"Engine failed to start: {status['error']}")
+    else:
+        st.info(f"⏳ मॉडेल लोड होत आहे... (Loading: {status['phase'] or 'starting'})")
+    with st.expander("Startup phases"):
+        st.json(status)
+    show_timing = st.checkbox("Show timing breakdown", value=False)
+    if show_timing and loader.ready:
+        # Rolling p50 / p95 over the recent requests of this process
+        st.caption("⏱️ Latency (recent requests, ms)")
+        st.table(loader.engine.tracer.summary())
 
 # Initialize Chat History
 if "messages" not in st.session_state:
@@ -33,21 +50,42 @@ if prompt := st.chat_input("तुमचा प्रश्न येथे व
     st.chat_message("user").markdown(prompt)
     st.session_state.messages.append({"role": "user", "content": prompt})
 
-    # 2. Generate Answer
+    # Questions asked during startup wait for the engine (only the remaining load time)
+    if not loader.ready:
+        with st.spinner("⏳ मॉडेल लोड होत आहे... (Loading the model)"):
+            try:
+                loader.wait()
+            except RuntimeError as e:
+                st.error(str(e))
+                st.stop()
+    engine = loader.engine
+
+    # 2. Generate Answer (streamed token-by-token)
     with st.chat_message("assistant"):
-        with st.spinner("शोधत आहे... (Searching...)"):
-            # Note: Ensure you are passing 'chat_history' if your engine expects it
-            response_text, sources = engine.generate_answer(
-                prompt
-            )
-            
-            st.markdown(response_text)
-            
-            # --- COLLAPSIBLE SOURCES ---
-            if sources:
-                with st.expander("🔗 संदर्भ पहा (View Sources)"):
-                    for url in sources:
-                        st.markdown(f"- [{url}]({url})")
+        sources = []
+
+        def answer_stream():
+            for kind, value in engine.stream_answer(prompt):
+                if kind == "sources":
+                    sources.extend(value)
+                else:
+                    yield value
+
+        response_text = st.write_stream(answer_stream())
+
+        # --- COLLAPSIBLE SOURCES ---
+        if sources:
+            with st.expander("🔗 संदर्भ पहा (View Sources)"):
+                for url in sources:
+                    st.markdown(f"- [{url}]({url})")
+
+        # --- TIMING BREAKDOWN (debug) ---
+        # Kept per session: the engine (and its tracer) is shared by all of them
+        st.session_state.last_trace = engine.tracer.last()
+        trace = st.session_state.last_trace
+        if show_timing and trace:
+            with st.expander(f"⏱️ {trace['spans_ms']['total']:.0f} ms"):
+                st.json(trace)
 
     # 3. Save Assistant Message
     st.session_state.messages.append({
@@ -0,0 +1,229 @@
+# src/batch_answer.py
+"""
+Offline batch answering: precompute answers for a file of FAQ questions.
+
+    questions --> batched encode + query_batch_points (MarathiRAG.prepare_batch)
+              --> Gemini calls on a bounded pool (rate limited, retried)
+              --> one JSON line per answer, written as soon as it's ready
+
+Input is JSONL ({"question": ..., "id": optional}) or CSV (a "question"
+column, optional "id"; otherwise the first column). Questions without an id
+are keyed by a hash of their text.
+
+The output is JSON lines: id, question, answer, sources, timings, attempts.
+It doubles as the checkpoint: re-running the same command skips every
+question that already has an answer, so an interrupted run (Ctrl+C, quota
+errors) resumes where it stopped. Questions that failed after all retries
+are written with an "error" and tried again on the next run.
+Run from the project root:
+
+    python -m src.batch_answer faq.csv --out faq_answers.jsonl
+    python -m src.batch_answer faq.jsonl --concurrency 4 --rpm 15
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tqdm import tqdm
+from src.rag_engine import NOT_FOUND_ANSWER, MarathiRAG
+
+# --- CONFIGURATION ---
+BATCH_SIZE = 64            # Questions per batched encode / search
+LLM_CONCURRENCY = 4        # Gemini calls in flight
+REQUESTS_PER_MINUTE = 60   # Gemini quota (0 = no limit)
+MAX_RETRIES = 4
+RETRY_BASE_SECONDS = 2.0   # Backoff: 2s, 4s, 8s, ... (+ jitter)
+
+
+def question_id(text):
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def read_questions(path):
+    """[{"id", "question"}] from a JSONL or CSV file (duplicates dropped)."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            column = "question" if "question" in reader.fieldnames else reader.fieldnames[0]
+            rows = [{"id": row.get("id"), "question": row[column]} for row in reader]
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    questions, seen = [], set()
+    for row in rows:
+        text = (row.get("question") or row.get("query") or "").strip()
+        if not text:
+            continue
+        qid = str(row.get("id") or question_id(text))
+        if qid not in seen:
+            seen.add(qid)
+            questions.append({"id": qid, "question": text})
+    return questions
+
+
+def load_done(path):
+    """Ids already answered in an earlier run's output."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Last line cut off by an interruption
+            if "error" not in record:
+                done.add(record["id"])
+    return done
+
+
+class RateLimiter:
+    """Spaces out calls from many threads to at most `per_minute` per minute."""
+
+    def __init__(self, per_minute=REQUESTS_PER_MINUTE):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            # Reserve the slot before sleeping so concurrent callers queue up behind it
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ResultWriter:
+    """Appends one JSON line per result, flushed right away (safe to interrupt)."""
+
+    def __init__(self, path):
+        self.file = open(path, "a", encoding="utf-8")
+        self.lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def generate(model, prompt, limiter, retries=MAX_RETRIES):
+    """Calls the model with rate limiting and exponential backoff. Returns (text, attempts)."""
+    for attempt in range(retries + 1):
+        limiter.wait()
+        try:
+            return model.generate_content(prompt).text, attempt + 1
+        except ValueError:
+            raise  # Blocked / empty response: asking again gives the same result
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = RETRY_BASE_SECONDS * 2 ** attempt * (1 + random.random() / 2)
+            print(f"\n⚠️ {type(e).__name__}: {e} (retry {attempt + 1}/{retries} in {delay:.1f}s)")
+            time.sleep(delay)
+
+
+def run_batch(engine, questions, out_path, batch_size=BATCH_SIZE, concurrency=LLM_CONCURRENCY,
+              rpm=REQUESTS_PER_MINUTE, retries=MAX_RETRIES):
+    """Answers `questions` into out_path, skipping ids it already holds. Returns stats."""
+    done = load_done(out_path)
+    todo = [q for q in questions if q["id"] not in done]
+    stats = {"skipped": len(questions) - len(todo), "answered": 0, "cached": 0, "not_found": 0, "failed": 0}
+    if not todo:
+        return stats
+
+    writer = ResultWriter(out_path)
+    limiter = RateLimiter(rpm)
+    progress = tqdm(total=len(todo), desc="Answering", unit="q")
+    # Don't prepare prompts far ahead of the LLM: at most this many wait in the pool
+    slots = threading.BoundedSemaphore(concurrency * 2)
+
+    stats_lock = threading.Lock()
+
+    def finish(q, outcome, answer, sources, timings, **extra):
+        writer.write({"id": q["id"], "question": q["question"], "answer": answer, "sources": sources,
+                      "timings": {name: round(seconds * 1000, 1) for name, seconds in timings.items()},
+                      **extra})
+        with stats_lock:
+            stats[outcome] += 1
+        progress.update(1)
+
+    def answer_one(q, query_vector, prompt, sources, prepare_s):
+        try:
+            start = time.perf_counter()
+            text, attempts = generate(engine.model, prompt, limiter, retries)
+            if engine.cache:
+                engine.cache.put(q["question"], query_vector, text, sources)
+            finish(q, "answered", text, sources,
+                   {"prepare_ms": prepare_s, "llm_ms": time.perf_counter() - start}, attempts=attempts)
+        except Exception as e:
+            finish(q, "failed", None, sources, {"prepare_ms": prepare_s}, error=f"{type(e).__name__}: {e}")
+        finally:
+            slots.release()
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="llm")
+    try:
+        for i in range(0, len(todo), batch_size):
+            batch = todo[i:i + batch_size]
+            start = time.perf_counter()
+            prepared = engine.prepare_batch([q["question"] for q in batch])
+            # Encode + search cost is shared by the batch: record each question's share
+            prepare_s = (time.perf_counter() - start) / len(batch)
+
+            for q, (cached_answer, query_vector, prompt, sources) in zip(batch, prepared):
+                if cached_answer is not None:
+                    outcome = "not_found" if cached_answer == NOT_FOUND_ANSWER else "cached"
+                    finish(q, outcome, cached_answer, sources, {"prepare_ms": prepare_s}, cached=outcome == "cached")
+                    continue
+                slots.acquire()
+                pool.submit(answer_one, q, query_vector, prompt, sources, prepare_s)
+        pool.shutdown(wait=True)
+    except KeyboardInterrupt:
+        pool.shutdown(wait=True, cancel_futures=True)
+        print("\n⏸️ Interrupted. Answers so far are saved; run the same command again to resume.")
+    finally:
+        progress.close()
+        writer.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("questions", help="JSONL or CSV file of questions")
+    parser.add_argument("--out", help="output JSONL (default: <questions>.answers.jsonl)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=LLM_CONCURRENCY, help="Gemini calls in flight")
+    parser.add_argument("--rpm", type=float, default=REQUESTS_PER_MINUTE, help="Gemini requests per minute (0 = no limit)")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES)
+    # Exact (normalized) repeats only: the semantic tier is off by default (see AnswerCache)
+    parser.add_argument("--no-cache", action="store_true", help="don't reuse answers for repeated questions")
+    args = parser.parse_args()
+
+    out_path = args.out or os.path.splitext(args.questions)[0] + ".answers.jsonl"
+    questions = read_questions(args.questions)
+    print(f"📄 {len(questions)} questions from {args.questions}")
+
+    print("🧠 Loading RAG engine...")
+    engine = MarathiRAG(cache=False if args.no_cache else None)
+
+    start = time.perf_counter()
+    stats = run_batch(engine, questions, out_path, args.batch_size, args.concurrency, args.rpm, args.retries)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {stats['answered']} answered, {stats['cached']} from cache, {stats['not_found']} without context, "
+          f"{stats['failed']} failed, {stats['skipped']} already done in {elapsed:.1f}s -> {out_path}")
+    if stats["failed"]:
+        print("🔁 Run the same command again to retry the failed questions.")
+
+
+if __name__ == "__main__":
+    main()
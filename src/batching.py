@@ -0,0 +1,75 @@
+# src/batching.py
+"""
+Micro-batching of query encodes for the async request path.
+
+Concurrent requests each want a single `embedder.encode("query: ...")`.
+QueryBatcher collects them for up to `max_wait_ms` (or until `max_batch_size`
+is reached) and runs one batched encode on a bounded worker pool, so N
+simultaneous users cost one forward pass instead of N.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class QueryBatcher:
+    """Coalesces concurrent encode requests on one event loop into batched calls."""
+
+    def __init__(self, embedder, executor, max_batch_size=32, max_wait_ms=10):
+        self.embedder = embedder
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending = []  # (text, future) waiting for the next flush
+        self._flush_handle = None
+        self.batches = 0
+        self.items = 0
+
+    async def encode(self, text):
+        """Returns the embedding for `text`, batched with other concurrent callers."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush, loop)
+
+        return await future
+
+    def _flush(self, loop):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            loop.create_task(self._run(loop, batch))
+
+    async def _run(self, loop, batch):
+        texts = [text for text, _ in batch]
+        self.batches += 1
+        self.items += len(texts)
+        try:
+            vectors = await loop.run_in_executor(
+                self.executor,
+                partial(self.embedder.encode, texts, batch_size=len(texts), show_progress_bar=False)
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():  # caller may have been cancelled
+                future.set_result(vector)
+
+
+def make_embedding_pool(workers=1):
+    """
+    Worker pool for batched encodes. One worker is usually right on CPU:
+    torch already parallelises a single forward pass across cores.
+    """
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed")
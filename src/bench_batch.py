@@ -0,0 +1,106 @@
+# src/bench_batch.py
+"""
+Batch FAQ answering benchmark: generate_answer loop vs src/batch_answer.py.
+
+Offline (FakeEmbedder with a per-call cost like E5 on CPU, FakeGenerativeModel
+with a fixed latency, in-memory Qdrant). Compares questions/sec of
+  - a plain loop calling MarathiRAG.generate_answer per question
+  - run_batch: batched encode + query_batch_points + concurrent LLM calls
+then checks both produce the same answers, that a model failing now and then
+is retried, and that an interrupted run resumes without redoing answers.
+Run from the project root:
+
+    python -m src.bench_batch --questions 200 --concurrency 8
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from src import batch_answer
+from src.bench_utils import SAMPLE_QUESTIONS
+from src.fakes import FakeEmbedder, FakeGenerativeModel, make_memory_collection
+from src.rag_engine import MarathiRAG
+
+
+class FlakyModel:
+    """FakeGenerativeModel that raises on every `every`-th call (like a 429 / 503 from Gemini)."""
+
+    def __init__(self, model, every=3):
+        self.model = model
+        self.every = every
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        if self.calls % self.every == 0:
+            raise RuntimeError("503 Service Unavailable (simulated)")
+        return self.model.generate_content(prompt, **kwargs)
+
+
+def make_engine(args, model=None):
+    embedder = FakeEmbedder(call_delay=args.encode_call_ms / 1000, item_delay=args.encode_item_ms / 1000)
+    client = make_memory_collection(embedder, [f"SCERT notice {i}: admission and exam details" for i in range(500)])
+    model = model or FakeGenerativeModel(first_token_delay=args.llm_seconds, chunk_delay=0)
+    return MarathiRAG(embedder=embedder, client=client, model=model, cache=False)
+
+
+def read_answers(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return {r["id"]: r for r in map(json.loads, f) if "error" not in r}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-seconds", type=float, default=0.2)
+    parser.add_argument("--encode-call-ms", type=float, default=40, help="fake model cost per encode() call")
+    parser.add_argument("--encode-item-ms", type=float, default=2, help="fake model cost per text")
+    args = parser.parse_args()
+
+    questions = [{"id": str(i), "question": f"{SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)]} (FAQ {i})"}
+                 for i in range(args.questions)]
+    print(f"📄 {len(questions)} questions, LLM {args.llm_seconds * 1000:.0f}ms, concurrency {args.concurrency}\n")
+
+    engine = make_engine(args)
+    start = time.perf_counter()
+    loop_answers = {q["id"]: engine.generate_answer(q["question"]) for q in questions}
+    loop_qps = len(questions) / (time.perf_counter() - start)
+    print(f"🐢 generate_answer loop: {loop_qps:.1f} questions/sec")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "answers.jsonl")
+        start = time.perf_counter()
+        batch_answer.run_batch(make_engine(args), questions, out, concurrency=args.concurrency, rpm=0)
+        batch_qps = len(questions) / (time.perf_counter() - start)
+        print(f"⚡ run_batch:             {batch_qps:.1f} questions/sec")
+
+        answers = read_answers(out)
+        same = all(answers[qid]["answer"] == text and answers[qid]["sources"] == sources
+                   for qid, (text, sources) in loop_answers.items())
+        print(f"🔍 Same answers and sources as the loop: {same}")
+
+        # Retries: every 3rd call fails once, and is retried after the backoff
+        batch_answer.RETRY_BASE_SECONDS = 0.01
+        flaky = FlakyModel(FakeGenerativeModel(first_token_delay=0.01, chunk_delay=0))
+        out = os.path.join(tmp, "flaky.jsonl")
+        stats = batch_answer.run_batch(make_engine(args, flaky), questions[:30], out, concurrency=4, rpm=0)
+        print(f"🔁 Flaky model: {flaky.calls} calls for 30 questions -> {stats['answered']} answered, "
+              f"{stats['failed']} failed")
+
+        # Resume: a first run that "dies" after 50 answers, then the same command again
+        out = os.path.join(tmp, "resume.jsonl")
+        fast = dict(vars(args), llm_seconds=0.01)
+        batch_answer.run_batch(make_engine(argparse.Namespace(**fast)), questions[:50], out, rpm=0)
+        stats = batch_answer.run_batch(make_engine(argparse.Namespace(**fast)), questions, out, rpm=0)
+        with open(out, "r", encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+        print(f"⏯️ Resume: {stats['skipped']} skipped, {stats['answered']} answered, "
+              f"{lines} lines for {len(questions)} questions")
+
+    print(f"\n📈 Throughput: {batch_qps / loop_qps:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# src/bench_chunker.py
+"""
+Parity and throughput check: src/chunker.py vs the LangChain splitters.
+
+Parity: every file of a synthetic corpus plus a set of edge cases (code
+fences, '#####' and '#x' non-headers, bare '#' / '##' headers, repeated
+headers with nothing in between, zero-width characters, long unbroken
+lines, tables) must give the same (context, text)
+chunks from both, with the token check off. Exits non-zero on a mismatch.
+
+Throughput: chunks/sec for both on the same corpus, plus the cost of the
+token check. Needs langchain-text-splitters (pip install -r
+requirements-dev.txt). Run from the project root:
+
+    python -m src.bench_chunker --files 500
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from src.bench_utils import MARATHI_WORDS, write_synthetic_corpus
+from src.chunker import (CHUNK_OVERLAP, CHUNK_SIZE, SEPARATORS, MarkdownChunker, e5_token_counter,
+                         estimate_e5_tokens)
+
+EDGE_CASES = {
+    "code_fence": "# Setup\nIntro line\n```python\n# not a header\n\nx = 1\n```\n## After\ntext after code",
+    "tilde_fence": "# A\n~~~\n## inside\n~~~\nafter",
+    "inline_fence": "# A\n```inline``` code\n## B\nbody",
+    "deep_and_bad_headers": "# A\n##### five hashes\n#nospace\n## B\ncontent\n#\nempty header body",
+    "repeated_header": "# A\nfirst\n# A\nsecond\n\nthird para\n## B\nx\n# A\ny",
+    "header_pop_order": "## B\nb\n# A\na\n### C\nc\n## D\nd",
+    "zero_width": "# शाळा\u200d माहिती\nशिक्ष\u200cण विभाग\tसूचना\n\n\u200b\nनवीन",
+    "no_headers": "just text\n\nmore text\n\n\n\nand more",
+    "long_unbroken": "# Long\n" + "क" * 2500 + "\n" + "word " * 400,
+    "table": "# Table\n" + "\n".join(f"| {i} | " + " | ".join(MARATHI_WORDS[:12]) + " |" for i in range(60)),
+    "cjk_stop": "# CJK\n" + "。".join(["这是一个句子" * 20] * 20),
+    "headers_only": "# A\n## B\n### C",
+    "trailing_spaces": "# A  \n  indented line  \n\n   \n# B\t\nx",
+    "bare_headers": "### C\n#### D\n###\n\n#x\n#\n~~~\n#",
+    "bare_header_levels": "#x\n# A\n###\n#x\n##\n##### E\n#### D",
+    "header_back_to_back": "# A\nx | y\n###\n# A\ntext\n\n##",
+    "same_header_again": "# A\ntext\n#### D\n# A\n~~~\n# A\n### C",
+    "one_line_fence": "#\n#x\n# A\n\n#\n``` a ```\n##### E\ntext",
+    "open_fence_then_header": "### C\n### C\n##\n##### E\n#\n```py\n# A\nx",
+    "empty": "",
+}
+
+
+def langchain_splitters():
+    from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
+    markdown_splitter = MarkdownHeaderTextSplitter(headers_to_split_on=[
+        ("#", "Header 1"), ("##", "Header 2"), ("###", "Header 3"), ("####", "Header 4"),
+    ])
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, separators=list(SEPARATORS)
+    )
+    return markdown_splitter, text_splitter
+
+
+def langchain_chunks(splitters, text):
+    markdown_splitter, text_splitter = splitters
+    docs = text_splitter.split_documents(markdown_splitter.split_text(text))
+    return [(" > ".join(d.metadata.values()), d.page_content) for d in docs]
+
+
+def fast_chunks(chunker, text):
+    return [(c.context, c.text) for c in chunker.split_text(text)]
+
+
+def check_parity(splitters, documents):
+    chunker = MarkdownChunker(count_tokens=None)
+    mismatches = []
+    for name, text in documents.items():
+        expected, got = langchain_chunks(splitters, text), fast_chunks(chunker, text)
+        if expected != got:
+            first = next((i for i, (a, b) in enumerate(zip(expected, got)) if a != b), min(len(expected), len(got)))
+            mismatches.append(f"{name}: {len(expected)} vs {len(got)} chunks, first difference at chunk {first}")
+    return mismatches
+
+
+def throughput(label, split, documents, repeat):
+    start, chunks = time.perf_counter(), 0
+    for _ in range(repeat):
+        for text in documents:
+            chunks += len(split(text))
+    elapsed = time.perf_counter() - start
+    print(f"⚡ {label:<26} {chunks / elapsed:>9.0f} chunks/sec  ({len(documents) * repeat / elapsed:.0f} files/sec)")
+    return chunks / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--sections", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    splitters = langchain_splitters()
+    import_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        documents = {}
+        for path in write_synthetic_corpus(os.path.join(tmp, "corpus"), args.files, sections=args.sections):
+            with open(path, "r", encoding="utf-8") as f:
+                documents[os.path.basename(path)] = f.read().split("\n", 1)[1]   # drop the Source: line
+
+    # Random mixes of the edge cases too
+    rng = np.random.default_rng(0)
+    cases = list(EDGE_CASES.values())
+    mixed = {f"mix_{i}": "\n".join(rng.choice(cases, size=4)) for i in range(50)}
+
+    mismatches = check_parity(splitters, {**EDGE_CASES, **mixed, **documents})
+    total = len(EDGE_CASES) + len(mixed) + len(documents)
+    if mismatches:
+        print(f"❌ Parity: {len(mismatches)}/{total} documents differ")
+        for line in mismatches[:20]:
+            print(f"   {line}")
+    else:
+        print(f"✅ Parity: identical chunks for all {total} documents")
+
+    texts = list(documents.values())
+    print(f"\n📦 langchain import + setup: {import_s * 1000:.0f} ms")
+    slow = throughput("langchain splitters", lambda t: langchain_chunks(splitters, t), texts, args.repeat)
+    fast = throughput("chunker (no token check)", MarkdownChunker(count_tokens=None).split_text, texts, args.repeat)
+    counter = e5_token_counter()
+    token_chunker = MarkdownChunker(count_tokens=counter)
+    label = "estimate" if counter is estimate_e5_tokens else "e5 tokenizer"
+    throughput(f"chunker + {label}", token_chunker.split_text, texts, args.repeat)
+    print(f"\n📈 Speedup: {fast / slow:.1f}x  ({token_chunker.token_splits} chunks split for the "
+          f"{token_chunker.max_tokens}-token limit)")
+    raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# src/bench_crawl.py
+"""
+Crawler benchmark against a local stand-in site.
+
+Serves a generated site graph from a local HTTP server (with per-request
+latency, duplicate links that differ only in query order / trailing slash /
+fragment) and crawls it with:
+  - the old behaviour: 1 page at a time + 0.2 s sleep  (concurrency=1, 5 req/s)
+  - the frontier crawler: N concurrent fetches under a per-host rate limit
+Run from the project root:
+
+    python -m src.bench_crawl --pages 300 --concurrency 8 --rate 50
+    python -m src.bench_crawl --fetcher crawl4ai        # through the headless browser
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from src.scraper import Crawl4AIFetcher, HttpFetcher, crawl
+
+
+def make_site(n_pages, links_per_page=8, seed=0):
+    """page index -> list of hrefs (with deliberately non-canonical duplicates)."""
+    rng = random.Random(seed)
+    site = {}
+    for i in range(n_pages):
+        hrefs = []
+        for target in rng.sample(range(n_pages), k=min(links_per_page, n_pages)):
+            variant = rng.randrange(4)
+            if variant == 0:
+                hrefs.append(f"/index.php?tcf={target}&lang=mr")
+            elif variant == 1:
+                hrefs.append(f"/index.php?lang=mr&tcf={target}")   # same page, params reordered
+            elif variant == 2:
+                hrefs.append(f"/index.php/?tcf={target}&lang=mr#top")  # trailing slash + fragment
+            else:
+                hrefs.append(f"/files/circular_{target}.pdf")      # ignored extension
+        site[i] = hrefs
+    return site
+
+
+def start_server(site, latency):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            query = parse_qs(urlparse(self.path).query)
+            page = int(query.get("tcf", ["0"])[0])
+            links = "".join(f'<li><a href="{href}">link</a></li>' for href in site.get(page, []))
+            body = (f"<html><body><h1>पृष्ठ {page}</h1><p>SCERT सूचना {page}</p>"
+                    f"<ul>{links}</ul></body></html>").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def timed_crawl(start_url, fetcher_cls, max_pages, concurrency, rate):
+    async with fetcher_cls() as fetcher:
+        start = time.perf_counter()
+        pages = await crawl(start_url, fetcher=fetcher, max_pages=max_pages, max_depth=50,
+                            concurrency=concurrency, rate=rate, output_dir=None, verbose=False)
+        return pages, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300, help="pages in the generated site")
+    parser.add_argument("--latency", type=float, default=0.05, help="server seconds per response")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=50, help="requests/sec per host for the new crawler")
+    parser.add_argument("--fetcher", choices=["http", "crawl4ai"], default="http")
+    args = parser.parse_args()
+
+    server = start_server(make_site(args.pages), args.latency)
+    start_url = f"http://127.0.0.1:{server.server_port}/index.php?tcf=0&lang=mr"
+    fetcher_cls = HttpFetcher if args.fetcher == "http" else Crawl4AIFetcher
+
+    print(f"🌐 Local site: {args.pages} pages, {args.latency * 1000:.0f} ms/response, fetcher={args.fetcher}\n")
+    results = {}
+    for label, concurrency, rate in [("sequential + 0.2s sleep", 1, 5.0),
+                                     (f"frontier x{args.concurrency}", args.concurrency, args.rate)]:
+        pages, elapsed = asyncio.run(timed_crawl(start_url, fetcher_cls, args.pages, concurrency, rate))
+        results[label] = pages / elapsed
+        print(f"🕷️ {label:<24} {pages} unique pages in {elapsed:.1f}s -> {pages / elapsed:.1f} pages/sec")
+
+    server.shutdown()
+    slow, fast = results.values()
+    print(f"\n📈 Speedup: {fast / slow:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# src/bench_documents.py
+"""
+Document ingestion check: PDF / DOCX / XLSX links crawled into the index.
+
+Everything is generated locally (no PDF library needed for the fixtures):
+  1. Extraction: every fixture page comes out under its own page marker,
+     table rows as "| a | b | c |" lines, larger-font lines as headings.
+  2. Memory: peak RSS of extracting a --pages PDF page by page vs reading the
+     whole document first (each in a fresh process).
+  3. Parallel extraction of --files PDFs with 1 vs --workers processes.
+  4. End to end: a local site links to the documents (one PDF under two
+     URLs); scraper.crawl() with a DocumentFetcher feeds the stream_ingest
+     sink (FakeEmbedder, in-memory Qdrant). Checks the store keeps one copy
+     per content hash and that every chunk has its source_url and page.
+Run from the project root:
+
+    python -m src.bench_documents --pages 400 --files 8
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+from src import documents
+from src.bench_utils import write_synthetic_docx, write_synthetic_pdf, write_synthetic_xlsx
+from src.context_budget import source_link
+from src.fakes import FakeEmbedder
+from src.ingest import COLLECTION_NAME, split_file
+from src.manifest import IngestManifest
+from src.scraper import HttpFetcher, crawl
+from src.stream_ingest import IndexSink
+
+
+def measure(path, mode):
+    """Runs in a child process: extract one PDF, print peak RSS in MB."""
+    import resource
+    if mode == "streamed":
+        documents.extract_to_markdown(path, path + ".md")
+    else:
+        import pdfplumber
+        with pdfplumber.open(path) as pdf:
+            text = "\n".join("\n".join(documents.pdf_page_lines(page)) for page in pdf.pages)
+        with open(path + ".md", "w", encoding="utf-8") as f:
+            f.write(text)
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3)
+
+
+def peak_rss(path, mode):
+    out = subprocess.run([sys.executable, "-m", "src.bench_documents", "--measure", path, "--mode", mode],
+                         capture_output=True, text=True, check=True).stdout
+    return float(out.split()[-1])
+
+
+def check_extraction(tmp):
+    pdf = write_synthetic_pdf(os.path.join(tmp, "circular.pdf"), 3, table_rows=2)
+    docx = write_synthetic_docx(os.path.join(tmp, "syllabus.docx"), 2)
+    xlsx = write_synthetic_xlsx(os.path.join(tmp, "schools.xlsx"), 3)
+    ok = True
+    for path, expected_pages, expected_lines in [
+        (pdf, 3, ["## Circular 2: Exam Timetable", "| 2 | Subject 3-2 | 2024-06-02 |"]),
+        (docx, 2, ["# Syllabus part 2", "| 2 | Topic 2 |"]),
+        (xlsx, 1, ["## Schools 2024", "| District 3 |  | 40 |"]),
+    ]:
+        out = path + ".md"
+        pages, with_text = documents.extract_to_markdown(path, out, source_url=f"https://example.org/{os.path.basename(path)}")
+        with open(out, encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        _, _, _, payloads = split_file(out)
+        found = all(line in lines for line in expected_lines)
+        paged = sorted({p["page"] for p in payloads}) == list(range(1, expected_pages + 1))
+        print(f"📄 {os.path.basename(path):<15} {pages} pages ({with_text} with text), {len(payloads)} chunks, "
+              f"rows/headings kept: {found}, page payloads: {paged}")
+        ok &= pages == expected_pages and found and paged
+    return ok
+
+
+def start_server(directory):
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=directory, **kwargs)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def crawl_site(start_url, store_dir, output_dir, workers):
+    client = QdrantClient(":memory:")
+    client.create_collection(COLLECTION_NAME, vectors_config=VectorParams(size=1024, distance=Distance.COSINE))
+    manifest = IngestManifest(os.path.join(output_dir, "manifest.jsonl"))
+    async with HttpFetcher() as fetcher, documents.DocumentFetcher(store_dir, workers) as docs, \
+            IndexSink(client, FakeEmbedder(), manifest) as sink:
+        pages = await crawl(start_url, fetcher=fetcher, max_pages=50, concurrency=4, rate=0,
+                            output_dir=output_dir, verbose=False, sink=sink, documents=docs)
+    return client, pages, docs.stats
+
+
+def check_crawl(tmp, workers):
+    site = os.path.join(tmp, "site")
+    os.makedirs(os.path.join(site, "docs"))
+    write_synthetic_pdf(os.path.join(site, "docs", "timetable.pdf"), 5)
+    write_synthetic_pdf(os.path.join(site, "docs", "timetable-copy.pdf"), 5)   # Same bytes, second URL
+    write_synthetic_docx(os.path.join(site, "docs", "syllabus.docx"), 2)
+    write_synthetic_xlsx(os.path.join(site, "docs", "schools.xlsx"))
+    links = "".join(f'<li><a href="docs/{name}">{name}</a></li>' for name in sorted(os.listdir(os.path.join(site, "docs"))))
+    with open(os.path.join(site, "index.html"), "w", encoding="utf-8") as f:
+        f.write(f"<html><body><h1>परिपत्रके</h1><p>SCERT circulars</p><ul>{links}</ul></body></html>")
+
+    server = start_server(site)
+    start_url = f"http://127.0.0.1:{server.server_port}/index.html"
+    client, pages, stats = asyncio.run(crawl_site(start_url, os.path.join(tmp, "store"),
+                                                  os.path.join(tmp, "crawled"), workers))
+    server.shutdown()
+
+    stored = sorted(os.listdir(os.path.join(tmp, "store")))
+    points, _ = client.scroll(COLLECTION_NAME, limit=10_000, with_payload=True)
+    pdf_points = [p.payload for p in points if p.payload["source_url"].endswith("timetable.pdf")]
+    pages_ok = all(f"020-2447{p['page']:04d}" in p["text"] or p["text"].startswith("|") for p in pdf_points)
+    pages_seen = sorted({p["page"] for p in pdf_points})
+    print(f"🕷️ Crawled {pages} URLs: {stats['downloaded']} documents downloaded, {stats['extracted']} extracted, "
+          f"{stats['reused']} reused from the store ({len(stored)} store files)")
+    print(f"💾 {len(points)} chunks indexed; timetable.pdf pages {pages_seen}, "
+          f"e.g. {source_link(pdf_points[0]) if pdf_points else '-'}")
+    return (pages == 5 and stats["extracted"] == 3 and stats["reused"] == 1 and len(stored) == 6
+            and pages_seen == [1, 2, 3, 4, 5] and pages_ok)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400, help="pages of the large PDF for the memory check")
+    parser.add_argument("--files", type=int, default=8, help="PDFs for the parallel extraction check")
+    parser.add_argument("--workers", type=int, default=documents.EXTRACT_WORKERS)
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        return measure(args.measure, args.mode)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ok = check_extraction(tmp)
+
+        large = write_synthetic_pdf(os.path.join(tmp, "large.pdf"), args.pages)
+        small = write_synthetic_pdf(os.path.join(tmp, "small.pdf"), 10)
+        streamed, whole = peak_rss(large, "streamed"), peak_rss(large, "whole")
+        baseline = peak_rss(small, "streamed")
+        print(f"🧠 Peak RSS, {args.pages}-page PDF: page by page {streamed:.0f} MB "
+              f"(10 pages: {baseline:.0f} MB), whole document {whole:.0f} MB")
+        ok &= streamed < whole and streamed < baseline * 1.5
+
+        paths = [write_synthetic_pdf(os.path.join(tmp, f"batch{i}.pdf"), 20) for i in range(args.files)]
+        for workers in sorted({1, args.workers}):
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pages = sum(pages for pages, _ in pool.map(documents.extract_to_markdown, paths,
+                                                           [p + ".md" for p in paths]))
+            elapsed = time.perf_counter() - start
+            print(f"⚡ {args.files} PDFs, {workers} worker(s): {pages / elapsed:.0f} pages/sec")
+
+        ok &= check_crawl(tmp, args.workers)
+
+    print("✅ Documents extracted, paged and indexed." if ok else "❌ Document check failed.")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# src/bench_embed_server.py
+"""
+Embedding server benchmark: many clients, one model.
+
+Starts src/embed_server.py in-process on a free port (FakeEmbedder, whose
+fixed per-call cost mimics an E5 forward pass on CPU) and compares N client
+threads encoding single queries:
+  - each thread calling the model directly, one encode per query
+    (what N app replicas with their own model copy would do, minus the RAM)
+  - the same threads going through EmbeddingClient, coalesced by the server
+Then prints the server's /metrics and checks the fallback when no server runs.
+Run from the project root:
+
+    python -m src.bench_embed_server --clients 16 --requests 20
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.bench_utils import SAMPLE_QUESTIONS, format_summary, latency_summary
+from src.embed_server import DynamicBatcher, EmbeddingClient, make_server
+from src.embedders import connect_embedder, embedder_id
+from src.fakes import FakeEmbedder
+
+
+def run_clients(encode, clients, requests):
+    def session(user):
+        latencies = []
+        for i in range(requests):
+            start = time.perf_counter()
+            encode(f"query: {SAMPLE_QUESTIONS[(user + i) % len(SAMPLE_QUESTIONS)]}")
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = [t for result in pool.map(session, range(clients)) for t in result]
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--encode-call-ms", type=float, default=40, help="fake model cost per encode() call")
+    parser.add_argument("--encode-item-ms", type=float, default=2, help="fake model cost per text")
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    embedder = FakeEmbedder(call_delay=args.encode_call_ms / 1000, item_delay=args.encode_item_ms / 1000)
+    total = args.clients * args.requests
+    print(f"👥 {args.clients} clients x {args.requests} single-query encodes\n")
+
+    # The model is only safe from one thread at a time, like a torch model on CPU
+    lock = threading.Lock()
+
+    def direct(text):
+        with lock:
+            return embedder.encode(text)
+
+    latencies, elapsed = run_clients(direct, args.clients, args.requests)
+    direct_qps = total / elapsed
+    print(f"{format_summary('direct encode', latency_summary(latencies))}  {direct_qps:.0f} encodes/sec")
+
+    batcher = DynamicBatcher(embedder, max_wait_ms=args.max_wait_ms)
+    server = make_server(batcher, embedder_id("fake"), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    client = EmbeddingClient(url)
+
+    latencies, elapsed = run_clients(client.encode, args.clients, args.requests)
+    server_qps = total / elapsed
+    print(f"{format_summary('embedding server', latency_summary(latencies))}  {server_qps:.0f} encodes/sec "
+          f"({batcher.stats['batches']} batches, avg {batcher.stats['texts'] / batcher.stats['batches']:.1f} texts)")
+
+    same = np.allclose(client.encode("query: परीक्षा"), embedder.encode("query: परीक्षा"))
+    print(f"🔍 Server vectors match in-process vectors: {same}")
+    print(f"\n📊 /metrics:\n{batcher.metrics()}")
+
+    server.shutdown()
+    server.server_close()
+    fallback = connect_embedder("fake", url=url)
+    print(f"🔌 Server stopped -> connect_embedder() returns {type(fallback).__name__} (in-process fallback)")
+    print(f"📈 Throughput: {server_qps / direct_qps:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# src/bench_ingest.py
+"""
+Ingestion throughput benchmark: per-file loop vs staged pipeline.
+
+Generates a synthetic markdown corpus, ingests it into a throwaway in-memory
+Qdrant collection with both src/ingest.py paths, and reports chunks/sec.
+Then edits a few files and re-runs the pipeline to show the incremental
+(content-hash) refresh cost.
+Run from the project root:
+
+    python -m src.bench_ingest --files 300                 # FakeEmbedder (offline)
+    python -m src.bench_ingest --files 300 --embedder e5   # real multilingual-e5-large
+"""
+import argparse
+import os
+import tempfile
+import time
+from qdrant_client import QdrantClient
+from qdrant_client.models import VectorParams, Distance
+from src import ingest
+from src.bench_utils import write_synthetic_corpus
+from src.fakes import FakeEmbedder
+from src.manifest import IngestManifest
+
+
+def load_embedder(name):
+    if name == "e5":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer('intfloat/multilingual-e5-large')
+    # Fixed per-call overhead + per-item cost, like a CPU forward pass
+    return FakeEmbedder(call_delay=0.04, item_delay=0.004)
+
+
+def fresh_client():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        collection_name=ingest.COLLECTION_NAME,
+        vectors_config=VectorParams(size=1024, distance=Distance.COSINE)
+    )
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--sections", type=int, default=3, help="sections per synthetic page")
+    parser.add_argument("--embedder", choices=["fake", "e5"], default="fake")
+    parser.add_argument("--workers", type=int, default=ingest.SPLIT_WORKERS)
+    parser.add_argument("--changed", type=float, default=0.05, help="fraction of files edited before the re-run")
+    args = parser.parse_args()
+
+    embedder = load_embedder(args.embedder)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = write_synthetic_corpus(os.path.join(tmp, "corpus"), args.files, sections=args.sections)
+        print(f"📂 {len(files)} synthetic files, embedder={args.embedder}\n")
+
+        results = {}
+        for label, run in [
+            ("per-file loop", ingest.ingest_sequential),
+            ("pipelined", lambda *a: ingest.ingest_pipelined(*a, workers=args.workers)),
+        ]:
+            manifest = IngestManifest(os.path.join(tmp, f"{label.replace(' ', '_')}.jsonl"))
+            client = fresh_client()
+            start = time.perf_counter()
+            chunks = run(ingest.plan_ingestion(files, client, manifest), client, embedder, manifest)
+            elapsed = time.perf_counter() - start
+
+            results[label] = chunks / elapsed
+            print(f"⚡ {label:<14} {chunks} chunks in {elapsed:.2f}s -> {chunks / elapsed:.1f} chunks/sec "
+                  f"({len(manifest.files)} files checkpointed)")
+
+        # --- Incremental refresh: edit a few files, delete one, re-run ---
+        n_changed = max(1, int(len(files) * args.changed))
+        for path in files[:n_changed]:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n## नवीन सूचना (New notice)\nUpdated admission dates announced today.\n")
+        os.remove(files[-1])
+
+        start = time.perf_counter()
+        plan = ingest.plan_ingestion(files[:-1], client, manifest)
+        chunks = ingest.ingest_pipelined(plan, client, embedder, manifest, workers=args.workers)
+        elapsed = time.perf_counter() - start
+        print(f"🔁 re-run after editing {n_changed} files and deleting 1: {len(plan)} files re-split, "
+              f"{chunks} chunks encoded in {elapsed:.2f}s, "
+              f"{client.count(ingest.COLLECTION_NAME).count} points in index")
+
+    print(f"\n📈 Speedup: {results['pipelined'] / results['per-file loop']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# src/bench_load.py
+"""
+Load benchmark: N concurrent simulated users against MarathiRAG.
+
+Compares the current model (one thread per user calling generate_answer,
+like Streamlit sessions) with the asyncio path (agenerate_answer with
+micro-batched encodes). The LLM is FakeGenerativeModel and the embedder is
+FakeEmbedder, whose per-call overhead mimics batching economics of E5 on CPU.
+Run from the project root:
+
+    python -m src.bench_load --users 32 --requests 5
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.bench_utils import SAMPLE_QUESTIONS, format_summary, latency_summary
+from src.fakes import FakeEmbedder, FakeGenerativeModel, make_memory_collection
+from src.rag_engine import MarathiRAG
+
+
+def make_engine(args):
+    embedder = FakeEmbedder(call_delay=args.encode_call_ms / 1000, item_delay=args.encode_item_ms / 1000)
+    client = make_memory_collection(embedder, [f"SCERT notice {i}: admission and exam details" for i in range(500)])
+    model = FakeGenerativeModel(first_token_delay=args.llm_seconds, chunk_delay=0)
+    # No answer cache: every request must do the full work
+    return MarathiRAG(embedder=embedder, client=client, model=model, cache=False,
+                      llm_concurrency=args.llm_concurrency)
+
+
+def question(user, i):
+    return f"{SAMPLE_QUESTIONS[(user + i) % len(SAMPLE_QUESTIONS)]} (user {user} #{i})"
+
+
+def run_threads(engine, args):
+    def user_session(user):
+        latencies = []
+        for i in range(args.requests):
+            start = time.perf_counter()
+            engine.generate_answer(question(user, i))
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        results = list(pool.map(user_session, range(args.users)))
+    return [x for r in results for x in r], time.perf_counter() - start
+
+
+async def run_async(engine, args):
+    async def user_session(user):
+        latencies = []
+        for i in range(args.requests):
+            start = time.perf_counter()
+            await engine.agenerate_answer(question(user, i))
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(user_session(u) for u in range(args.users)))
+    return [x for r in results for x in r], time.perf_counter() - start
+
+
+def report(label, latencies, elapsed):
+    print(format_summary(label, latency_summary(latencies)) + f"  QPS={len(latencies) / elapsed:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=5, help="requests per user")
+    parser.add_argument("--llm-seconds", type=float, default=0.5, help="stub LLM latency")
+    parser.add_argument("--llm-concurrency", type=int, default=16)
+    parser.add_argument("--encode-call-ms", type=float, default=25, help="fixed cost per encode() call")
+    parser.add_argument("--encode-item-ms", type=float, default=3, help="extra cost per query in a batch")
+    args = parser.parse_args()
+
+    print(f"👥 {args.users} users x {args.requests} requests, stub LLM {args.llm_seconds}s\n")
+
+    engine = make_engine(args)
+    latencies, elapsed = run_threads(engine, args)
+    report("threads + generate_answer", latencies, elapsed)
+    print(f"   encode() calls: {engine.embedder.calls}")
+
+    engine = make_engine(args)
+    latencies, elapsed = asyncio.run(run_async(engine, args))
+    report("asyncio + agenerate_answer", latencies, elapsed)
+    print(f"   encode() calls: {engine.embedder.calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# src/bench_optim_ingest.py
+"""
+Peak memory of a full rebuild vs corpus size: buffered vs windowed optim_ingest.
+
+For each corpus size a synthetic markdown corpus is generated and indexed in
+a fresh process, once the pre-streaming way (every chunk, text and vector of
+the corpus buffered, per-vector .tolist() points) and once with
+optim_ingest.ingest_stream (fixed windows: split -> encode -> upload). Peak
+RSS is that process's high-water mark. Points go to a client that only
+counts them (with a Qdrant server, storage lives in another process), and
+the embedder returns random vectors, so only the ingestion code's own
+memory is measured. Then a small corpus goes into an in-memory Qdrant twice
+to check the ids are valid, deterministic UUIDs (a re-run overwrites, it
+doesn't duplicate). Run from the project root:
+
+    python -m src.bench_optim_ingest --sizes 250 1000 4000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+from src import optim_ingest
+from src.bench_utils import peak_rss_mb, write_synthetic_corpus
+from src.fakes import FakeEmbedder
+from src.ingest import get_chunker, split_file
+from src.manifest import IngestManifest
+
+
+class RandomEmbedder:
+    """Random (n, dim) float32 vectors: the size of real embeddings, none of the cost."""
+
+    dim = 1024
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, **kwargs):
+        return np.random.default_rng(len(sentences)).standard_normal((len(sentences), self.dim), dtype=np.float32)
+
+
+class CountingClient:
+    """Accepts upserts / uploads like QdrantClient, keeps only a count."""
+
+    def __init__(self):
+        self.points = 0
+
+    def upsert(self, collection_name, points, **kwargs):
+        self.points += len(points)
+
+    def upload_collection(self, collection_name, vectors, payload=None, ids=None, **kwargs):
+        self.points += len(np.asarray(vectors))
+
+
+def buffered_ingest(files, client, collection_name, embedding_model):
+    """The pre-streaming optim_ingest.py: buffer the corpus, encode it at once, then upload."""
+    all_chunks_data = []
+    for file_index, filepath in enumerate(files):
+        with open(filepath, "r", encoding="utf-8") as f:
+            content = f.read()
+        lines = content.split('\n')
+        source_url = lines[0].replace("Source:", "").strip()
+        for chunk_index, chunk in enumerate(get_chunker().split_text("\n".join(lines[1:]))):
+            all_chunks_data.append({
+                "id": f"{file_index}_{chunk_index}",
+                "full_text": f"{chunk.context}\n{chunk.text}",
+                "payload": {"text": chunk.text, "context": chunk.context, "source_url": source_url,
+                            "file_name": os.path.basename(filepath)},
+            })
+
+    texts_to_encode = ["passage: " + item["full_text"] for item in all_chunks_data]
+    vectors = embedding_model.encode(texts_to_encode, batch_size=optim_ingest.BATCH_SIZE)
+
+    points_batch = []
+    for i, (data, vector) in enumerate(zip(all_chunks_data, vectors)):
+        points_batch.append(PointStruct(id=data["id"], vector=vector.tolist(), payload=data["payload"]))
+        if len(points_batch) >= 100 or i == len(all_chunks_data) - 1:
+            client.upsert(collection_name=collection_name, points=points_batch)
+            points_batch = []
+    return len(all_chunks_data)
+
+
+def measure(corpus_dir, mode, window):
+    """Runs in a child process: prints {"chunks", "seconds", "peak_mb"}."""
+    files = sorted(os.path.join(corpus_dir, f) for f in os.listdir(corpus_dir))
+    client, embedder = CountingClient(), RandomEmbedder()
+    start = time.perf_counter()
+    if mode == "buffered":
+        chunks = buffered_ingest(files, client, "bench", embedder)
+    else:
+        manifest = IngestManifest(corpus_dir + "_manifest.jsonl")
+        chunks = optim_ingest.ingest_stream(files, client, "bench", embedder, manifest, window=window)
+    assert client.points == chunks
+    print(json.dumps({"chunks": chunks, "seconds": time.perf_counter() - start, "peak_mb": peak_rss_mb()}))
+
+
+def run_child(corpus_dir, mode, window):
+    out = subprocess.run([sys.executable, "-m", "src.bench_optim_ingest", "--measure", corpus_dir,
+                          "--mode", mode, "--window", str(window)], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def check_ids(tmp, window):
+    files = write_synthetic_corpus(os.path.join(tmp, "ids"), 30)
+    embedder = FakeEmbedder()
+    client = QdrantClient(":memory:")
+    client.create_collection("bench", vectors_config=VectorParams(size=embedder.dim, distance=Distance.COSINE))
+    manifest = IngestManifest(os.path.join(tmp, "ids_manifest.jsonl"))
+    chunks = optim_ingest.ingest_stream(files, client, "bench", embedder, manifest, window=window)
+    optim_ingest.ingest_stream(files, client, "bench", embedder, window=window)
+    stored = client.count("bench").count
+
+    points, _ = client.scroll("bench", limit=chunks, with_payload=True)
+    valid = all(uuid.UUID(str(p.id)) for p in points)
+    same_as_ingest = {str(p.id) for p in points} == {i for f in files for i in split_file(f)[1]}
+    recorded = len(manifest.files) == len(files)
+    print(f"🆔 {chunks} chunks, {stored} points after two runs; UUID ids: {valid}, "
+          f"same ids as ingest.py: {same_as_ingest}, files in manifest: {len(manifest.files)}/{len(files)}")
+    return stored == chunks and valid and same_as_ingest and recorded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 1000, 4000], help="corpus sizes in files")
+    parser.add_argument("--window", type=int, default=optim_ingest.WINDOW_CHUNKS)
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        return measure(args.measure, args.mode, args.window)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'files':>6} {'chunks':>8} {'buffered MB':>12} {'streamed MB':>12} {'buffered s':>11} {'streamed s':>11}")
+        rows = []
+        for n in args.sizes:
+            corpus = os.path.join(tmp, f"corpus{n}")
+            write_synthetic_corpus(corpus, n, seed=n)
+            buffered, streamed = run_child(corpus, "buffered", args.window), run_child(corpus, "streamed", args.window)
+            rows.append((buffered, streamed))
+            print(f"{n:>6} {streamed['chunks']:>8} {buffered['peak_mb']:>12.0f} {streamed['peak_mb']:>12.0f} "
+                  f"{buffered['seconds']:>11.2f} {streamed['seconds']:>11.2f}")
+
+        (small_b, small_s), (large_b, large_s) = rows[0], rows[-1]
+        growth = lambda small, large: (large["peak_mb"] - small["peak_mb"]) / max(1, large["chunks"] - small["chunks"]) * 1000
+        print(f"\n📈 Peak RSS growth per 1000 chunks: buffered {growth(small_b, large_b):.1f} MB, "
+              f"streamed {growth(small_s, large_s):.1f} MB")
+        ok = check_ids(tmp, min(args.window, 64))
+
+    print("✅ Windowed ingest: bounded memory, stable UUID ids." if ok else "❌ Check failed.")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# src/bench_recrawl.py
+"""
+Conditional re-crawl check against a local stand-in site.
+
+The site mixes pages that send an ETag, pages that send Last-Modified and
+pages that send neither (the server honours If-None-Match / If-Modified-Since
+with 304). It is crawled once, then a few pages are edited, removed and added,
+and it is crawled again with the same CrawlState. The second run should
+render only the new / changed pages and report exactly those edits in the
+changes feed. Run from the project root:
+
+    python -m src.bench_recrawl --pages 60 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from src.crawl_state import CrawlState
+from src.scraper import HttpFetcher, canonicalize_url, crawl
+
+BASE_TIME = 1_700_000_000
+
+
+class Site:
+    """page id -> version; a page's body, ETag and Last-Modified follow its version."""
+
+    def __init__(self, n_pages):
+        self.versions = {i: 1 for i in range(n_pages)}
+        self.lock = threading.Lock()
+        self.requests = {"200": 0, "304": 0, "404": 0}
+
+    def validators(self, page):
+        # A third of the pages send an ETag, a third Last-Modified, a third nothing
+        version = self.versions[page]
+        if page % 3 == 0:
+            return {"ETag": f'"p{page}-v{version}"'}
+        if page % 3 == 1:
+            return {"Last-Modified": formatdate(BASE_TIME + version * 3600, usegmt=True)}
+        return {}
+
+    def body(self, page):
+        version = self.versions[page]
+        if page == 0:
+            links = "".join(f'<li><a href="/index.php?tcf={i}">पृष्ठ {i}</a></li>' for i in sorted(self.versions))
+        else:
+            links = f'<a href="/index.php?tcf=0">मुख्यपृष्ठ</a> <a href="/index.php?tcf={page + 1}">पुढे</a>'
+        return (f"<html><body><h1>पृष्ठ {page}</h1><p>SCERT सूचना {page}, आवृत्ती {version}</p>"
+                f"{links}</body></html>").encode("utf-8")
+
+    def is_fresh(self, page, headers):
+        current = self.validators(page)
+        if "ETag" in current and headers.get("If-None-Match") == current["ETag"]:
+            return True
+        if "Last-Modified" in current and headers.get("If-Modified-Since"):
+            since = parsedate_to_datetime(headers["If-Modified-Since"])
+            return since >= parsedate_to_datetime(current["Last-Modified"])
+        return False
+
+
+def start_server(site, latency):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            page = int(parse_qs(urlparse(self.path).query).get("tcf", ["0"])[0])
+            with site.lock:
+                if page not in site.versions:
+                    site.requests["404"] += 1
+                    self.send_error(404)
+                    return
+                if site.is_fresh(page, self.headers):
+                    site.requests["304"] += 1
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                site.requests["200"] += 1
+                body, validators = site.body(page), site.validators(page)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in validators.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class CountingFetcher(HttpFetcher):
+    """Stands in for the browser; counts full page renders."""
+
+    renders = 0
+
+    async def fetch(self, url):
+        self.renders += 1
+        return await super().fetch(url)
+
+
+async def run_crawl(start_url, state, output_dir, changes_path):
+    async with CountingFetcher() as fetcher:
+        start = time.perf_counter()
+        await crawl(start_url, fetcher=fetcher, max_pages=10_000, max_depth=50, concurrency=8, rate=0,
+                    output_dir=output_dir, state=state, changes_path=changes_path, verbose=False)
+        return fetcher.renders, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.05, help="server seconds per response")
+    args = parser.parse_args()
+
+    site = Site(args.pages)
+    server = start_server(site, args.latency)
+    start_url = f"http://127.0.0.1:{server.server_port}/index.php?tcf=0"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = os.path.join(tmp, "crawled")
+        state_path, changes_path = os.path.join(tmp, "crawl_state.json"), os.path.join(tmp, "crawl_changes.json")
+
+        renders, elapsed = asyncio.run(run_crawl(start_url, CrawlState(state_path, canonicalize_url),
+                                                 output_dir, changes_path))
+        print(f"🕷️ First crawl:  {renders} renders in {elapsed:.2f}s, {len(os.listdir(output_dir))} files")
+
+        # Edit 3 pages (one per validator kind), remove 2, add 2 (index page 0 changes too)
+        edited, removed = [5, 6, 7], [10, 11]
+        with site.lock:
+            for page in edited:
+                site.versions[page] += 1
+            for page in removed:
+                del site.versions[page]
+            for page in (args.pages, args.pages + 1):
+                site.versions[page] = 1
+            site.versions[0] += 1
+            site.requests = dict.fromkeys(site.requests, 0)
+
+        renders, elapsed = asyncio.run(run_crawl(start_url, CrawlState(state_path, canonicalize_url),
+                                                 output_dir, changes_path))
+        print(f"🔁 Second crawl: {renders} renders in {elapsed:.2f}s, {len(os.listdir(output_dir))} files; "
+              f"server answered {site.requests}")
+
+        with open(changes_path, encoding="utf-8") as f:
+            feed = json.load(f)
+        page_ids = lambda kind: sorted(int(parse_qs(urlparse(p["url"]).query)["tcf"][0]) for p in feed[kind])
+        got = {kind: page_ids(kind) for kind in ("new", "changed", "removed")}
+        expected = {"new": [args.pages, args.pages + 1], "changed": [0] + edited, "removed": removed}
+        print(f"📰 Feed: {got}, unchanged={feed['unchanged']}")
+
+    server.shutdown()
+    # Renders: the new and changed pages, plus the dangling next-page link of the last new page
+    ok = got == expected and renders == len(expected["new"]) + len(expected["changed"]) + 1
+    print("✅ Feed matches the edits." if ok else f"❌ Expected {expected}")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# src/bench_retrieval.py
+"""
+Recall@k / latency benchmark for dense vs hybrid (dense + BM25) retrieval.
+
+Labeled query set: JSON lines of
+    {"query": "...", "relevant": ["<file_name or source_url>", ...]}
+A query counts as recalled at k if any of the top-k hits comes from a
+relevant file / URL. Run from the project root:
+
+    python -m src.bench_retrieval --queries eval/queries.jsonl      # real index + E5
+    python -m src.bench_retrieval --synthetic --files 200           # offline plumbing check
+
+The synthetic mode uses FakeEmbedder, which is itself lexical, so it checks
+the plumbing and latency rather than the dense-vs-keyword quality gap.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from src.bench_utils import format_summary, latency_summary
+from src.rag_engine import MarathiRAG
+
+KS = (1, 5, 10, 20)
+
+
+def load_queries(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def is_relevant(hit, relevant):
+    return hit.payload.get("file_name") in relevant or hit.payload.get("source_url") in relevant
+
+
+def evaluate(engine, queries, mode, ks=KS):
+    """Returns ({k: recall}, [latency seconds]) for one retrieval mode."""
+    recalled = {k: 0 for k in ks}
+    latencies = []
+    for q in queries:
+        vector = engine.embed_query(q["query"])  # encode cost excluded: same for both modes
+        start = time.perf_counter()
+        hits = engine.retrieve(q["query"], top_k=max(ks), query_vector=vector, mode=mode)
+        latencies.append(time.perf_counter() - start)
+
+        relevant = set(q["relevant"])
+        ranks = [i for i, hit in enumerate(hits) if is_relevant(hit, relevant)]
+        for k in ks:
+            if ranks and ranks[0] < k:
+                recalled[k] += 1
+    return {k: recalled[k] / len(queries) for k in ks}, latencies
+
+
+def synthetic_setup(tmp, n_files, n_queries):
+    """Ingests a synthetic corpus through src/ingest.py and makes exact-token queries for it."""
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import VectorParams, Distance
+    from src import ingest
+    from src.bench_utils import synthetic_queries, write_synthetic_corpus
+    from src.fakes import FakeEmbedder, FakeGenerativeModel
+    from src.keyword_index import KeywordIndex
+    from src.manifest import IngestManifest
+
+    files = write_synthetic_corpus(os.path.join(tmp, "corpus"), n_files)
+    embedder = FakeEmbedder()
+    client = QdrantClient(":memory:")
+    client.create_collection(ingest.COLLECTION_NAME, vectors_config=VectorParams(size=1024, distance=Distance.COSINE))
+    manifest = IngestManifest(os.path.join(tmp, "manifest.jsonl"))
+    ingest.ingest_sequential(ingest.plan_ingestion(files, client, manifest), client, embedder, manifest)
+
+    index_path = os.path.join(tmp, "keywords.npz")
+    KeywordIndex.build_from_collection(client, ingest.COLLECTION_NAME).save(index_path)
+
+    queries = synthetic_queries(files, n_queries)
+    engine = MarathiRAG(embedder=embedder, client=client, model=FakeGenerativeModel(), cache=False,
+                        keyword_index_path=index_path)
+    return engine, queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", help="labeled JSONL query set")
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--n-queries", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthetic:
+            engine, queries = synthetic_setup(tmp, args.files, args.n_queries)
+        elif args.queries:
+            engine, queries = MarathiRAG(cache=False), load_queries(args.queries)
+        else:
+            parser.error("pass --queries FILE or --synthetic")
+
+        if engine.keyword_index is None:
+            print("⚠️ No keyword index found; hybrid falls back to dense. Run: python -m src.keyword_index build")
+
+        print(f"🔎 {len(queries)} labeled queries\n")
+        for mode in ("dense", "hybrid"):
+            recall, latencies = evaluate(engine, queries, mode)
+            recall_str = "  ".join(f"R@{k}={r:.2f}" for k, r in recall.items())
+            print(f"{format_summary(mode, latency_summary(latencies))}  {recall_str}")
+
+
+if __name__ == "__main__":
+    main()
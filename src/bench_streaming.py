@@ -0,0 +1,64 @@
+# src/bench_streaming.py
+"""
+Perceived-latency benchmark: blocking generate_answer vs stream_answer.
+
+Runs fully offline against FakeGenerativeModel / FakeEmbedder and an
+in-memory Qdrant collection. Run from the project root:
+
+    python -m src.bench_streaming --first-token-delay 0.8 --chunk-delay 0.05
+"""
+import argparse
+import statistics
+import time
+from src.fakes import FakeEmbedder, FakeGenerativeModel, make_memory_collection
+from src.rag_engine import MarathiRAG
+
+QUESTIONS = [
+    "प्रवेश प्रक्रिया कधी सुरू होते?",
+    "What is the exam timetable for class 10?",
+    "SCERT contact number kay aahe?",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--first-token-delay", type=float, default=0.8)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--answer-length", type=int, default=1200)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    embedder = FakeEmbedder()
+    client = make_memory_collection(embedder, [f"SCERT notice {i}: admission and exam details" for i in range(200)])
+    model = FakeGenerativeModel(
+        answer_length=args.answer_length,
+        first_token_delay=args.first_token_delay,
+        chunk_delay=args.chunk_delay,
+    )
+    # Cache disabled so every run pays for generation
+    engine = MarathiRAG(embedder=embedder, client=client, model=model, cache=False)
+
+    blocking, ttft, streamed = [], [], []
+    for run in range(args.runs):
+        question = QUESTIONS[run % len(QUESTIONS)]
+
+        start = time.perf_counter()
+        engine.generate_answer(question)
+        blocking.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        first = None
+        for kind, _ in engine.stream_answer(question):
+            if kind == "text" and first is None:
+                first = time.perf_counter() - start
+        ttft.append(first)
+        streamed.append(time.perf_counter() - start)
+
+    print(f"⏱️ Blocking generate_answer  (first visible text): {statistics.median(blocking):.3f}s")
+    print(f"⚡ stream_answer time-to-first-token:              {statistics.median(ttft):.3f}s")
+    print(f"🏁 stream_answer total:                            {statistics.median(streamed):.3f}s")
+    print(f"📉 Perceived latency reduced by {1 - statistics.median(ttft) / statistics.median(blocking):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# src/bench_suite.py
+"""
+Reproducible end-to-end benchmark: ingest -> retrieve -> answer.
+
+One run, fully offline and seeded:
+  1. writes a synthetic SCERT-like Marathi/English markdown corpus
+  2. ingests it with the real src/ingest.py pipeline into a temporary local
+     Qdrant store (split workers, batched encode, manifest, BM25 index)
+  3. replays a labeled query set through MarathiRAG with FakeGenerativeModel
+     standing in for Gemini (deterministic answers, fixed delay)
+
+and reports ingest throughput, retrieval latency + recall@k, end-to-end
+latency with the per-stage spans from src/tracing.py, and the memory
+high-water mark. Results are saved as JSON; pass --baseline to compare a run
+against an earlier one (exit status 1 if a metric regressed past --tolerance).
+Run from the project root:
+
+    python -m src.bench_suite --out bench_results/baseline.json
+    python -m src.bench_suite --top-k 10 --baseline bench_results/baseline.json
+    python -m src.bench_suite --chunk-size 500 --chunk-overlap 50 --baseline bench_results/baseline.json
+    python -m src.bench_suite --embedder torch --files 200       # real e5 (slow on CPU)
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from qdrant_client import QdrantClient
+from src.bench_utils import (format_summary, latency_summary, peak_rss_mb, rss_mb, synthetic_queries,
+                             write_synthetic_corpus)
+from src.collection_config import PROFILES, create_collection
+from src.embedders import BACKENDS, load_embedder
+from src.fakes import FakeEmbedder, FakeGenerativeModel
+from src.tracing import Tracer
+
+# --- CONFIGURATION ---
+RESULTS_DIR = "bench_results"
+KS = (1, 5, 10, 20)
+WARMUP_QUERIES = 3
+# (metric path, "higher" or "lower" is better)
+COMPARED_METRICS = [
+    ("ingest.chunks_per_sec", "higher"),
+    ("retrieval.latency.p50_ms", "lower"),
+    ("retrieval.latency.p95_ms", "lower"),
+    ("retrieval.recall.1", "higher"),
+    ("retrieval.recall.5", "higher"),
+    ("retrieval.recall.20", "higher"),
+    ("end_to_end.latency.p50_ms", "lower"),
+    ("end_to_end.latency.p95_ms", "lower"),
+    ("end_to_end.prompt_tokens_mean", "lower"),
+    ("memory.peak_rss_mb", "lower"),
+]
+
+
+def children_peak_rss_mb():
+    """Largest resident set of any finished child process (the split workers), in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_embedder(args):
+    if args.embedder == "fake":
+        # Fixed per-call overhead + per-item cost, like a CPU forward pass
+        return FakeEmbedder(call_delay=args.encode_call_ms / 1000, item_delay=args.encode_item_ms / 1000)
+    return load_embedder(args.embedder)
+
+
+def run_ingest(args, tmp, embedder):
+    """Corpus -> src/ingest.py pipeline -> local Qdrant. Returns (client, files, report)."""
+    # Split workers read these when they build their chunker
+    os.environ["CHUNK_SIZE"] = str(args.chunk_size)
+    os.environ["CHUNK_OVERLAP"] = str(args.chunk_overlap)
+    from src import ingest
+    from src.manifest import IngestManifest
+
+    files = write_synthetic_corpus(os.path.join(tmp, "corpus"), args.files, seed=args.seed,
+                                   sections=args.sections)
+    corpus_mb = sum(os.path.getsize(f) for f in files) / 1e6
+
+    client = QdrantClient(path=os.path.join(tmp, "qdrant_db"))
+    create_collection(client, ingest.COLLECTION_NAME, args.profile)
+    manifest = IngestManifest(os.path.join(tmp, "ingest_manifest.jsonl"))
+
+    start = time.perf_counter()
+    plan = ingest.plan_ingestion(files, client, manifest)
+    chunks = ingest.ingest_pipelined(plan, client, embedder, manifest, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    ingest.build_keyword_index(client, path=os.path.join(tmp, "keyword_index.npz"))
+
+    return client, files, {
+        "files": len(files),
+        "corpus_mb": round(corpus_mb, 2),
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "chunks_per_sec": round(chunks / elapsed, 1),
+        "files_per_sec": round(len(files) / elapsed, 1),
+        "rss_after_mb": round(rss_mb(), 1),
+    }
+
+
+def is_relevant(hit, relevant):
+    return hit.payload.get("file_name") in relevant or hit.payload.get("source_url") in relevant
+
+
+def run_queries(engine, queries, ks=KS):
+    """Retrieval (recall@k, search latency) and full answers (end-to-end latency) per query."""
+    for q in queries[:WARMUP_QUERIES]:
+        engine.generate_answer(q["query"])
+    engine.tracer = Tracer()  # Keep the warmup out of the span percentiles
+
+    recalled = {k: 0 for k in ks}
+    reciprocal_ranks = []
+    search_latencies, answer_latencies, prompt_tokens = [], [], []
+    for q in queries:
+        vector = engine.embed_query(q["query"])
+        start = time.perf_counter()
+        hits = engine.retrieve(q["query"], top_k=max(ks), query_vector=vector)
+        search_latencies.append(time.perf_counter() - start)
+
+        relevant = set(q["relevant"])
+        ranks = [i for i, hit in enumerate(hits) if is_relevant(hit, relevant)]
+        reciprocal_ranks.append(1 / (ranks[0] + 1) if ranks else 0.0)
+        for k in ks:
+            if ranks and ranks[0] < k:
+                recalled[k] += 1
+
+        start = time.perf_counter()
+        engine.generate_answer(q["query"])
+        answer_latencies.append(time.perf_counter() - start)
+        prompt_tokens.append(engine.tracer.last().get("prompt_tokens", 0))
+
+    return {
+        "latency": latency_summary(search_latencies),
+        "recall": {str(k): round(recalled[k] / len(queries), 4) for k in ks},
+        "mrr": round(sum(reciprocal_ranks) / len(queries), 4),
+    }, {
+        "latency": latency_summary(answer_latencies),
+        "spans": engine.tracer.summary(),
+        "prompt_tokens_mean": round(sum(prompt_tokens) / len(prompt_tokens), 1),
+    }
+
+
+def lookup(results, path):
+    value = results
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(results, baseline, tolerance):
+    """Prints current vs baseline per metric; returns the metrics that got worse than the tolerance."""
+    if baseline["config"] != results["config"]:
+        changed = sorted(k for k in set(baseline["config"]) | set(results["config"])
+                         if baseline["config"].get(k) != results["config"].get(k))
+        print(f"ℹ️ Config differs from the baseline: {', '.join(changed)}")
+
+    regressions = []
+    print(f"\n📊 vs baseline ({baseline['meta'].get('git_commit')}, {baseline['meta']['timestamp']}):")
+    for path, better in COMPARED_METRICS:
+        old, new = lookup(baseline, path), lookup(results, path)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old if old else 0.0
+        worse = change < -tolerance if better == "higher" else change > tolerance
+        if worse:
+            regressions.append(path)
+        mark = "❌" if worse else ("✅" if (change > 0) == (better == "higher") and change else "  ")
+        print(f"  {mark} {path:<32} {old:>10.4g} -> {new:>10.4g}  ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--sections", type=int, default=4, help="sections per synthetic page")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--embedder", choices=BACKENDS, default="fake")
+    parser.add_argument("--encode-call-ms", type=float, default=20, help="fake model cost per encode() call")
+    parser.add_argument("--encode-item-ms", type=float, default=2, help="fake model cost per text")
+    parser.add_argument("--llm-ms", type=float, default=50, help="fake Gemini latency per answer")
+    parser.add_argument("--workers", type=int, default=None, help="split worker processes (default: ingest's)")
+    parser.add_argument("--profile", choices=PROFILES, default="default", help="collection storage profile")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--chunk-overlap", type=int, default=None)
+    parser.add_argument("--top-k", type=int, default=20, help="hits per question sent to context building")
+    parser.add_argument("--mode", choices=["dense", "hybrid"], default="dense")
+    parser.add_argument("--out", help=f"results JSON (default: {RESULTS_DIR}/<timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression per metric")
+    args = parser.parse_args()
+
+    from src import chunker, ingest
+    args.workers = args.workers or ingest.SPLIT_WORKERS
+    args.chunk_size = args.chunk_size or chunker.CHUNK_SIZE
+    args.chunk_overlap = args.chunk_overlap if args.chunk_overlap is not None else chunker.CHUNK_OVERLAP
+
+    config = {k: v for k, v in vars(args).items() if k not in ("out", "baseline", "tolerance")}
+    print(f"🧪 Benchmark: {args.files} files, {args.queries} queries, embedder={args.embedder}, "
+          f"chunks {args.chunk_size}/{args.chunk_overlap}, top_k={args.top_k}, {args.mode}\n")
+
+    from src.rag_engine import MarathiRAG
+    embedder = make_embedder(args)
+    with tempfile.TemporaryDirectory() as tmp:
+        client, files, ingest_report = run_ingest(args, tmp, embedder)
+        print(f"⚡ Ingest: {ingest_report['chunks']} chunks in {ingest_report['seconds']:.2f}s "
+              f"-> {ingest_report['chunks_per_sec']:.1f} chunks/sec")
+
+        model = FakeGenerativeModel(first_token_delay=args.llm_ms / 1000, chunk_delay=0)
+        engine = MarathiRAG(embedder=embedder, client=client, model=model, cache=False, top_k=args.top_k,
+                            retrieval_mode=args.mode, keyword_index_path=os.path.join(tmp, "keyword_index.npz"))
+        queries = synthetic_queries(files, args.queries, seed=args.seed + 1)
+        retrieval, end_to_end = run_queries(engine, queries)
+        client.close()
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": config,
+        "ingest": ingest_report,
+        "retrieval": retrieval,
+        "end_to_end": end_to_end,
+        "memory": {
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "split_worker_peak_rss_mb": children_peak_rss_mb(),
+        },
+    }
+
+    recall_str = "  ".join(f"R@{k}={r:.2f}" for k, r in retrieval["recall"].items())
+    print(f"{format_summary('retrieve', retrieval['latency'])}  {recall_str}  MRR={retrieval['mrr']:.3f}")
+    print(f"{format_summary('generate_answer', end_to_end['latency'])}  "
+          f"~{end_to_end['prompt_tokens_mean']:.0f} prompt tokens")
+    print("   " + "  ".join(f"{name} {s['p50_ms']:.1f}/{s['p95_ms']:.1f}ms"
+                           for name, s in end_to_end["spans"].items()) + "  (span p50/p95)")
+    print(f"🧠 Peak RSS {results['memory']['peak_rss_mb']:.0f} MB "
+          f"(split workers {results['memory']['split_worker_peak_rss_mb'] or 0:.0f} MB)")
+
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"💾 Saved {out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
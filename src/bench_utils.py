@@ -0,0 +1,210 @@
+# src/bench_utils.py
+"""Small helpers shared by the src/bench_*.py scripts."""
+import os
+import numpy as np
+
+# Mixed Marathi / English / Hinglish questions in the style of real traffic
+SAMPLE_QUESTIONS = [
+    "प्रवेश प्रक्रिया कधी सुरू होते?",
+    "What is the exam timetable for class 10?",
+    "SCERT contact number kay aahe?",
+    "शिष्यवृत्ती परीक्षेचा निकाल कुठे पाहायचा?",
+    "Teacher training registration last date",
+    "NAS survey results Maharashtra",
+    "डी.एल.एड. प्रवेशाची पात्रता काय आहे?",
+    "Where can I download the syllabus PDF?",
+]
+
+
+def latency_summary(seconds):
+    """p50/p95/p99/mean of a list of durations, in milliseconds."""
+    if not seconds:
+        return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+    ms = np.asarray(seconds) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": len(ms),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "mean_ms": round(float(ms.mean()), 2),
+    }
+
+
+def rss_mb():
+    """Current resident memory of this process in MB (psutil if available)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """High-water mark of resident memory of this process in MB."""
+    import sys
+    try:
+        import resource
+    except ImportError:  # Windows
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1e6
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def format_summary(label, summary):
+    return (f"{label:<28} n={summary['count']:<5} p50={summary['p50_ms']:>8.1f}ms "
+            f"p95={summary['p95_ms']:>8.1f}ms p99={summary['p99_ms']:>8.1f}ms")
+
+
+# --- SYNTHETIC CORPUS ---
+MARATHI_WORDS = (
+    "शिक्षण प्रवेश परीक्षा वेळापत्रक शाळा शिक्षक विद्यार्थी प्रशिक्षण अभ्यासक्रम परिपत्रक "
+    "निकाल अर्ज दिनांक संपर्क कार्यालय जिल्हा राज्य मंडळ योजना माहिती"
+).split()
+ENGLISH_WORDS = (
+    "education admission exam timetable school teacher student training syllabus circular "
+    "result application date contact office district state council scheme information"
+).split()
+
+
+def synthetic_page(rng, index, sections=6, paragraphs=3):
+    """One crawled-page-like markdown document (with the scraper's Source: header)."""
+    lines = [f"Source: https://www.maa.ac.in/index.php?tcf=page{index}", "", f"# SCERT पृष्ठ {index} / Page {index}"]
+    for s in range(sections):
+        lines.append(f"\n## विभाग {s} Section {s}")
+        for _ in range(paragraphs):
+            words = rng.choice(MARATHI_WORDS + ENGLISH_WORDS, size=rng.integers(40, 120))
+            lines.append(" ".join(words) + f" फोन 020-2447{index % 10000:04d}.")
+        lines.append("| क्र. | तपशील | दिनांक |\n|---|---|---|\n| 1 | " + " ".join(rng.choice(MARATHI_WORDS, 5)) + " | 2024-06-01 |")
+    return "\n".join(lines) + "\n"
+
+
+def write_synthetic_corpus(directory, n_files, seed=0, **page_kwargs):
+    """Writes n_files synthetic .md pages into directory. Returns their paths."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(n_files):
+        path = os.path.join(directory, f"www.maa.ac.in_index.php_tcf=page{i}.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(synthetic_page(rng, i, **page_kwargs))
+        paths.append(path)
+    return paths
+
+
+def synthetic_queries(files, n_queries, seed=1):
+    """
+    Labeled queries for a write_synthetic_corpus() corpus: every page carries a
+    unique phone number "020-2447NNNN", asked about in Marathi or English.
+    Returns [{"query", "relevant": [file_name]}] (the bench_retrieval format).
+    """
+    rng = np.random.default_rng(seed)
+    templates = ("020-2447{:04d} हा क्रमांक कोणत्या कार्यालयाचा आहे?",
+                 "Which office has the phone number 020-2447{:04d}?")
+    return [
+        {"query": templates[n % 2].format(int(i) % 10000), "relevant": [os.path.basename(files[i])]}
+        for n, i in enumerate(rng.choice(len(files), size=min(n_queries, len(files)), replace=False))
+    ]
+
+
+# --- SYNTHETIC DOCUMENTS ---
+def _pdf_text(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def synthetic_pdf_page(index, paragraphs=3, table_rows=4):
+    """Content stream of one fixture page: a heading, body lines and a ruled table."""
+    ops = [f"BT /F2 16 Tf 50 790 Td {_pdf_text(f'Circular {index}: Exam Timetable')} Tj ET",
+           "BT /F1 10 Tf 50 760 Td 14 TL"]
+    for p in range(paragraphs):
+        ops.append(f"{_pdf_text(f'Paragraph {p} of page {index}: candidates must register before the due date.')} Tj T*")
+        ops.append(f"{_pdf_text(f'For details contact the SCERT office, phone 020-2447{index % 10000:04d}.')} Tj T* T*")
+    ops.append("ET")
+
+    top, widths = 740 - paragraphs * 42, (60, 200, 120)
+    rows = [("No.", "Subject", "Date")] + [(str(r), f"Subject {index}-{r}", f"2024-06-{r:02d}")
+                                           for r in range(1, table_rows + 1)]
+    for r, row in enumerate(rows):
+        x, y = 50, top - (r + 1) * 20
+        for width, cell in zip(widths, row):
+            ops.append(f"{x} {y} {width} 20 re S")
+            ops.append(f"BT /F1 10 Tf {x + 4} {y + 6} Td {_pdf_text(cell)} Tj ET")
+            x += width
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_synthetic_pdf(path, n_pages, **page_kwargs):
+    """
+    Writes an n_pages PDF fixture (Helvetica text, one table per page) without
+    a PDF library. Pages are written one at a time. Returns path.
+    """
+    offsets = {}
+    with open(path, "wb") as f:
+        def obj(number, body):
+            offsets[number] = f.tell()
+            f.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        obj(4, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>")
+        kids = []
+        for i in range(n_pages):
+            page, content = 5 + 2 * i, 6 + 2 * i
+            stream = synthetic_pdf_page(i + 1, **page_kwargs)
+            obj(content, f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+            obj(page, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {content} 0 R "
+                      f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>".encode())
+            kids.append(f"{page} 0 R")
+        obj(2, f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {n_pages} >>".encode())
+
+        xref = f.tell()
+        size = max(offsets) + 1
+        f.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode())
+        for number in range(1, size):
+            f.write(f"{offsets[number]:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return path
+
+
+def write_synthetic_docx(path, n_pages=2):
+    """Minimal .docx (just the parts src/documents.py reads): a heading, text and a table per page."""
+    import zipfile
+    from xml.sax.saxutils import escape
+
+    def p(text, style=None, page_break=False):
+        props = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+        br = '<w:r><w:lastRenderedPageBreak/></w:r>' if page_break else ""
+        return f"<w:p>{props}{br}<w:r><w:t>{escape(text)}</w:t></w:r></w:p>"
+
+    def row(cells):
+        return "<w:tr>" + "".join(f"<w:tc>{p(c)}</w:tc>" for c in cells) + "</w:tr>"
+
+    body = []
+    for i in range(1, n_pages + 1):
+        body.append(p(f"Syllabus part {i}", "Heading1", page_break=i > 1))
+        body.append(p(f"Unit {i} covers admission rules; helpline 020-2447{i:04d}."))
+        body.append("<w:tbl>" + row(["Unit", "Topic"]) + row([str(i), f"Topic {i}"]) + "</w:tbl>")
+    document = ('<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f'<w:body>{"".join(body)}</w:body></w:document>')
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("word/document.xml", document)
+    return path
+
+
+def write_synthetic_xlsx(path, n_rows=5):
+    """Minimal .xlsx (just the parts src/documents.py reads): one sheet, shared + inline strings."""
+    import zipfile
+    ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    shared = ["District", "Schools"]
+    rows = ['<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c></row>']
+    for r in range(2, n_rows + 2):
+        rows.append(f'<row r="{r}"><c r="A{r}" t="inlineStr"><is><t>District {r - 1}</t></is></c>'
+                    f'<c r="C{r}"><v>{r * 10}</v></c></row>')  # Column B left empty
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("xl/workbook.xml", f'<workbook {ns}><sheets><sheet name="Schools 2024"/></sheets></workbook>')
+        z.writestr("xl/sharedStrings.xml", f'<sst {ns}>' + "".join(f"<si><t>{s}</t></si>" for s in shared) + "</sst>")
+        z.writestr("xl/worksheets/sheet1.xml", f'<worksheet {ns}><sheetData>{"".join(rows)}</sheetData></worksheet>')
+    return path
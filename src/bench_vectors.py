@@ -0,0 +1,113 @@
+# src/bench_vectors.py
+"""
+Recall@k, search latency and memory per collection profile at growing sizes.
+
+Points are synthetic 1024-d vectors drawn around a few thousand cluster
+centres (closer to real embeddings than uniform noise). Ground truth is an
+exact search (SearchParams(exact=True)) on the same collection. Run from the
+project root:
+
+    python -m src.bench_vectors --url http://localhost:6333 --sizes 10000 100000 1000000
+    python -m src.bench_vectors --sizes 10000                 # embedded mode, small sizes only
+
+HNSW / quantization / on-disk only take effect on a server (see
+src/collection_config.py); embedded mode reports the brute-force baseline.
+Memory is Qdrant's memory_resident_bytes from /metrics on a server, or this
+process's RSS growth in embedded mode.
+"""
+import argparse
+import re
+import time
+import urllib.request
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import SearchParams
+from src.bench_utils import format_summary, latency_summary, rss_mb
+from src.collection_config import PROFILES, VECTOR_SIZE, create_collection, search_params_for
+
+UPLOAD_CHUNK = 10_000
+
+
+def synthetic_vectors(rng, n, centres):
+    picks = centres[rng.integers(0, len(centres), size=n)]
+    vectors = picks + 0.35 * rng.standard_normal((n, VECTOR_SIZE)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def server_memory_mb(url):
+    try:
+        with urllib.request.urlopen(f"{url.rstrip('/')}/metrics", timeout=5) as response:
+            text = response.read().decode()
+    except OSError:
+        return None
+    match = re.search(r"^memory_resident_bytes\s+([0-9.e+]+)", text, re.MULTILINE)
+    return float(match.group(1)) / 1e6 if match else None
+
+
+def wait_until_indexed(client, name, timeout=3600):
+    start = time.time()
+    while time.time() - start < timeout:
+        if str(client.get_collection(name).status).lower().endswith("green"):
+            return
+        time.sleep(2)
+
+
+def run(client, args, size, profile, rng, centres, queries):
+    name = f"bench_{profile.replace('-', '_')}_{size}"
+    if client.collection_exists(name):
+        client.delete_collection(name)
+
+    base_mem = server_memory_mb(args.url) if args.url else rss_mb()
+    create_collection(client, name, profile)
+    start = time.perf_counter()
+    for offset in range(0, size, UPLOAD_CHUNK):
+        n = min(UPLOAD_CHUNK, size - offset)
+        client.upload_collection(collection_name=name, vectors=synthetic_vectors(rng, n, centres),
+                                 ids=range(offset, offset + n), batch_size=256)
+    wait_until_indexed(client, name)
+    build_s = time.perf_counter() - start
+
+    params = search_params_for(client, name)
+    latencies, recalls = [], []
+    for q in queries:
+        exact = client.query_points(name, query=q, limit=args.k, search_params=SearchParams(exact=True)).points
+        start = time.perf_counter()
+        approx = client.query_points(name, query=q, limit=args.k, search_params=params).points
+        latencies.append(time.perf_counter() - start)
+        recalls.append(len({p.id for p in exact} & {p.id for p in approx}) / args.k)
+
+    mem = server_memory_mb(args.url) if args.url else rss_mb()
+    mem_str = f"{mem - base_mem:>8.0f}MB" if mem is not None and base_mem is not None else "     n/a"
+    print(f"{format_summary(f'{profile} @ {size:,}', latency_summary(latencies))}  "
+          f"recall@{args.k}={np.mean(recalls):.3f}  mem+={mem_str}  build={build_s:.0f}s")
+
+    if not args.keep:
+        client.delete_collection(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Qdrant server URL; embedded mode if omitted")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="don't delete the benchmark collections")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url, timeout=600) if args.url else QdrantClient(":memory:")
+    rng = np.random.default_rng(0)
+    centres = rng.standard_normal((2000, VECTOR_SIZE)).astype(np.float32)
+    queries = synthetic_vectors(rng, args.queries, centres).tolist()
+
+    for size in args.sizes:
+        if not args.url and size > 100_000:
+            print(f"⏭️ Skipping {size:,} points in embedded mode (use --url)")
+            continue
+        for profile in args.profiles:
+            run(client, args, size, profile, rng, centres, queries)
+        print()
+
+
+if __name__ == "__main__":
+    main()
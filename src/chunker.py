@@ -0,0 +1,254 @@
+# src/chunker.py
+"""
+Markdown chunker for the ingest scripts (replaces the LangChain splitters).
+
+Reproduces MarkdownHeaderTextSplitter(# .. ####, strip_headers=True) followed
+by RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100,
+separators=["\\n\\n", "\\n", " | ", "。", " "]) in one pass over the lines:
+same section texts, same header context (" > ".join(metadata.values())) and
+the same chunk boundaries, without building Document objects or importing
+langchain. Input can be any iterable of lines, e.g. an open file.
+
+On top of that it is token-aware: a chunk whose encoder input
+("passage: " + context + "\\n" + text) exceeds MAX_TOKENS is split further,
+instead of being silently truncated by the encoder. The e5 tokenizer is used
+when transformers can load it from the local cache, otherwise a conservative
+character-based estimate. count_tokens=None turns the check off (exact
+LangChain parity).
+
+Check parity / speed against LangChain:  python -m src.bench_chunker
+"""
+from collections import deque
+
+# --- CONFIGURATION ---
+HEADER_NAMES = ("Header 1", "Header 2", "Header 3", "Header 4")  # '#' .. '####'
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 100
+SEPARATORS = ("\n\n", "\n", " | ", "。", " ")
+MAX_TOKENS = 512              # multilingual-e5-large max_seq_length
+PASSAGE_PREFIX = "passage: "
+SECTION_JOIN = "  \n"         # How LangChain joins paragraphs of one section
+
+
+class Chunk:
+    __slots__ = ("text", "headers")
+
+    def __init__(self, text, headers):
+        self.text = text
+        self.headers = headers  # tuple of header texts, outermost first
+
+    @property
+    def context(self):
+        # Same string as " > ".join(chunk.metadata.values()) on a LangChain Document
+        return " > ".join(self.headers)
+
+    def __repr__(self):
+        return f"Chunk({self.context!r}, {self.text[:40]!r})"
+
+
+def _clean(line):
+    line = line.strip()
+    # Drop non-printable characters (zero-width joiners etc.), as LangChain does
+    return line if line.isprintable() else "".join(filter(str.isprintable, line))
+
+
+def _header_level(line):
+    """1-4 for a '#'..'####' header line, else 0."""
+    n = len(line) - len(line.lstrip("#"))
+    if 1 <= n <= len(HEADER_NAMES) and (len(line) == n or line[n] == " "):
+        return n
+    return 0
+
+
+def iter_sections(lines):
+    """
+    Yields (headers, text) for each run of content under the same headers.
+    Headers are stripped from the text; paragraphs are joined like LangChain's.
+    As in LangChain, headers are compared with their levels ("#" and "##"
+    with no text differ), and header lines with no content in between don't
+    split a run ("# A", text, "## B", "# A", text is one section).
+    """
+    stack = []          # [(level, text)] of the enclosing headers
+    section = None      # stack of the paragraphs collected so far
+    paragraphs = []     # finished paragraphs under `section`
+    current = []        # lines of the paragraph being read
+    fence = ""          # open code fence ("```" / "~~~"), if any
+
+    def end_paragraph():
+        """Closes the current paragraph. Returns the previous section if this one starts a new one."""
+        nonlocal section, paragraphs, current
+        finished = None
+        if paragraphs and tuple(stack) != section:
+            finished = tuple(text for _, text in section), SECTION_JOIN.join(paragraphs)
+            paragraphs = []
+        section = tuple(stack)
+        paragraphs.append("\n".join(current))
+        current = []
+        return finished
+
+    for line in lines:
+        line = _clean(line)
+        if not fence:
+            if line.startswith("```") and line.count("```") == 1:
+                fence = "```"
+            elif line.startswith("~~~"):
+                fence = "~~~"
+        elif line.startswith(fence):
+            fence = ""
+
+        if fence:
+            current.append(line)   # Code blocks: no header detection, blank lines kept
+            continue
+
+        level = _header_level(line)
+        if line and not level:
+            current.append(line)
+            continue
+        if current:
+            finished = end_paragraph()
+            if finished:
+                yield finished
+        if level:
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, line[level:].strip()))
+
+    if current:
+        finished = end_paragraph()
+        if finished:
+            yield finished
+    if paragraphs:
+        yield tuple(text for _, text in section), SECTION_JOIN.join(paragraphs)
+
+
+def open_headers(lines, headers=()):
+    """Header lines still in effect after `lines`, given the ones in effect before them."""
+    stack = [(_header_level(h), h) for h in headers]
+    for line in lines:
+        line = _clean(line)
+        level = _header_level(line)
+        if level:
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, line))
+    return [h for _, h in stack]
+
+
+def estimate_e5_tokens(text):
+    """
+    Upper-bound-ish XLM-R (e5) token count without the tokenizer: ~3 chars per
+    token for Latin text, ~2 for Devanagari, plus <s> </s>.
+    """
+    # Devanagari is 3 bytes per char in UTF-8, ASCII 1: count non-ASCII without a Python loop
+    non_ascii = (len(text.encode("utf-8")) - len(text)) // 2
+    return int((len(text) - non_ascii) / 3 + non_ascii / 2) + 2
+
+
+def e5_token_counter(model_name=None):
+    """Exact token count with the e5 tokenizer if it is cached locally, else estimate_e5_tokens."""
+    try:
+        from transformers import AutoTokenizer
+        from src.embedders import EMBEDDING_MODEL
+        tokenizer = AutoTokenizer.from_pretrained(model_name or EMBEDDING_MODEL, local_files_only=True)
+    except Exception:
+        return estimate_e5_tokens
+    return lambda text: len(tokenizer(text, add_special_tokens=True)["input_ids"])
+
+
+class MarkdownChunker:
+    def __init__(self, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, separators=SEPARATORS,
+                 max_tokens=MAX_TOKENS, count_tokens=estimate_e5_tokens):
+        """count_tokens: callable text -> int for the token check, or None to skip it."""
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = tuple(separators)
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+        self.token_splits = 0   # chunks that had to be split for the token limit
+
+    def chunks(self, lines):
+        """Yields Chunk records for an iterable of markdown lines."""
+        for headers, text in iter_sections(lines):
+            chunk_texts = self._split(text, self.separators, self.chunk_size, self.chunk_overlap)
+            if self.count_tokens:
+                context_tokens = self.count_tokens(f"{PASSAGE_PREFIX}{' > '.join(headers)}\n")
+                chunk_texts = [piece for t in chunk_texts for piece in self._fit(t, context_tokens)]
+            for chunk_text in chunk_texts:
+                yield Chunk(chunk_text, headers)
+
+    def split_text(self, text):
+        return list(self.chunks(text.split("\n")))
+
+    def split_file(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return list(self.chunks(f))
+
+    # --- RecursiveCharacterTextSplitter(keep_separator=True), without regexes ---
+
+    def _split(self, text, separators, size, overlap):
+        separator, rest = separators[-1], ()
+        for i, sep in enumerate(separators):
+            if not sep:
+                separator = sep
+                break
+            if sep in text:
+                separator, rest = sep, separators[i + 1:]
+                break
+
+        if separator:
+            parts = text.split(separator)
+            splits = [parts[0]] if parts[0] else []
+            splits += [separator + part for part in parts[1:]]   # separator stays at the start
+        else:
+            splits = list(text)
+
+        chunks, good = [], []
+        for piece in splits:
+            if len(piece) < size:
+                good.append(piece)
+                continue
+            if good:
+                chunks.extend(self._merge(good, size, overlap))
+                good = []
+            if rest:
+                chunks.extend(self._split(piece, rest, size, overlap))
+            else:
+                chunks.append(piece)
+        if good:
+            chunks.extend(self._merge(good, size, overlap))
+        return chunks
+
+    @staticmethod
+    def _merge(splits, size, overlap):
+        """Packs small pieces into chunks of <= size chars, carrying up to `overlap` chars over."""
+        chunks, window, total = [], deque(), 0
+        for piece in splits:
+            n = len(piece)
+            if total + n > size and window:
+                chunk = "".join(window).strip()
+                if chunk:
+                    chunks.append(chunk)
+                while total > overlap or (total + n > size and total > 0):
+                    total -= len(window.popleft())
+            window.append(piece)
+            total += n
+        chunk = "".join(window).strip()
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    # --- Token limit ---
+
+    def _fit(self, text, context_tokens):
+        """Splits text until each piece fits the encoder together with its context."""
+        tokens = context_tokens + self.count_tokens(text)
+        if tokens <= self.max_tokens or len(text) <= 32:
+            return [text]
+        self.token_splits += 1
+        room = max(self.max_tokens - context_tokens, 16)
+        size = max(int(len(text) * room / tokens * 0.9), 16)
+        pieces = self._split(text, self.separators, size, min(self.chunk_overlap, size // 4))
+        if len(pieces) == 1 and pieces[0] == text:
+            # No separator to cut at: hard cut
+            pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        return [fitted for piece in pieces for fitted in self._fit(piece, context_tokens)]
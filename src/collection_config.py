@@ -0,0 +1,172 @@
+# src/collection_config.py
+"""
+Storage / index profiles for the site collections, and a migration command.
+
+    default   full float32 vectors in RAM (the original VectorParams)
+    on-disk   float32 vectors + HNSW graph memory-mapped from disk
+    scalar    int8 scalar quantization kept in RAM, originals on disk, rescored
+    binary    1-bit binary quantization in RAM, originals on disk, rescored
+              with 3x oversampling (e5 vectors are 1024-d, which suits it)
+
+Pick one with COLLECTION_PROFILE=<name> when the ingest scripts create the
+collection. MarathiRAG reads the collection's config and adds the matching
+rescoring search params automatically.
+
+Note: embedded mode (QdrantClient(path=...)) accepts these settings but
+always does an exact in-memory search; HNSW, quantization and on-disk storage
+only take effect on a Qdrant server (QdrantClient(url=...)).
+
+Move a site to a new profile: the serving version's points (plus its
+manifest and keyword index) are copied into a new version created under the
+profile, which then goes through src/index_manager.py's validate + swap. The
+serving version is never modified and stays for rollback. --target copies
+into a standalone collection instead (nothing is swapped).
+
+    python -m src.collection_config migrate --profile scalar
+    python -m src.collection_config migrate --profile binary --site other --smoke eval/queries.jsonl
+    python -m src.collection_config migrate --profile binary --target scert_bot_binary
+"""
+import argparse
+import os
+import shutil
+from qdrant_client.models import (
+    BinaryQuantization, BinaryQuantizationConfig, Distance, HnswConfigDiff, PointStruct,
+    QuantizationSearchParams, ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    SearchParams, VectorParams,
+)
+from src import index_manager
+
+VECTOR_SIZE = 1024
+PROFILES = ("default", "on-disk", "scalar", "binary")
+HNSW_EF = 128  # search-time beam width; raise for recall, lower for speed
+OVERSAMPLING = {"scalar": 1.5, "binary": 3.0}
+
+
+def profile_name(profile=None):
+    profile = profile or os.getenv("COLLECTION_PROFILE", "default")
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown collection profile '{profile}'. Choose from: {', '.join(PROFILES)}")
+    return profile
+
+
+def collection_settings(profile=None, size=VECTOR_SIZE):
+    """Keyword arguments for client.create_collection under a profile."""
+    profile = profile_name(profile)
+    if profile == "default":
+        return {"vectors_config": VectorParams(size=size, distance=Distance.COSINE)}
+
+    settings = {
+        "vectors_config": VectorParams(size=size, distance=Distance.COSINE, on_disk=True),
+        "hnsw_config": HnswConfigDiff(m=16, ef_construct=128, on_disk=(profile == "on-disk")),
+    }
+    if profile == "scalar":
+        settings["quantization_config"] = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    elif profile == "binary":
+        settings["quantization_config"] = BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return settings
+
+
+def create_collection(client, collection_name, profile=None, size=VECTOR_SIZE):
+    client.create_collection(collection_name=collection_name, **collection_settings(profile, size))
+
+
+def search_params_for(client, collection_name):
+    """Search params matching how the collection was created (None = server defaults)."""
+    config = client.get_collection(collection_name).config
+    quantization = config.quantization_config
+    if quantization is None:
+        return SearchParams(hnsw_ef=HNSW_EF) if config.hnsw_config and config.params.vectors.on_disk else None
+
+    kind = "binary" if getattr(quantization, "binary", None) is not None else "scalar"
+    return SearchParams(
+        hnsw_ef=HNSW_EF,
+        quantization=QuantizationSearchParams(rescore=True, oversampling=OVERSAMPLING[kind]),
+    )
+
+
+def copy_points(client, source, target, batch_size=256):
+    """Copies every point (vector + payload) from source to target. Returns the count."""
+    copied, offset = 0, None
+    while True:
+        records, offset = client.scroll(collection_name=source, limit=batch_size, offset=offset,
+                                        with_payload=True, with_vectors=True)
+        if records:
+            client.upsert(collection_name=target, points=[
+                PointStruct(id=r.id, vector=r.vector, payload=r.payload) for r in records
+            ])
+            copied += len(records)
+        if offset is None:
+            return copied
+
+
+def copy_collection(client, source, target, profile):
+    """Copies `source` into a new collection `target` created under `profile`. Returns the count."""
+    if client.collection_exists(target) or index_manager.resolve(client, target) != target:
+        raise RuntimeError(f"'{target}' already exists; pick a new name.")
+    expected = client.count(collection_name=source, exact=True).count
+    create_collection(client, target, profile)
+    copied = copy_points(client, source, target)
+    if copied != expected:
+        client.delete_collection(target)
+        raise RuntimeError(f"Copied {copied} points but {source} has {expected}; {source} left unchanged.")
+    return copied
+
+
+def migrate(client, profile, site=index_manager.SITE):
+    """
+    Copies the site's serving version into a new version under `profile`
+    (not serving yet; promote it with index_manager). Returns (version, points).
+    """
+    alias = index_manager.alias_name(site)
+    if index_manager.is_legacy(client, site):
+        raise RuntimeError(f"'{alias}' is still a plain collection. Run 'python -m src.index_manager adopt' first.")
+    source = index_manager.serving_version(client, site)
+    if source is None:
+        raise RuntimeError(f"'{alias}' serves nothing yet: ingest with COLLECTION_PROFILE={profile} instead.")
+
+    collection = index_manager.new_version_name(client, site)
+    copied = copy_collection(client, source, collection, profile)
+    # Same points, so the same manifest and keyword index: incremental ingests keep working
+    os.makedirs(os.path.dirname(index_manager.manifest_path(collection)), exist_ok=True)
+    for path in (index_manager.manifest_path, index_manager.keyword_index_path):
+        if os.path.exists(path(source)):
+            shutil.copyfile(path(source), path(collection))
+    return collection, copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--profile", choices=PROFILES, required=True)
+    parser.add_argument("--site", default=index_manager.SITE, help="whose serving version to migrate")
+    parser.add_argument("--target", help="copy into this new standalone collection instead (no swap)")
+    parser.add_argument("--smoke", help="smoke query JSONL checked before swapping (see src/index_manager.py)")
+    parser.add_argument("--embedder", help="encoder backend for the smoke queries (default: $EMBEDDER_BACKEND or torch)")
+    parser.add_argument("--no-swap", action="store_true", help="build the new version only")
+    parser.add_argument("--force", action="store_true", help="swap even if validation fails")
+    args = parser.parse_args()
+
+    client = index_manager.connect()
+    alias = index_manager.alias_name(args.site)
+    if args.target:
+        source = index_manager.resolve(client, alias)
+        print(f"🔁 Copying '{source}' into '{args.target}' with profile '{args.profile}'...")
+        copied = copy_collection(client, source, args.target, args.profile)
+        print(f"✅ {copied} points now in '{args.target}'.")
+        return
+
+    print(f"🔁 Migrating '{alias}' to profile '{args.profile}'...")
+    collection, copied = migrate(client, args.profile, args.site)
+    print(f"✅ {copied} points copied into {collection}.")
+    if args.no_swap:
+        return
+    from src.embedders import connect_embedder
+
+    index_manager.promote(client, collection, connect_embedder(args.embedder), args.site, expected_points=copied,
+                          smoke_queries=index_manager.load_smoke_queries(args.smoke), force=args.force)
+
+
+if __name__ == "__main__":
+    main()
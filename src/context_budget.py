@@ -0,0 +1,137 @@
+# src/context_budget.py
+"""
+Context assembly between retrieve() and the Gemini prompt.
+
+The 20 retrieved chunks often overlap (the splitter uses chunk_overlap=100)
+or repeat the same page section. ContextBudgeter:
+  1. merges overlapping / contained chunks from the same file,
+  2. drops near-duplicates by embedding similarity (vectors from Qdrant),
+  3. optionally reranks,
+  4. packs blocks greedily, best first, under a token budget,
+and reports how many prompt tokens that saved.
+"""
+import numpy as np
+
+DEFAULT_TOKEN_BUDGET = 6000
+
+
+def estimate_tokens(text):
+    """
+    Rough Gemini token count without a network call: ~4 chars per token for
+    Latin text, ~2.5 for Devanagari (which tokenizes less efficiently).
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return int((len(text) - non_ascii) / 4 + non_ascii / 2.5) + 1
+
+
+def source_link(payload):
+    """A chunk's source URL; chunks of a converted PDF link to their page."""
+    url = payload.get('source_url', '#')
+    return f"{url}#page={payload['page']}" if payload.get('page') else url
+
+
+def format_block(block):
+    # Format: [Source URL] Content...
+    return f"Source: {block['url']}\nSection: {block['section']}\nContent: {block['text']}"
+
+
+def _overlap(a, b, min_len=20, max_len=300):
+    """Length of the longest suffix of `a` that is a prefix of `b` (0 if < min_len)."""
+    for n in range(min(len(a), len(b), max_len), min_len - 1, -1):
+        if a.endswith(b[:n]):
+            return n
+    return 0
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class ContextBudgeter:
+    def __init__(self, max_tokens=DEFAULT_TOKEN_BUDGET, dedupe_threshold=0.97, reranker=None,
+                 count_tokens=estimate_tokens):
+        """
+        reranker: optional callable (query, [texts]) -> [scores], higher is better
+        count_tokens: callable text -> int, e.g. a real tokenizer
+        """
+        self.max_tokens = max_tokens
+        self.dedupe_threshold = dedupe_threshold
+        self.reranker = reranker
+        self.count_tokens = count_tokens
+
+    def assemble(self, query, hits):
+        """Returns (blocks, report); blocks are dicts with url/section/text, best first."""
+        blocks = [{
+            "url": source_link(hit.payload),
+            "section": hit.payload.get('context', ''),
+            "text": hit.payload.get('text', ''),
+            "file_name": hit.payload.get('file_name'),
+            "vector": hit.vector if isinstance(hit.vector, list) else None,
+            "score": hit.score if hit.score is not None else 0.0,
+            "rank": rank,
+        } for rank, hit in enumerate(hits)]
+        tokens_before = sum(self.count_tokens(format_block(b)) for b in blocks)
+
+        merged = self._merge_overlapping(blocks)
+        deduped = self._drop_near_duplicates(merged)
+
+        if self.reranker and deduped:
+            scores = self.reranker(query, [b["text"] for b in deduped])
+            deduped = [b for _, b in sorted(zip(scores, deduped), key=lambda pair: -pair[0])]
+
+        packed, used = [], 0
+        for block in deduped:
+            cost = self.count_tokens(format_block(block))
+            if used + cost <= self.max_tokens:
+                packed.append(block)
+                used += cost
+
+        report = {
+            "hits": len(hits),
+            "merged": len(blocks) - len(merged),
+            "near_duplicates": len(merged) - len(deduped),
+            "over_budget": len(deduped) - len(packed),
+            "blocks": len(packed),
+            "tokens_before": tokens_before,
+            "tokens_after": used,
+            "tokens_saved": tokens_before - used,
+        }
+        return packed, report
+
+    def _merge_overlapping(self, blocks):
+        """Joins chunks of the same file + section that overlap or contain each other."""
+        merged = []
+        for block in blocks:
+            for other in merged:
+                if other["file_name"] != block["file_name"] or other["section"] != block["section"]:
+                    continue
+                if block["text"] in other["text"]:
+                    break
+                if other["text"] in block["text"]:
+                    other["text"] = block["text"]
+                    break
+                n = _overlap(other["text"], block["text"])
+                if n:
+                    other["text"] += block["text"][n:]
+                    break
+                n = _overlap(block["text"], other["text"])
+                if n:
+                    other["text"] = block["text"] + other["text"][n:]
+                    break
+            else:
+                merged.append(dict(block))
+        return merged
+
+    def _drop_near_duplicates(self, blocks):
+        """Drops blocks whose vector is almost identical to a better-ranked one."""
+        kept, kept_units = [], []
+        for block in blocks:
+            if block["vector"] is not None:
+                unit = _unit(block["vector"])
+                if kept_units and float(np.max(np.stack(kept_units) @ unit)) >= self.dedupe_threshold:
+                    continue
+                kept_units.append(unit)
+            kept.append(block)
+        return kept
@@ -0,0 +1,169 @@
+# src/crawl_state.py
+"""
+Per-URL crawl state for conditional re-crawls, and the changed-pages feed.
+
+For every page the crawler has seen it keeps the HTTP validators (ETag,
+Last-Modified), a hash of the raw HTTP body from the cheap probe, a hash of
+the extracted markdown, the output file name and the page's links (so an
+unchanged page's links can be followed without rendering it again).
+
+Each crawl is a "run". At the end of a complete run, pages not seen in it are
+reported as removed, and crawl_changes.json lists what changed:
+
+    {"run": 7, "finished_at": "...", "complete": true, "unchanged": 412,
+     "new": [{"url": ..., "file_name": ...}], "changed": [...],
+     "removed": [{"url": ..., "file_name": ..., "confirmed": true}]}
+
+A removal is confirmed when the page answered 404 / 410; an unconfirmed one
+was only not reached. `python -m src.ingest --changes crawl_changes.json`
+consumes it (deleting unconfirmed removals only with --purge-unseen).
+"""
+import hashlib
+import json
+import os
+import time
+
+CRAWL_STATE_FILE = "crawl_state.json"
+CHANGES_FILE = "crawl_changes.json"
+
+
+def content_hash(text):
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return hashlib.sha256(text).hexdigest()
+
+
+class CrawlState:
+    def __init__(self, path=CRAWL_STATE_FILE, key=None):
+        """key: function url -> dedupe key (the crawler passes canonicalize_url)."""
+        self.path = path
+        self.key = key or (lambda url: url)
+        self.pages = {}
+        self.run_id = 0
+        self.run_open = False
+        self.changes = {}  # key -> {"status", "url", "file_name"} for the current run
+        self.unchanged = 0
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.pages = data.get("pages", {})
+            self.run_id = data.get("run_id", 0)
+            self.run_open = data.get("run_open", False)
+            self.changes = data.get("changes", {})
+            self.unchanged = data.get("unchanged", 0)
+
+    def begin_run(self, resume=False):
+        """Starts a new run, or continues an interrupted one when resuming."""
+        if resume and self.run_open:
+            return
+        self.run_id += 1
+        self.run_open = True
+        self.changes = {}
+        self.unchanged = 0
+
+    def get(self, url):
+        return self.pages.get(self.key(url))
+
+    def mark_unchanged(self, url, headers=None):
+        entry = self.pages[self.key(url)]
+        entry["seen_run"] = self.run_id
+        self._update_validators(entry, headers)
+        self.unchanged += 1
+
+    def touch(self, url):
+        """Page could not be fetched this run (timeout, 5xx): keep it rather than report it removed."""
+        entry = self.pages.get(self.key(url))
+        if entry:
+            entry["seen_run"] = self.run_id
+
+    def record(self, url, file_name, markdown=None, headers=None, probe_hash=None, links=(), file_hash=None,
+               markdown_hash=None):
+        """
+        Stores a freshly rendered page. Returns "new", "changed" or "unchanged".
+        file_hash: sha256 of the document as written / indexed (see page_document).
+        markdown_hash: content_hash(markdown), if the caller hashed it already.
+        """
+        k = self.key(url)
+        new_hash = markdown_hash or content_hash(markdown)
+        entry = self.pages.get(k)
+        if entry is None:
+            status = "new"
+            entry = self.pages[k] = {"url": url}
+        elif entry.get("content_hash") == new_hash:
+            status = "unchanged"
+        else:
+            status = "changed"
+
+        entry.update(content_hash=new_hash, file_hash=file_hash, file_name=file_name, probe_hash=probe_hash,
+                     links=sorted(links), seen_run=self.run_id)
+        self._update_validators(entry, headers)
+        if status == "unchanged":
+            self.unchanged += 1
+        else:
+            self.changes[k] = {"status": status, "url": url, "file_name": file_name}
+        return status
+
+    def forget_unless(self, keep):
+        """Drops entries for which keep(entry) is false, so they are crawled as new. Returns the count."""
+        dropped = [k for k, e in self.pages.items() if not keep(e)]
+        for k in dropped:
+            del self.pages[k]
+        return len(dropped)
+
+    def mark_removed(self, url):
+        """Page answered 404 / 410."""
+        entry = self.pages.pop(self.key(url), None)
+        if entry:
+            self.changes[self.key(url)] = {"status": "removed", "url": entry["url"],
+                                           "file_name": entry.get("file_name"), "confirmed": True}
+        return entry
+
+    def _update_validators(self, entry, headers):
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        if "etag" in headers:
+            entry["etag"] = headers["etag"]
+        if "last-modified" in headers:
+            entry["last_modified"] = headers["last-modified"]
+
+    def finish_run(self, complete):
+        """
+        Closes the run. Only a complete crawl can tell that a page is gone:
+        then every page not seen this run is reported as removed.
+        Returns the removed entries.
+        """
+        removed = []
+        if complete:
+            for k in [k for k, e in self.pages.items() if e.get("seen_run") != self.run_id]:
+                entry = self.pages.pop(k)
+                self.changes[k] = {"status": "removed", "url": entry["url"], "file_name": entry.get("file_name"),
+                                   "confirmed": False}
+                removed.append(entry)
+        self.run_open = False
+        self.complete = complete
+        return removed
+
+    def feed(self):
+        feed = {"run": self.run_id, "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "complete": getattr(self, "complete", False), "unchanged": self.unchanged,
+                "new": [], "changed": [], "removed": []}
+        for change in self.changes.values():
+            page = {"url": change["url"], "file_name": change["file_name"]}
+            if change["status"] == "removed":
+                page["confirmed"] = change.get("confirmed", False)
+            feed[change["status"]].append(page)
+        return feed
+
+    def write_feed(self, path=CHANGES_FILE):
+        _write_json(path, self.feed())
+
+    def save(self):
+        _write_json(self.path, {"run_id": self.run_id, "run_open": self.run_open, "pages": self.pages,
+                                "changes": self.changes, "unchanged": self.unchanged})
+
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
@@ -0,0 +1,325 @@
+# src/documents.py
+"""
+Document links (PDF / Word / Excel) as crawlable pages.
+
+Most of the SCERT site's substance (circulars, syllabi, timetables) lives in
+linked documents rather than in HTML. Given a DocumentFetcher, scraper.crawl()
+follows those links too:
+
+    download --> content-addressed store (documents/<sha256>.pdf)
+             --> text extraction in a process pool, one page at a time
+             --> markdown (documents/<sha256>.md, reused for the same bytes)
+             --> the crawler's usual page path (save_page / sink / crawl state)
+
+Each page starts with a "<!-- page N -->" line; ingest.py splits there and
+stores N as the chunk's `page` payload. Tables become markdown rows
+("| a | b |") so a row isn't torn apart by the chunker; larger-font lines
+become "##" headings. The markdown never sits in memory whole: extraction
+writes it one page at a time, and the crawler hashes and copies it in blocks
+and splits it page by page from the file, so a 500-page PDF costs about as
+much RAM as a 5-page one (plus its list of chunks waiting to be indexed). Scanned PDFs without a
+text layer yield no text (no OCR); legacy .doc / .xls / .ppt are not read.
+
+Local files can be converted without a crawl:
+
+    python -m src.documents circulars/*.pdf --out data/raw_markdown --base-url https://www.maa.ac.in/docs/
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import statistics
+import tempfile
+import urllib.error
+import urllib.request
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse
+from xml.etree import ElementTree
+from tqdm import tqdm
+from src.scraper import DOCUMENT_EXTENSIONS, MAX_DOCUMENT_MB, PageResult, get_safe_filename
+
+# --- CONFIGURATION ---
+DOCUMENT_DIR = "documents"       # Content-addressed store: <sha256><ext> + extracted <sha256>.md
+EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+DOWNLOAD_WORKERS = 4             # (Size cap: scraper.MAX_DOCUMENT_MB, shared with the re-crawl probe)
+HEADING_SIZE_RATIO = 1.15        # Lines this much larger than the page's body text become headings
+PAGE_MARKER = "<!-- page {} -->"
+PAGE_MARKER_RE = re.compile(r"^<!-- page (\d+) -->$")
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+S = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def document_extension(url):
+    """'.pdf' etc. for a document link, else None."""
+    path = urlparse(url).path.lower()
+    return next((ext for ext in DOCUMENT_EXTENSIONS if path.endswith(ext)), None)
+
+
+# --- EXTRACTION (runs in worker processes) ---
+def _cell(text):
+    return " ".join((text or "").split()).replace("|", "\\|")
+
+
+def table_lines(rows):
+    """A table as markdown rows, the first row as its header."""
+    rows = [[_cell(c) for c in row] for row in rows if any(c and str(c).strip() for c in row)]
+    if not rows:
+        return []
+    width = max(map(len, rows))
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    lines = ["| " + " | ".join(rows[0]) + " |", "|" + "---|" * width]
+    return lines + ["| " + " | ".join(row) + " |" for row in rows[1:]]
+
+
+def _inside(obj, bbox):
+    x0, top, x1, bottom = bbox
+    return obj["x0"] >= x0 and obj["x1"] <= x1 and obj["top"] >= top and obj["bottom"] <= bottom
+
+
+def pdf_page_lines(page):
+    """Markdown lines of one pdfplumber page: text and tables in reading order."""
+    tables = page.find_tables()
+    bboxes = [t.bbox for t in tables]
+    if bboxes:
+        # Table cells are rendered as rows below, not again as loose text
+        page = page.filter(lambda obj: obj.get("object_type") != "char" or
+                                       not any(_inside(obj, b) for b in bboxes))
+    text_lines = page.extract_text_lines()
+    sizes = [c["size"] for line in text_lines for c in line["chars"]]
+    body_size = statistics.median(sizes) if sizes else 0
+
+    blocks = []  # (top, lines)
+    for line in text_lines:
+        size = max(c["size"] for c in line["chars"])
+        text = line["text"].strip()
+        if size >= body_size * HEADING_SIZE_RATIO and len(text) < 120:
+            blocks.append((line["top"], ["", f"## {text}", ""]))
+        else:
+            blocks.append((line["top"], [text]))
+    for table, bbox in zip(tables, bboxes):
+        blocks.append((bbox[1], [""] + table_lines(table.extract()) + [""]))
+    blocks.sort(key=lambda block: block[0])
+    return [line for _, lines in blocks for line in lines]
+
+
+def pdf_pages(path):
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        for number, page in enumerate(pdf.pages, 1):
+            try:
+                yield number, pdf_page_lines(page)
+            finally:
+                page.close()  # Drops the page's parsed layout objects
+
+
+def docx_pages(path):
+    """Paragraphs and tables of a .docx; pages break where Word last rendered them."""
+    with zipfile.ZipFile(path) as z, z.open("word/document.xml") as f:
+        body = ElementTree.parse(f).getroot().find(f"{W}body")
+
+    def text(element):
+        return "".join(t.text or "" for t in element.iter(f"{W}t")).strip()
+
+    number, lines = 1, []
+    for element in body:
+        if element.find(f".//{W}lastRenderedPageBreak") is not None or any(
+                br.get(f"{W}type") == "page" for br in element.iter(f"{W}br")):
+            if lines:
+                yield number, lines
+            number, lines = number + 1, []
+        if element.tag == f"{W}tbl":
+            rows = [[text(cell) for cell in row.iter(f"{W}tc")] for row in element.iter(f"{W}tr")]
+            lines += [""] + table_lines(rows) + [""]
+        elif element.tag == f"{W}p" and text(element):
+            style = element.find(f"{W}pPr/{W}pStyle")
+            level = re.match(r"Heading(\d)", style.get(f"{W}val", "")) if style is not None else None
+            lines.append(f"{'#' * min(int(level.group(1)), 4)} {text(element)}" if level else text(element))
+    if lines:
+        yield number, lines
+
+
+def _column(ref):
+    letters = re.match(r"[A-Z]+", ref).group()
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def xlsx_pages(path):
+    """One page per worksheet, its rows as a markdown table (rows streamed from the XML)."""
+    with zipfile.ZipFile(path) as z:
+        shared = []
+        if "xl/sharedStrings.xml" in z.namelist():
+            with z.open("xl/sharedStrings.xml") as f:
+                shared = ["".join(t.text or "" for t in si.iter(f"{S}t"))
+                          for si in ElementTree.parse(f).getroot().iter(f"{S}si")]
+        with z.open("xl/workbook.xml") as f:
+            names = [sheet.get("name") for sheet in ElementTree.parse(f).getroot().iter(f"{S}sheet")]
+        sheets = sorted((n for n in z.namelist() if re.match(r"xl/worksheets/sheet\d+\.xml$", n)),
+                        key=lambda n: int(re.search(r"(\d+)\.xml$", n).group(1)))
+
+        for number, sheet in enumerate(sheets, 1):
+            rows = []
+            with z.open(sheet) as f:
+                for _, row in ElementTree.iterparse(f):
+                    if row.tag != f"{S}row":
+                        continue
+                    values = {}
+                    for c in row.iter(f"{S}c"):
+                        v = c.find(f"{S}v")
+                        if c.get("t") == "s" and v is not None:
+                            values[_column(c.get("r"))] = shared[int(v.text)]
+                        elif c.get("t") == "inlineStr":
+                            values[_column(c.get("r"))] = "".join(t.text or "" for t in c.iter(f"{S}t"))
+                        elif v is not None:
+                            values[_column(c.get("r"))] = v.text
+                    row.clear()
+                    if values:
+                        rows.append([values.get(i, "") for i in range(max(values) + 1)])
+            title = names[number - 1] if number <= len(names) else f"Sheet {number}"
+            yield number, [f"## {title}", ""] + table_lines(rows)
+
+
+EXTRACTORS = {".pdf": pdf_pages, ".docx": docx_pages, ".xlsx": xlsx_pages}
+
+
+def extract_pages(path):
+    """Yields (page number, markdown lines) for a document, one page at a time."""
+    return EXTRACTORS[os.path.splitext(path)[1].lower()](path)
+
+
+def extract_to_markdown(path, out_path, source_url=None):
+    """
+    Writes a document's pages to out_path as they are extracted (with a
+    "Source:" line first if source_url is given). Returns (pages, pages with text).
+    """
+    pages = with_text = 0
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        if source_url:
+            f.write(f"Source: {source_url}\n\n")
+        for number, lines in extract_pages(path):
+            pages += 1
+            if any(line.strip() for line in lines):
+                with_text += 1
+                f.write(PAGE_MARKER.format(number) + "\n" + "\n".join(lines) + "\n\n")
+    os.replace(tmp_path, out_path)
+    return pages, with_text
+
+
+# --- CRAWLING ---
+class DocumentFetcher:
+    """
+    Fetcher for document links (see scraper.crawl(documents=...)): downloads
+    into the content-addressed store and extracts in a process pool. The
+    returned PageResult points at the markdown file (markdown_path) and has
+    the sha256 of the bytes as body_hash (the crawl state's change check).
+    """
+
+    def __init__(self, store_dir=DOCUMENT_DIR, workers=EXTRACT_WORKERS, max_mb=MAX_DOCUMENT_MB):
+        self.store_dir = store_dir
+        self.workers = workers
+        self.max_bytes = max_mb * 1_000_000
+        self.stats = {"downloaded": 0, "extracted": 0, "reused": 0, "pages": 0}
+        self.extractions = {}  # sha256 -> extraction future (this run)
+
+    async def __aenter__(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        self.download_pool = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="download")
+        self.extract_pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.download_pool.shutdown(wait=False)
+        self.extract_pool.shutdown(wait=True, cancel_futures=True)
+
+    def _download(self, url, ext):
+        """Streams url into the store. Returns (document path, sha256, headers)."""
+        request = urllib.request.Request(url, headers={"User-Agent": "SCERT-Sahayak-Crawler"})
+        digest, size = hashlib.sha256(), 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".part")
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response, os.fdopen(fd, "wb") as f:
+                headers = dict(response.headers)
+                for block in iter(lambda: response.read(1 << 20), b""):
+                    size += len(block)
+                    if size > self.max_bytes:
+                        raise ValueError(f"larger than {self.max_bytes // 1_000_000} MB")
+                    digest.update(block)
+                    f.write(block)
+            path = os.path.join(self.store_dir, digest.hexdigest() + ext)
+            os.replace(tmp_path, path)  # Same bytes from another URL: same file
+            return path, digest.hexdigest(), headers
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def fetch(self, url):
+        loop = asyncio.get_running_loop()
+        try:
+            path, digest, headers = await loop.run_in_executor(
+                self.download_pool, self._download, url, document_extension(url))
+        except urllib.error.HTTPError as e:
+            return PageResult(url, False, status=e.code)
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️ Download failed ({e}): {url}")
+            return PageResult(url, False)
+        self.stats["downloaded"] += 1
+
+        markdown_path = os.path.join(self.store_dir, digest + ".md")
+        extraction = self.extractions.get(digest)
+        if extraction is None and not os.path.exists(markdown_path):
+            # Same bytes fetched concurrently under another URL wait for this one
+            extraction = self.extractions[digest] = loop.run_in_executor(
+                self.extract_pool, extract_to_markdown, path, markdown_path)
+            try:
+                pages, with_text = await extraction
+            except Exception:
+                # Later URLs with the same bytes try again instead of re-raising this failure
+                self.extractions.pop(digest, None)
+                raise
+            self.stats["extracted"] += 1
+            self.stats["pages"] += pages
+            if pages and not with_text:
+                print(f"   ⚠️ No text layer (scanned?): {url}")
+        else:
+            self.stats["reused"] += 1
+            if extraction is not None:
+                await extraction
+        # The markdown stays on disk: the crawler hashes, saves and splits it from the file
+        return PageResult(url, True, headers=headers, body_hash=digest, markdown_path=markdown_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="PDF / DOCX / XLSX files")
+    parser.add_argument("--out", required=True, help="directory for the markdown (e.g. ingest.py's DATA_DIR)")
+    parser.add_argument("--base-url", help="Source: URL prefix for the files (default: their local path)")
+    parser.add_argument("--workers", type=int, default=EXTRACT_WORKERS)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    files = [f for f in args.files if os.path.splitext(f)[1].lower() in EXTRACTORS]
+    print(f"📄 Extracting {len(files)} documents with {args.workers} workers...")
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {}
+        for path in files:
+            name = os.path.basename(path)
+            url = args.base_url.rstrip("/") + "/" + name if args.base_url else os.path.abspath(path)
+            out_path = os.path.join(args.out, f"{get_safe_filename(url)}.md")
+            futures[path] = pool.submit(extract_to_markdown, path, out_path, url)
+        pages = 0
+        for path, future in tqdm(futures.items(), desc="Extracting", unit="file"):
+            try:
+                pages += future.result()[0]
+            except Exception as e:
+                print(f"\n❌ Error on {os.path.basename(path)}: {e}")
+    print(f"✅ {pages} pages written to '{args.out}'. Ingest with: python -m src.ingest --data-dir {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+# src/embed_server.py
+"""
+Local embedding service: one e5 model shared by every app replica and ingest job.
+
+    python -m src.embed_server serve                      # http://127.0.0.1:8765
+    python -m src.embed_server serve --embedder onnx-int8 --max-batch 64 --max-wait-ms 5
+    python -m src.embed_server metrics                    # queue depth, batch sizes, latency
+
+Requests from all clients go into one queue; a single encode thread takes
+whatever is waiting (up to --max-batch texts, waiting at most --max-wait-ms
+for more) and runs one batched forward pass, so concurrent users and an
+ingest job share batches instead of each holding their own model.
+
+Endpoints (localhost only):
+    POST /encode   {"texts": [...]}  -> float32 bytes, shape in the X-Shape header
+    GET  /health   model id and vector size
+    GET  /metrics  Prometheus text format
+
+Clients: MarathiRAG and the ingest scripts call connect_embedder() in
+src/embedders.py, which uses the server if EMBED_SERVER_URL (default below)
+answers and loads the model in-process otherwise. EmbeddingClient also falls
+back in-process if the server goes away mid-run.
+"""
+import argparse
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import numpy as np
+
+# --- CONFIGURATION ---
+DEFAULT_URL = "http://127.0.0.1:8765"
+MAX_BATCH_SIZE = 64      # Texts per forward pass
+MAX_WAIT_MS = 5          # How long a lone request waits for company
+LATENCY_WINDOW = 2048    # Recent requests kept for the p50 / p95 metrics
+
+
+def server_url(url=None):
+    return (url or os.getenv("EMBED_SERVER_URL", DEFAULT_URL)).rstrip("/")
+
+
+class _Request:
+    __slots__ = ("texts", "done", "result", "error", "queued_at")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.queued_at = time.perf_counter()
+
+
+class DynamicBatcher:
+    """Coalesces encode requests from many threads into batched forward passes."""
+
+    def __init__(self, embedder, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.queued_texts = 0
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "errors": 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)        # request: queue wait + encode
+        self.encode_latencies = deque(maxlen=LATENCY_WINDOW)
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        threading.Thread(target=self._loop, name="embed-batcher", daemon=True).start()
+
+    def encode(self, texts):
+        request = _Request(texts)
+        with self.lock:
+            self.queued_texts += len(texts)
+        self.queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _loop(self):
+        while True:
+            batch = [self.queue.get()]
+            n = len(batch[0].texts)
+            deadline = time.monotonic() + self.max_wait
+            while n < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                n += len(request.texts)
+            self._run(batch, n)
+
+    def _run(self, batch, n):
+        texts = [text for request in batch for text in request.texts]
+        start = time.perf_counter()
+        try:
+            vectors = np.asarray(self.embedder.encode(texts, batch_size=self.max_batch_size,
+                                                      show_progress_bar=False), dtype=np.float32)
+            error = None
+        except Exception as e:
+            vectors, error = None, e
+        end = time.perf_counter()
+
+        offset = 0
+        for request in batch:
+            if error is None:
+                request.result = vectors[offset:offset + len(request.texts)]
+            else:
+                request.error = error
+            offset += len(request.texts)
+            self.latencies.append(end - request.queued_at)
+            request.done.set()
+
+        with self.lock:
+            self.queued_texts -= n
+            self.stats["requests"] += len(batch)
+            self.stats["texts"] += n
+            self.stats["batches"] += 1
+            self.stats["errors"] += error is not None
+        self.encode_latencies.append(end - start)
+        self.batch_sizes.append(n)
+
+    def metrics(self):
+        def pct(values, q):
+            return float(np.percentile(list(values), q)) if values else 0.0
+
+        lines = [
+            "# TYPE embed_queue_depth gauge", f"embed_queue_depth {self.queued_texts}",
+            "# TYPE embed_queued_requests gauge", f"embed_queued_requests {self.queue.qsize()}",
+        ]
+        for name, value in self.stats.items():
+            lines += [f"# TYPE embed_{name}_total counter", f"embed_{name}_total {value}"]
+        for name, values in (("request_latency_seconds", self.latencies),
+                             ("encode_latency_seconds", self.encode_latencies),
+                             ("batch_size", self.batch_sizes)):
+            lines.append(f"# TYPE embed_{name} summary")
+            lines += [f'embed_{name}{{quantile="{q / 100}"}} {pct(values, q):.6g}' for q in (50, 95)]
+        return "\n".join(lines) + "\n"
+
+
+def make_server(batcher, model_id, port, host="127.0.0.1"):
+    dim = int(batcher.encode(["passage: warmup"]).shape[1])  # Loads lazy weights before serving
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive: clients reuse their connection
+
+        def _reply(self, status, body, content_type, headers=()):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                body = json.dumps({"model": model_id, "dim": dim}).encode()
+                self._reply(200, body, "application/json")
+            elif self.path == "/metrics":
+                self._reply(200, batcher.metrics().encode(), "text/plain; version=0.0.4")
+            else:
+                self._reply(404, b"not found", "text/plain")
+
+        def do_POST(self):
+            if self.path != "/encode":
+                self._reply(404, b"not found", "text/plain")
+                return
+            try:
+                texts = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["texts"]
+                vectors = batcher.encode(texts) if texts else np.zeros((0, dim), dtype=np.float32)
+            except Exception as e:
+                self._reply(500, str(e).encode(), "text/plain")
+                return
+            self._reply(200, vectors.tobytes(), "application/octet-stream",
+                        [("X-Shape", f"{vectors.shape[0]},{vectors.shape[1]}")])
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+class EmbeddingClient:
+    """
+    SentenceTransformer-compatible encode() backed by the embedding server.
+    `fallback` (a zero-argument loader) is used if the server stops answering.
+    """
+
+    def __init__(self, url=None, timeout=60, fallback=None):
+        self.url = server_url(url)
+        parts = urlparse(self.url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.fallback = fallback
+        self._local = None
+        self._conns = threading.local()
+        health = json.loads(self._request("GET", "/health"))  # Raises OSError if nobody is listening
+        self.embedder_id = health["model"]
+        self.dim = health["dim"]
+
+    def _request(self, method, path, body=None):
+        for attempt in range(2):
+            conn = getattr(self._conns, "conn", None)
+            if conn is None:
+                conn = self._conns.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                conn.request(method, path, body=body, headers={"Content-Type": "application/json"} if body else {})
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                self._conns.conn = None
+                if attempt:
+                    raise
+                continue  # Stale keep-alive connection: reconnect once
+            if response.status != 200:
+                raise RuntimeError(f"Embedding server error {response.status}: {data[:200]!r}")
+            if path == "/encode":
+                n, dim = map(int, response.getheader("X-Shape").split(","))
+                return np.frombuffer(data, dtype=np.float32).reshape(n, dim)
+            return data
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if self._local is None:
+            try:
+                vectors = self._request("POST", "/encode", json.dumps({"texts": texts}).encode())
+            except (OSError, http.client.HTTPException):
+                if self.fallback is None:
+                    raise
+                print(f"⚠️ Embedding server {self.url} unreachable; loading the model in-process.")
+                self._local = self.fallback()
+        if self._local is not None:
+            return self._local.encode(sentences, batch_size=batch_size, show_progress_bar=show_progress_bar, **kwargs)
+        return vectors[0] if single else vectors
+
+
+def main():
+    from src.embedders import BACKENDS, embedder_id, load_embedder
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["serve", "metrics"])
+    parser.add_argument("--port", type=int, default=urlparse(server_url()).port)
+    parser.add_argument("--embedder", choices=BACKENDS, help="encoder backend (default: $EMBEDDER_BACKEND or torch)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    if args.command == "metrics":
+        conn = http.client.HTTPConnection("127.0.0.1", args.port, timeout=5)
+        conn.request("GET", "/metrics")
+        print(conn.getresponse().read().decode())
+        return
+
+    print("🧠 Loading Embedding Model...")
+    batcher = DynamicBatcher(load_embedder(args.embedder), args.max_batch, args.max_wait_ms)
+    server = make_server(batcher, embedder_id(args.embedder), args.port)
+    print(f"🚀 Embedding server ready on http://127.0.0.1:{args.port} "
+          f"(batch <= {args.max_batch}, wait <= {args.max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Stopped.")
+
+
+if __name__ == "__main__":
+    main()
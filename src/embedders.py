@@ -0,0 +1,119 @@
+# src/embedders.py
+"""
+Pluggable backends for the multilingual-e5-large encoder.
+
+Every backend returns an object with SentenceTransformer's encode() API:
+
+    torch      fp32 SentenceTransformer (reference, the original behaviour)
+    int8       torch dynamic int8 quantization of the Linear layers (CPU only)
+    onnx       ONNX Runtime via sentence-transformers' ONNX backend
+    onnx-int8  ONNX Runtime with a dynamically quantized model (see export below)
+    fake       src/fakes.FakeEmbedder, for offline benchmarks
+
+Select with EMBEDDER_BACKEND=<name> or the `backend` argument.
+connect_embedder() uses a running embedding server (src/embed_server.py)
+with that backend instead of loading another copy of the model. Check quality
+before switching production: python -m src.eval_embedders
+
+The ONNX backends need `pip install optimum[onnxruntime]`
+(sentence-transformers >= 3.2). Create the int8 ONNX model once with:
+
+    python -m src.embedders export-onnx-int8
+"""
+import argparse
+import os
+
+EMBEDDING_MODEL = 'intfloat/multilingual-e5-large'
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8", "fake")
+DEFAULT_BACKEND = "torch"
+ONNX_INT8_DIR = os.path.join("model_cache", "e5-large-onnx-int8")
+ONNX_INT8_FILE = "model_qint8_avx512_vnni.onnx"
+
+
+def backend_name(backend=None):
+    backend = backend or os.getenv("EMBEDDER_BACKEND", DEFAULT_BACKEND)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedder backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+    return backend
+
+
+def embedder_id(backend=None, model_name=EMBEDDING_MODEL):
+    """Identifies the vectors a backend produces (e.g. for the embedding cache key)."""
+    backend = backend_name(backend)
+    return model_name if backend == DEFAULT_BACKEND else f"{model_name}@{backend}"
+
+
+def load_embedder(backend=None, model_name=EMBEDDING_MODEL):
+    backend = backend_name(backend)
+
+    if backend == "fake":
+        from src.fakes import FakeEmbedder
+        return FakeEmbedder()
+
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    if backend == "int8":
+        import torch
+        model = SentenceTransformer(model_name, device="cpu")
+        # Weights stored as int8, activations quantized on the fly: ~4x smaller Linear layers
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    try:
+        import onnxruntime  # noqa: F401  (fail early with a useful message)
+    except ImportError as e:
+        raise ImportError("The ONNX backends need: pip install optimum[onnxruntime]") from e
+
+    if backend == "onnx":
+        return SentenceTransformer(model_name, backend="onnx")
+
+    # onnx-int8
+    if not os.path.exists(os.path.join(ONNX_INT8_DIR, "onnx", ONNX_INT8_FILE)):
+        raise FileNotFoundError(f"No quantized ONNX model in {ONNX_INT8_DIR}. "
+                                "Run: python -m src.embedders export-onnx-int8")
+    return SentenceTransformer(ONNX_INT8_DIR, backend="onnx", model_kwargs={"file_name": ONNX_INT8_FILE})
+
+
+def connect_embedder(backend=None, url=None):
+    """
+    The shared embedding server (src/embed_server.py) if one is running with
+    the same backend, else the model loaded in-process (the original behaviour).
+    """
+    from src.embed_server import EmbeddingClient, server_url
+
+    def load_local():
+        return load_embedder(backend)
+
+    try:
+        client = EmbeddingClient(url, fallback=load_local)
+    except Exception:
+        return load_local()  # Nothing (usable) listening
+    if client.embedder_id != embedder_id(backend):
+        print(f"⚠️ Embedding server runs {client.embedder_id}, not {embedder_id(backend)}; loading in-process.")
+        return load_local()
+    print(f"🔗 Using the embedding server at {server_url(url)}")
+    return client
+
+
+def export_onnx_int8(model_name=EMBEDDING_MODEL, output_dir=ONNX_INT8_DIR):
+    """Exports the model to ONNX and writes a dynamically int8-quantized copy."""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    model = SentenceTransformer(model_name, backend="onnx")
+    model.save_pretrained(output_dir)
+    export_dynamic_quantized_onnx_model(model, "avx512_vnni", output_dir)
+    print(f"✅ Quantized ONNX model written to {output_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedder backend utilities.")
+    parser.add_argument("command", choices=["export-onnx-int8"])
+    args = parser.parse_args()
+    if args.command == "export-onnx-int8":
+        export_onnx_int8()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# src/embedding_store.py
+"""
+Persistent, content-addressed embedding cache shared by the ingestion scripts.
+
+Each model gets three files in STORE_DIR:
+    <model>.f32    raw float32 rows, memory-mapped for zero-copy reads
+    <model>.keys   16-byte blake2b(model name + prefixed text) per row
+    <model>.used   last-use tick per row (for LRU compaction)
+
+Rows are only ever appended; `compact()` rewrites the files keeping the most
+recently used rows. One writer at a time: don't run two ingest jobs against
+the same store concurrently.
+
+    python -m src.embedding_store stats
+    python -m src.embedding_store compact --max-entries 200000
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import numpy as np
+
+STORE_DIR = "embedding_cache"
+DEFAULT_MODEL = "intfloat/multilingual-e5-large"
+KEY_BYTES = 16
+
+
+class EmbeddingStore:
+    def __init__(self, model_name=DEFAULT_MODEL, dim=1024, store_dir=STORE_DIR):
+        self.model_name = model_name
+        self.dim = dim
+        os.makedirs(store_dir, exist_ok=True)
+
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        base = os.path.join(store_dir, slug)
+        self.vectors_path = base + ".f32"
+        self.keys_path = base + ".keys"
+        self.used_path = base + ".used"
+        self.meta_path = base + ".json"
+
+        self._check_meta()
+        self._load()
+
+        self.hits = 0
+        self.misses = 0
+        self.deduped = 0  # misses served by another copy of the same text in the batch
+
+    def _check_meta(self):
+        meta = {"model_name": self.model_name, "dim": self.dim}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored != meta:
+                raise ValueError(f"Embedding store {self.meta_path} was built for {stored}, not {meta}")
+        else:
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+    def _load(self):
+        keys = np.fromfile(self.keys_path, dtype=f"S{KEY_BYTES}") if os.path.exists(self.keys_path) else np.empty(0, f"S{KEY_BYTES}")
+        rows = os.path.getsize(self.vectors_path) // (4 * self.dim) if os.path.exists(self.vectors_path) else 0
+
+        # An interrupted append can leave one file longer than the other
+        self.count = min(len(keys), rows)
+        self._truncate_to(self.count)
+
+        self._index = {bytes(k): slot for slot, k in enumerate(keys[:self.count])}
+        self._used = np.zeros(self.count, dtype=np.int64)
+        if os.path.exists(self.used_path):
+            used = np.fromfile(self.used_path, dtype=np.int64)[:self.count]
+            self._used[:len(used)] = used
+        self._tick = int(self._used.max()) if self.count else 0
+        self._map()
+
+    def _truncate_to(self, count):
+        for path, row_bytes in [(self.vectors_path, 4 * self.dim), (self.keys_path, KEY_BYTES)]:
+            if os.path.exists(path) and os.path.getsize(path) > count * row_bytes:
+                with open(path, "r+b") as f:
+                    f.truncate(count * row_bytes)
+
+    def _map(self):
+        if self.count:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.count, self.dim))
+        else:
+            self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+
+    def key(self, text):
+        return hashlib.blake2b(f"{self.model_name}\0{text}".encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+    def get(self, text):
+        """Cached vector for `text` as a read-only view into the memory map, or None."""
+        slot = self._index.get(self.key(text))
+        if slot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._tick += 1
+        self._used[slot] = self._tick
+        return self._vectors[slot]
+
+    def add(self, texts, vectors):
+        """Appends new (text, vector) pairs. Texts already in the store are skipped."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        new_keys, new_rows = [], []
+        for text, vector in zip(texts, vectors):
+            k = self.key(text)
+            if k in self._index:
+                continue
+            self._index[k] = self.count + len(new_keys)
+            new_keys.append(k)
+            new_rows.append(vector)
+        if not new_keys:
+            return
+
+        # Vectors first, keys second: a crash in between leaves orphan rows
+        # that _load() truncates, never keys pointing at missing vectors
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.stack(new_rows).tobytes())
+        with open(self.keys_path, "ab") as f:
+            f.write(b"".join(new_keys))
+
+        self._tick += 1
+        self._used = np.concatenate([self._used, np.full(len(new_keys), self._tick, dtype=np.int64)])
+        self.count += len(new_keys)
+        self._map()
+
+    def flush(self):
+        """Persists LRU ticks (vectors and keys are written on every add)."""
+        self._used.tofile(self.used_path)
+
+    def compact(self, max_entries):
+        """Keeps only the `max_entries` most recently used rows."""
+        if self.count <= max_entries:
+            return 0
+        keep = np.sort(np.argsort(self._used)[-max_entries:])
+        keys = np.fromfile(self.keys_path, dtype=f"S{KEY_BYTES}")[:self.count]
+
+        for path, data in [
+            (self.vectors_path, np.ascontiguousarray(self._vectors[keep])),
+            (self.keys_path, keys[keep]),
+            (self.used_path, self._used[keep]),
+        ]:
+            data.tofile(path + ".tmp")
+        del self._vectors  # release the map before replacing the file (Windows)
+        for path in (self.vectors_path, self.keys_path, self.used_path):
+            os.replace(path + ".tmp", path)
+
+        evicted = self.count - len(keep)
+        self._load()
+        return evicted
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "model_name": self.model_name,
+            "entries": self.count,
+            "size_mb": round(self.count * (4 * self.dim + KEY_BYTES + 8) / 1e6, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "encoded": self.misses - self.deduped,
+            "encodes_saved": self.hits + self.deduped,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def report(self):
+        s = self.stats()
+        print(f"🗃️ Embedding cache: {s['encodes_saved']} encodes saved, {s['encoded']} computed "
+              f"(hit rate {s['hit_rate']:.0%}); {s['entries']} entries, {s['size_mb']} MB")
+
+
+class CachedEmbedder:
+    """
+    Wraps a SentenceTransformer-like model so encode() consults the store first.
+    Only the misses (deduplicated) are sent to the model.
+    """
+
+    def __init__(self, model, store):
+        self.model = model
+        self.store = store
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        out = np.empty((len(texts), self.store.dim), dtype=np.float32)
+        missing = {}  # text -> positions needing it (boilerplate repeats across files)
+        for i, text in enumerate(texts):
+            cached = self.store.get(text)
+            if cached is None:
+                missing.setdefault(text, []).append(i)
+            else:
+                out[i] = cached
+
+        if missing:
+            to_encode = list(missing)
+            self.store.deduped += sum(len(positions) for positions in missing.values()) - len(to_encode)
+            vectors = np.asarray(self.model.encode(
+                to_encode, batch_size=batch_size, show_progress_bar=show_progress_bar, **kwargs
+            ), dtype=np.float32)
+            self.store.add(to_encode, vectors)
+            for text, vector in zip(to_encode, vectors):
+                out[missing[text]] = vector
+
+        return out[0] if single else out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or compact the embedding cache.")
+    parser.add_argument("command", choices=["stats", "compact"])
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--max-entries", type=int, default=500_000)
+    args = parser.parse_args()
+
+    store = EmbeddingStore(args.model)
+    if args.command == "compact":
+        evicted = store.compact(args.max_entries)
+        print(f"🧹 Evicted {evicted} least recently used embeddings.")
+    for key, value in store.stats().items():
+        if key not in ("hits", "misses", "encoded", "encodes_saved", "hit_rate"):
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
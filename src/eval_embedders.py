@@ -0,0 +1,127 @@
+# src/eval_embedders.py
+"""
+Quality / speed / memory check of the embedder backends against fp32 torch.
+
+For a sample of corpus chunks and queries it reports, per backend:
+  - cosine drift: 1 - cos(reference vector, backend vector), mean and worst
+  - top-k overlap: |top-k(reference) ∩ top-k(backend)| / k over the queries
+  - encode latency (passages/sec, single-query ms) and resident memory
+Each backend is loaded in its own process so memory numbers don't mix.
+Exits non-zero if a backend misses the quality thresholds. Run from the
+project root:
+
+    python -m src.eval_embedders --backends int8 onnx onnx-int8 --sample 500
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+import numpy as np
+from qdrant_client import QdrantClient
+from src.bench_utils import SAMPLE_QUESTIONS, rss_mb
+
+REFERENCE = "torch"
+
+
+def sample_corpus(qdrant_path, collection, n, seed=0):
+    """Random sample of indexed chunks as E5 passages."""
+    client = QdrantClient(path=qdrant_path)
+    records, _ = client.scroll(collection_name=collection, limit=max(n * 4, 1000),
+                               with_payload=["text", "context"], with_vectors=False)
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(records), size=min(n, len(records)), replace=False)
+    return [f"passage: {records[i].payload.get('context', '')}\n{records[i].payload.get('text', '')}" for i in picked]
+
+
+def measure(backend, passages, queries):
+    """Runs in a fresh process: load, encode, time, measure memory."""
+    from src.embedders import load_embedder
+
+    base_rss = rss_mb()
+    start = time.perf_counter()
+    model = load_embedder(backend)
+    load_seconds = time.perf_counter() - start
+
+    model.encode(queries[:2])  # warmup
+    start = time.perf_counter()
+    passage_vectors = model.encode(passages, batch_size=32)
+    passage_seconds = time.perf_counter() - start
+
+    single = []
+    for q in queries:
+        start = time.perf_counter()
+        model.encode(q)
+        single.append(time.perf_counter() - start)
+    query_vectors = model.encode(queries, batch_size=32)
+
+    return {
+        "backend": backend,
+        "load_s": load_seconds,
+        "passages_per_s": len(passages) / passage_seconds,
+        "query_ms": float(np.median(single)) * 1000,
+        "model_rss_mb": rss_mb() - base_rss,
+        "total_rss_mb": rss_mb(),
+        "passages": np.asarray(passage_vectors, dtype=np.float32),
+        "queries": np.asarray(query_vectors, dtype=np.float32),
+    }
+
+
+def _unit_rows(m):
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+
+def compare(ref, cand, k):
+    drift = 1 - np.sum(_unit_rows(ref["passages"]) * _unit_rows(cand["passages"]), axis=1)
+
+    def top_k(result):
+        scores = _unit_rows(result["queries"]) @ _unit_rows(result["passages"]).T
+        return np.argsort(-scores, axis=1)[:, :k]
+
+    overlap = [len(set(a) & set(b)) / k for a, b in zip(top_k(ref), top_k(cand))]
+    return {"drift_mean": float(drift.mean()), "drift_max": float(drift.max()), "topk_overlap": float(np.mean(overlap))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["int8", "onnx"])
+    parser.add_argument("--sample", type=int, default=500, help="corpus chunks to encode")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--qdrant-path", default="qdrant_db")
+    parser.add_argument("--collection", default="scert_bot")
+    parser.add_argument("--min-overlap", type=float, default=0.9)
+    parser.add_argument("--max-drift", type=float, default=0.02)
+    args = parser.parse_args()
+
+    passages = sample_corpus(args.qdrant_path, args.collection, args.sample)
+    queries = [f"query: {q}" for q in SAMPLE_QUESTIONS]
+    print(f"📚 {len(passages)} sampled chunks, {len(queries)} queries, top-{args.k}\n")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for backend in [REFERENCE] + [b for b in args.backends if b != REFERENCE]:
+        with ctx.Pool(1) as pool:
+            try:
+                results[backend] = pool.apply(measure, (backend, passages, queries))
+            except Exception as e:
+                print(f"⚠️ {backend}: {e}")
+
+    if REFERENCE not in results:
+        sys.exit("❌ Reference backend failed to load.")
+
+    print(f"{'backend':<10} {'load s':>7} {'pass/s':>8} {'query ms':>9} {'model MB':>9} "
+          f"{'drift mean':>11} {'drift max':>10} {'top-k ovl':>10}")
+    failed = []
+    for backend, r in results.items():
+        q = compare(results[REFERENCE], r, args.k)
+        print(f"{backend:<10} {r['load_s']:>7.1f} {r['passages_per_s']:>8.1f} {r['query_ms']:>9.1f} "
+              f"{r['model_rss_mb']:>9.0f} {q['drift_mean']:>11.4f} {q['drift_max']:>10.4f} {q['topk_overlap']:>10.2f}")
+        if q["topk_overlap"] < args.min_overlap or q["drift_mean"] > args.max_drift:
+            failed.append(backend)
+
+    if failed:
+        sys.exit(f"\n❌ Below quality thresholds: {', '.join(failed)}")
+    print("\n✅ All backends within thresholds.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# src/fakes.py
+"""
+Local stand-ins for the expensive parts of the RAG stack, so latency can be
+measured without network access, a GPU, or the Gemini API.
+
+- FakeGenerativeModel mimics genai.GenerativeModel.generate_content
+  (blocking and stream=True) with configurable delays.
+- FakeEmbedder mimics SentenceTransformer.encode with deterministic
+  hashed bag-of-words vectors (similar texts -> similar vectors).
+"""
+import hashlib
+import re
+import threading
+import time
+from functools import lru_cache
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct, VectorParams, Distance
+
+TOKEN_PATTERN = re.compile(r"[0-9A-Za-z\u0900-\u097F]+")
+
+
+class FakeChunk:
+    """Looks like a Gemini response / stream chunk: only `.text` is used."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Drop-in for genai.GenerativeModel.
+
+    first_token_delay: seconds before the first chunk (prompt processing)
+    chunk_delay:       seconds between subsequent chunks (decoding)
+    chunk_size:        characters per streamed chunk
+    """
+
+    def __init__(self, answer=None, answer_length=1200, chunk_size=40,
+                 first_token_delay=0.8, chunk_delay=0.05):
+        self.answer = answer
+        self.answer_length = answer_length
+        self.chunk_size = chunk_size
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+
+    def _answer_for(self, prompt):
+        if self.answer is not None:
+            return self.answer
+        # Deterministic answer derived from the question in the prompt
+        question = prompt.rsplit("### USER QUESTION:", 1)[-1].strip()
+        base = f"उत्तर (answer) for: {question}. "
+        return (base * (self.answer_length // len(base) + 1))[:self.answer_length]
+
+    def _chunks(self, text):
+        return [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+
+    def _stream(self, text):
+        for i, piece in enumerate(self._chunks(text)):
+            time.sleep(self.first_token_delay if i == 0 else self.chunk_delay)
+            yield FakeChunk(piece)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        text = self._answer_for(prompt)
+        if stream:
+            return self._stream(text)
+
+        # Blocking call costs the same as consuming the whole stream
+        n_chunks = max(1, len(self._chunks(text)))
+        time.sleep(self.first_token_delay + self.chunk_delay * (n_chunks - 1))
+        return FakeChunk(text)
+
+
+class FakeEmbedder:
+    """
+    Drop-in for SentenceTransformer with deterministic, normalized vectors.
+
+    call_delay: fixed seconds per encode() call (model dispatch overhead)
+    item_delay: extra seconds per input text
+
+    Like a single SentenceTransformer instance, only one encode() runs at a
+    time; concurrent callers queue on a lock.
+    """
+
+    def __init__(self, dim=1024, call_delay=0.0, item_delay=0.0):
+        self.dim = dim
+        self.call_delay = call_delay
+        self.item_delay = item_delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @lru_cache(maxsize=65536)
+    def _token_vector(self, token):
+        seed = int.from_bytes(hashlib.sha256(token.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+
+    def _embed(self, text):
+        # Drop the E5 "query: " / "passage: " prefix so queries match passages
+        text = re.sub(r"^(query|passage):\s*", "", text)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            vector += self._token_vector(token)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        with self._lock:
+            self.calls += 1
+            time.sleep(self.call_delay + self.item_delay * len(texts))
+            vectors = np.stack([self._embed(t) for t in texts]) if texts else np.zeros((0, self.dim), np.float32)
+        return vectors[0] if single else vectors
+
+
+def make_memory_collection(embedder, texts, collection_name="scert_bot", source_url="https://www.maa.ac.in/fake"):
+    """Builds an in-memory Qdrant collection over `texts` with the usual payload shape."""
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(size=embedder.dim, distance=Distance.COSINE)
+    )
+    vectors = embedder.encode(["passage: " + t for t in texts], batch_size=64)
+    points = [
+        PointStruct(id=i, vector=v.tolist(), payload={
+            "text": t,
+            "context": "",
+            "source_url": f"{source_url}/{i}",
+            "file_name": f"fake_{i}.md"
+        })
+        for i, (t, v) in enumerate(zip(texts, vectors))
+    ]
+    client.upsert(collection_name=collection_name, points=points)
+    return client
@@ -0,0 +1,389 @@
+# src/index_manager.py
+"""
+Versioned collections behind a serving alias, per site.
+
+The app never reads a collection that is being written. Each site has a
+serving alias (e.g. "scert_bot") pointing at one immutable version
+("scert_bot__v20250101-120000"). A full rebuild goes into a new version:
+
+    rebuild:  create version -> ingest (src/ingest.py pipeline) -> keyword index
+    validate: point count matches the manifest, not far below the serving
+              version, smoke queries return hits (labeled ones: recall@k)
+    swap:     one update_collection_aliases call re-points the alias, then the
+              version's keyword index is published to the serving path
+
+MarathiRAG queries the alias, so the switch is atomic for readers; its cache
+is dropped when the alias target changes. Old versions stay for rollback
+until pruned. Incremental ingests (python -m src.ingest) update whatever
+version is serving, with that version's own manifest; on an empty store they
+fill a first version, which is validated and swapped in at the end.
+
+Several sites share one store: SITE=<name> (default "scert") selects the
+"<name>_bot" alias everywhere (app, ingest scripts, this tool).
+QDRANT_URL=<url> uses a Qdrant server instead of the local QDRANT_PATH;
+only a server lets a rebuild run while the app is serving, since embedded
+mode locks the directory to one process.
+
+    python -m src.index_manager status
+    python -m src.index_manager adopt                   # once: move a pre-alias "scert_bot" into a version
+    python -m src.index_manager rebuild --data-dir crawled_data --smoke eval/queries.jsonl
+    python -m src.index_manager rollback
+    python -m src.index_manager prune --keep 3
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import time
+from qdrant_client import QdrantClient
+from qdrant_client.models import (CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation,
+                                  HnswConfigDiff)
+
+# --- CONFIGURATION ---
+QDRANT_PATH = os.getenv("QDRANT_PATH", "qdrant_db")
+QDRANT_URL = os.getenv("QDRANT_URL")
+SITE = os.getenv("SITE", "scert")
+LEGACY_MANIFEST_FILE = "ingest_manifest.jsonl"  # Manifest of a pre-alias (unversioned) collection
+VERSION_SEPARATOR = "__v"
+KEEP_VERSIONS = 3
+MIN_COUNT_RATIO = 0.5   # A new version with fewer points than this x the serving one is rejected
+MIN_RECALL = 0.5        # Labeled smoke queries: required recall@SMOKE_TOP_K
+SMOKE_TOP_K = 10
+SMOKE_QUERIES = [
+    "प्रवेश प्रक्रिया कधी सुरू होते?",
+    "What is the exam timetable for class 10?",
+    "SCERT contact number kay aahe?",
+    "शिक्षक प्रशिक्षण नोंदणी",
+]
+
+
+def alias_name(site=SITE):
+    return f"{site}_bot"
+
+
+SERVING_COLLECTION = alias_name()
+
+
+def connect(path=QDRANT_PATH, url=QDRANT_URL):
+    return QdrantClient(url=url) if url else QdrantClient(path=str(path))
+
+
+def manifest_path(collection):
+    """Ingest manifest of one collection (src/manifest.py); versions keep theirs next to the data."""
+    if VERSION_SEPARATOR not in collection:
+        return LEGACY_MANIFEST_FILE
+    return os.path.join(QDRANT_PATH, "manifests", f"{collection}.jsonl")
+
+
+def keyword_index_path(collection):
+    """BM25 index file of a collection or alias (the alias's one is what MarathiRAG loads)."""
+    return os.path.join(QDRANT_PATH, f"{collection}_keywords.npz")
+
+
+def resolve(client, name):
+    """The collection an alias points at (or `name` itself if it isn't an alias)."""
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == name:
+            return alias.collection_name
+    return name
+
+
+def serving_version(client, site=SITE):
+    """The version the site's alias serves, or None (no alias yet)."""
+    alias = alias_name(site)
+    target = resolve(client, alias)
+    return target if target != alias else None
+
+
+def is_legacy(client, site=SITE):
+    """True if the alias name is still taken by a plain, unversioned collection."""
+    alias = alias_name(site)
+    return serving_version(client, site) is None and client.collection_exists(alias)
+
+
+def versions(client, site=SITE):
+    """All versions of a site, oldest first (names sort by build time)."""
+    prefix = alias_name(site) + VERSION_SEPARATOR
+    return sorted(c.name for c in client.get_collections().collections if c.name.startswith(prefix))
+
+
+def new_version_name(client, site=SITE):
+    name = f"{alias_name(site)}{VERSION_SEPARATOR}{time.strftime('%Y%m%d-%H%M%S')}"
+    while client.collection_exists(name):  # Two builds in the same second
+        name += "b"
+    return name
+
+
+def create_version(client, site=SITE, profile=None):
+    from src.collection_config import create_collection
+
+    name = new_version_name(client, site)
+    create_collection(client, name, profile)
+    os.makedirs(os.path.dirname(manifest_path(name)), exist_ok=True)
+    return name
+
+
+def ingest_target(client, site=SITE, profile=None):
+    """
+    Collection that incremental ingests write to: the serving version, the
+    legacy collection, or (nothing served yet) a first version that stays
+    unaliased until promote_first() validates it. An interrupted first
+    build is picked up again.
+    """
+    target = serving_version(client, site)
+    if target:
+        return target
+    if is_legacy(client, site):
+        return alias_name(site)
+    built = versions(client, site)
+    return built[-1] if built else create_version(client, site, profile)
+
+
+def promote_first(client, collection, embedder, site=SITE, manifest=None):
+    """
+    End of an incremental ingest: if the site serves nothing yet, validates
+    `collection` and swaps it in. Returns False if it stays unserved.
+    """
+    if serving_version(client, site) or is_legacy(client, site):
+        return True
+    expected = len(manifest_chunk_ids(manifest)) if manifest and manifest.files else None
+    return promote(client, collection, embedder, site, expected_points=expected)
+
+
+def publish_keyword_index(collection, site=SITE):
+    """Copies a version's BM25 index to the serving path (atomic replace; MarathiRAG reloads on mtime)."""
+    source, target = keyword_index_path(collection), keyword_index_path(alias_name(site))
+    if source == target or not os.path.exists(source):
+        return
+    shutil.copyfile(source, target + ".tmp")
+    os.replace(target + ".tmp", target)
+
+
+def refresh_keyword_index(client, collection, site=SITE):
+    """Rebuilds a collection's BM25 index and republishes it if that collection is serving."""
+    from src.ingest import build_keyword_index
+
+    build_keyword_index(client, collection, keyword_index_path(collection))
+    if collection == resolve(client, alias_name(site)):
+        publish_keyword_index(collection, site)
+
+
+def swap(client, site, collection):
+    """Points the site's alias at `collection` in one atomic alias update."""
+    alias = alias_name(site)
+    if is_legacy(client, site):
+        raise RuntimeError(f"'{alias}' is still a plain collection. Run 'python -m src.index_manager adopt' "
+                           "first (it becomes the first version, kept for rollback).")
+    operations = []
+    if serving_version(client, site):
+        operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=collection, alias_name=alias)))
+    client.update_collection_aliases(change_aliases_operations=operations)
+    publish_keyword_index(collection, site)
+
+
+def manifest_chunk_ids(manifest):
+    """Distinct point ids a manifest says are indexed (a repeated chunk is one point)."""
+    return {chunk_id for entry in manifest.files.values() for chunk_id in entry["chunks"]}
+
+
+def load_smoke_queries(path=None):
+    """[{"query", "relevant"?}] from a JSONL file (the bench_retrieval format) or the built-in list."""
+    if not path:
+        return [{"query": q} for q in SMOKE_QUERIES]
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def validate(client, collection, embedder, site=SITE, expected_points=None, smoke_queries=None,
+             min_count_ratio=MIN_COUNT_RATIO, min_recall=MIN_RECALL):
+    """Checks a version before it goes live. Returns a list of problems (empty = OK)."""
+    problems = []
+    count = client.count(collection_name=collection, exact=True).count
+    if count == 0:
+        return [f"{collection} is empty"]
+    if expected_points is not None and count != expected_points:
+        problems.append(f"{count} points, but the manifest lists {expected_points} chunks")
+
+    serving = resolve(client, alias_name(site))
+    if serving != collection and client.collection_exists(serving):
+        serving_count = client.count(collection_name=serving, exact=True).count
+        if count < serving_count * min_count_ratio:
+            problems.append(f"{count} points vs {serving_count} in the serving {serving} "
+                            f"(below {min_count_ratio:.0%}: incomplete crawl?)")
+
+    queries = smoke_queries or load_smoke_queries()
+    vectors = embedder.encode([f"query: {q['query']}" for q in queries], show_progress_bar=False)
+    labeled = recalled = 0
+    for q, vector in zip(queries, vectors):
+        hits = client.query_points(collection_name=collection, query=vector.tolist(), limit=SMOKE_TOP_K).points
+        if not hits:
+            problems.append(f"no hits for smoke query '{q['query']}'")
+        if q.get("relevant"):
+            labeled += 1
+            relevant = set(q["relevant"])
+            recalled += any(h.payload.get("file_name") in relevant or h.payload.get("source_url") in relevant
+                            for h in hits)
+    if labeled and recalled / labeled < min_recall:
+        problems.append(f"smoke recall@{SMOKE_TOP_K} {recalled / labeled:.2f} < {min_recall:.2f}")
+    return problems
+
+
+def promote(client, collection, embedder, site=SITE, expected_points=None, smoke_queries=None, force=False):
+    """Validates a version and swaps it in. Returns True if it is now serving."""
+    problems = validate(client, collection, embedder, site, expected_points, smoke_queries)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems and not force:
+        print(f"⛔ Not swapping: '{alias_name(site)}' still serves {serving_version(client, site)}. "
+              f"'{collection}' is kept for inspection.")
+        return False
+    swap(client, site, collection)
+    print(f"🔀 '{alias_name(site)}' now serves {collection}.")
+    return True
+
+
+def rebuild(client, files, embedder, site=SITE, profile=None, workers=None):
+    """Full ingest of `files` into a new version (not serving yet). Returns (version, manifest)."""
+    from src import ingest
+    from src.manifest import IngestManifest
+
+    collection = create_version(client, site, profile)
+    manifest = IngestManifest(manifest_path(collection))
+    print(f"🏗️ Building {collection} from {len(files)} files...")
+    plan = ingest.plan_ingestion(files, client, manifest, collection_name=collection)
+    ingest.ingest_pipelined(plan, client, embedder, manifest, collection_name=collection,
+                            workers=workers or ingest.SPLIT_WORKERS)
+    ingest.build_keyword_index(client, collection, keyword_index_path(collection))
+    return collection, manifest
+
+
+def rollback(client, site=SITE):
+    """Serves the version built before the current one."""
+    current = serving_version(client, site)
+    older = [v for v in versions(client, site) if current is None or v < current]
+    if not older:
+        raise RuntimeError(f"No version older than {current} to roll back to.")
+    swap(client, site, older[-1])
+    return older[-1]
+
+
+def prune(client, site=SITE, keep=KEEP_VERSIONS):
+    """Deletes all but the newest `keep` versions (never the serving one). Returns the deleted names."""
+    current = serving_version(client, site)
+    deleted = [v for v in versions(client, site)[:-keep or None] if v != current]
+    for name in deleted:
+        client.delete_collection(name)
+        for path in (manifest_path(name), keyword_index_path(name)):
+            if os.path.exists(path):
+                os.remove(path)
+    return deleted
+
+
+def adopt(client, site=SITE):
+    """Turns a pre-alias plain collection into the first version and points the alias at it."""
+    from src.collection_config import copy_points
+
+    legacy = alias_name(site)
+    if not is_legacy(client, site):
+        raise RuntimeError(f"'{legacy}' is not a plain collection (nothing to adopt).")
+    info = client.get_collection(legacy)
+    collection = new_version_name(client, site)
+    # Same vector / index / quantization settings as the legacy collection
+    client.create_collection(collection_name=collection, vectors_config=info.config.params.vectors,
+                             hnsw_config=HnswConfigDiff(**info.config.hnsw_config.model_dump()),
+                             quantization_config=info.config.quantization_config)
+    expected = client.count(collection_name=legacy, exact=True).count
+    copied = copy_points(client, legacy, collection)
+    if copied != expected:
+        client.delete_collection(collection)
+        raise RuntimeError(f"Copied {copied} of {expected} points; '{legacy}' left unchanged.")
+
+    os.makedirs(os.path.dirname(manifest_path(collection)), exist_ok=True)
+    if os.path.exists(LEGACY_MANIFEST_FILE):
+        shutil.copyfile(LEGACY_MANIFEST_FILE, manifest_path(collection))
+    if os.path.exists(keyword_index_path(legacy)):
+        shutil.copyfile(keyword_index_path(legacy), keyword_index_path(collection))
+
+    # The alias can only be created once the name is free: readers see "not found" for this instant
+    client.delete_collection(legacy)
+    swap(client, site, collection)
+    return collection
+
+
+def status(client):
+    """{alias: {"serving", "versions": {name: points}}} for every site in the store."""
+    sites = {}
+    for c in client.get_collections().collections:
+        alias, _, version = c.name.partition(VERSION_SEPARATOR)
+        site = sites.setdefault(alias, {"serving": None, "versions": {}})
+        if version:
+            site["versions"][c.name] = client.count(collection_name=c.name, exact=True).count
+        else:
+            site["serving"] = "(plain collection, see adopt)"
+    for alias, site in sites.items():
+        site["serving"] = site["serving"] or (resolve(client, alias) if resolve(client, alias) != alias else None)
+        site["versions"] = dict(sorted(site["versions"].items()))
+    return dict(sorted(sites.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["status", "rebuild", "validate", "swap", "rollback", "prune", "adopt"])
+    parser.add_argument("version", nargs="?", help="collection version (validate / swap)")
+    parser.add_argument("--site", default=SITE)
+    parser.add_argument("--data-dir", help="markdown files to rebuild from (default: src/ingest.py DATA_DIR)")
+    parser.add_argument("--smoke", help="smoke query JSONL ({\"query\", \"relevant\"?}) checked before swapping")
+    parser.add_argument("--profile", help="storage profile of the new version (src/collection_config.py)")
+    parser.add_argument("--embedder", help="encoder backend (default: $EMBEDDER_BACKEND or torch)")
+    parser.add_argument("--no-swap", action="store_true", help="rebuild + validate only")
+    parser.add_argument("--force", action="store_true", help="swap even if validation fails")
+    parser.add_argument("--keep", type=int, default=KEEP_VERSIONS)
+    args = parser.parse_args()
+
+    client = connect()
+    site, alias = args.site, alias_name(args.site)
+
+    if args.command == "status":
+        print(json.dumps(status(client), indent=2))
+    elif args.command == "adopt":
+        print(f"📦 '{alias}' is now served from {adopt(client, site)}.")
+    elif args.command == "rollback":
+        print(f"⏪ '{alias}' now serves {rollback(client, site)}.")
+    elif args.command == "prune":
+        deleted = prune(client, site, args.keep)
+        print(f"🧹 Deleted {len(deleted)} old versions: {', '.join(deleted) or '-'}")
+    elif args.command == "swap":
+        if not args.version:
+            parser.error("swap needs a version")
+        swap(client, site, args.version)
+        print(f"🔀 '{alias}' now serves {args.version}.")
+    else:
+        from src.embedders import connect_embedder
+        from src.manifest import IngestManifest
+
+        embedder = connect_embedder(args.embedder)
+        smoke = load_smoke_queries(args.smoke)
+        if args.command == "validate":
+            collection = args.version or serving_version(client, site) or alias
+            manifest = IngestManifest(manifest_path(collection))
+        else:
+            from src import ingest
+            files = glob.glob(os.path.join(args.data_dir or ingest.DATA_DIR, "*.md"))
+            if not files:
+                parser.error("no markdown files to rebuild from")
+            collection, manifest = rebuild(client, files, embedder, site, args.profile)
+
+        expected = len(manifest_chunk_ids(manifest)) if manifest.files else None
+        if args.command == "validate" or args.no_swap:
+            problems = validate(client, collection, embedder, site, expected, smoke)
+            for problem in problems:
+                print(f"❌ {problem}")
+            print(f"{'⚠️' if problems else '✅'} {collection}: {len(problems)} problems.")
+        else:
+            promote(client, collection, embedder, site, expected, smoke, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,127 +1,526 @@
 import os
 import glob
+import json
 import uuid
+import argparse
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from tqdm import tqdm
-from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
-from sentence_transformers import SentenceTransformer
-from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, VectorParams, Distance
+from qdrant_client.models import PointStruct, PointIdsList, Filter, FieldCondition, MatchValue
+from src.chunker import CHUNK_OVERLAP, CHUNK_SIZE, MarkdownChunker, e5_token_counter, open_headers
+from src.collection_config import PROFILES
+from src.embedders import BACKENDS, connect_embedder, embedder_id
+from src.documents import PAGE_MARKER_RE
+from src.embedding_store import CachedEmbedder, EmbeddingStore
+from src import index_manager
+from src.keyword_index import KEYWORD_INDEX_PATH, KeywordIndex
+from src.manifest import IngestManifest, file_sha256
+
+# Run from the project root: python -m src.ingest
 
 # --- CONFIGURATION ---
 DATA_DIR = r"C:\Users\sahil\OneDrive\Desktop\Projects\AI Projects\Scert Chatbot\data\raw_markdown"
-COLLECTION_NAME = "scert_bot"
-QDRANT_PATH = "qdrant_db"
-LOG_FILE = "processed_files.txt"  # Keeps track of progress
+COLLECTION_NAME = index_manager.SERVING_COLLECTION  # $SITE's serving alias (see src/index_manager.py)
+BATCH_SIZE = 64        # Chunks per encode() call, packed across files
+SPLIT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+MAX_PENDING_UPSERTS = 2  # Backpressure: encoder waits if the DB falls behind
+LOG_FILE = "processed_files.txt"  # Progress log of the original one-file-at-a-time ingest (seeds the manifest once)
 
-def main():
-    # 1. INITIALIZE DB & MODEL
-    print("🔌 Connecting to Qdrant...")
-    client = QdrantClient(path=QDRANT_PATH)
-    
-    if not client.collection_exists(COLLECTION_NAME):
-        client.create_collection(
-            collection_name=COLLECTION_NAME,
-            vectors_config=VectorParams(size=1024, distance=Distance.COSINE)
-        )
+_chunker = None  # Built once per process (main or split worker)
 
-    print("🧠 Loading Embedding Model...")
-    embedding_model = SentenceTransformer('intfloat/multilingual-e5-large')
-
-    # 2. LOAD PROGRESS
-    processed_files = set()
-    if os.path.exists(LOG_FILE):
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            processed_files = set(f.read().splitlines())
-        print(f"🔄 Resuming... Found {len(processed_files)} files already processed.")
-
-    # 3. SETUP SPLITTERS
-    markdown_splitter = MarkdownHeaderTextSplitter(headers_to_split_on=[
-        ("#", "Header 1"), ("##", "Header 2"), ("###", "Header 3"), ("####", "Header 4"),
-    ])
-    
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=800, chunk_overlap=100, separators=["\n\n", "\n", " | ", "。", " "]
-    )
-
-    # 4. PROCESSING LOOP
-    files = glob.glob(os.path.join(DATA_DIR, "*.md"))
-    files_to_process = [f for f in files if os.path.basename(f) not in processed_files]
-
-    if not files_to_process:
-        print("✅ All files are already processed!")
+
+def get_chunker():
+    global _chunker
+    if _chunker is None:
+        # Header split + 800/100 character split, with chunks kept under e5's 512 tokens.
+        # CHUNK_SIZE / CHUNK_OVERLAP env vars override the split for experiments (src/bench_suite.py);
+        # changing them changes the chunk ids, so re-ingest into a fresh collection.
+        _chunker = MarkdownChunker(chunk_size=int(os.getenv("CHUNK_SIZE", CHUNK_SIZE)),
+                                   chunk_overlap=int(os.getenv("CHUNK_OVERLAP", CHUNK_OVERLAP)),
+                                   count_tokens=e5_token_counter())
+    return _chunker
+
+
+def split_file(filepath):
+    """
+    Reads and splits one markdown file (streamed line by line).
+    Returns (file_name, ids, texts_to_encode, payloads). Runs in a worker process.
+    """
+    with open(filepath, "r", encoding="utf-8") as f:
+        return split_lines(os.path.basename(filepath), f)
+
+
+def split_document(file_name, content):
+    """Same as split_file, for a document already in memory (see src/stream_ingest.py)."""
+    return split_lines(file_name, content.split('\n'))
+
+
+def split_lines(file_name, lines):
+    """
+    Splits one document in the scraper's format ("Source: <url>" first line).
+    Documents converted by src/documents.py are split page by page, and their
+    chunks carry the page number. Returns (file_name, ids, texts_to_encode, payloads).
+    """
+    ids, texts_to_encode, payloads = [], [], []
+    for chunk_id, text, payload in iter_chunks(file_name, lines):
+        ids.append(chunk_id)
+        texts_to_encode.append(text)
+        payloads.append(payload)
+    return file_name, ids, texts_to_encode, payloads
+
+
+def iter_chunks(file_name, lines):
+    """split_lines() one chunk at a time: yields (id, text_to_encode, payload)."""
+    # --- Extract Metadata ---
+    lines = iter(lines)
+    first_line = next(lines, "")
+    source_url = "https://www.maa.ac.in/"
+    if first_line.startswith("Source:"):
+        source_url = first_line.replace("Source:", "").strip()
+    else:
+        lines = itertools.chain([first_line], lines)
+
+    seen_ids = set()
+    headers = []  # Header lines in effect at the end of the previous page
+    for page, page_lines in iter_pages(lines):
+        # A section running over a page break keeps its headings
+        for chunk in get_chunker().chunks(itertools.chain(headers, page_lines)):
+            header_context = chunk.context
+            full_text = f"{header_context}\n{chunk.text}"
+
+            # 1. Generate Valid UUID (Deterministic based on content)
+            # This fixes the "ValueError: badly formed hexadecimal UUID string"
+            chunk_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, full_text + file_name))
+            if chunk_id in seen_ids:
+                continue  # Identical chunk repeated in the same file
+            seen_ids.add(chunk_id)
+
+            payload = {
+                "text": chunk.text,
+                "context": header_context,
+                "source_url": source_url,
+                "file_name": file_name
+            }
+            if page:
+                payload["page"] = page
+            yield chunk_id, "passage: " + full_text, payload
+        if page:
+            headers = open_headers(page_lines, headers)
+
+
+def iter_pages(lines):
+    """
+    Yields (page number, lines) per "<!-- page N -->" section of a converted
+    document, holding one page at a time. Other documents are a single
+    (None, lines) section, still streamed.
+    """
+    first = next(lines, None)
+    while first is not None and not first.strip():
+        first = next(lines, None)  # Blank line after "Source:"
+    if first is None:
+        return
+    match = PAGE_MARKER_RE.match(first.strip())
+    if not match:
+        yield None, itertools.chain([first], lines)
         return
+    page, current = int(match.group(1)), []
+    for line in lines:
+        match = PAGE_MARKER_RE.match(line.strip())
+        if match:
+            yield page, current
+            page, current = int(match.group(1)), []
+        else:
+            current.append(line)
+    yield page, current
 
-    print(f"📂 Processing {len(files_to_process)} new files...")
 
+def file_filter(file_name):
+    return Filter(must=[FieldCondition(key="file_name", match=MatchValue(value=file_name))])
+
+
+def indexed_ids(client, file_name, collection_name=COLLECTION_NAME):
+    """Point ids already stored for a file (used when the manifest has no entry for it)."""
+    ids, offset = set(), None
+    while True:
+        records, offset = client.scroll(
+            collection_name=collection_name, scroll_filter=file_filter(file_name),
+            limit=1000, offset=offset, with_payload=False, with_vectors=False
+        )
+        ids.update(str(r.id) for r in records)
+        if offset is None:
+            return ids
+
+
+def plan_ingestion(files, client, manifest, collection_name=COLLECTION_NAME, removed=None):
+    """
+    Decides what needs work. Returns {filepath: (file_hash, known_ids)} for new or
+    changed files, and drops files that vanished from disk (index + manifest).
+    With `removed` (file names from a crawl changes feed), `files` is only a
+    partial list: just those files are dropped.
+    """
+    if removed is None:
+        on_disk = {os.path.basename(f) for f in files}
+        removed = [name for name in manifest.files if name not in on_disk]
+    for file_name in removed:
+        client.delete(collection_name=collection_name, points_selector=file_filter(file_name))
+        manifest.forget(file_name)
+        print(f"🗑️ Removed {file_name} (no longer available)")
+
+    plan = {}
+    for filepath in files:
+        file_name = os.path.basename(filepath)
+        file_hash = file_sha256(filepath)
+        if manifest.is_unchanged(file_name, file_hash):
+            continue
+        entry = manifest.get(file_name)
+        # No manifest entry (first run, or an interrupted one): trust what is in Qdrant
+        known_ids = set(entry["chunks"]) if entry else indexed_ids(client, file_name, collection_name)
+        plan[filepath] = (file_hash, known_ids)
+    return plan
+
+
+def seed_manifest(manifest, client, collection_name=COLLECTION_NAME, data_dir=DATA_DIR, log_file=LOG_FILE):
+    """
+    One-time migration from processed_files.txt: files it lists that still
+    exist and have points in Qdrant are recorded with their current hash and
+    those point ids, so the first manifest run doesn't re-split everything.
+    Returns the number of files seeded.
+    """
+    with open(log_file, "r", encoding="utf-8") as f:
+        names = dict.fromkeys(line.strip() for line in f if line.strip())
+    seeded = 0
+    for file_name in names:
+        path = os.path.join(data_dir, file_name)
+        if not os.path.exists(path):
+            continue  # Gone since: the next scan treats it as new or never sees it
+        ids = indexed_ids(client, file_name, collection_name)
+        if ids:  # Nothing stored (empty file, or another collection): let the plan decide
+            manifest.record(file_name, file_sha256(path), sorted(ids))
+            seeded += 1
+    return seeded
+
+
+def load_changes(path, data_dir=DATA_DIR, purge_unseen=False):
+    """
+    Reads a crawl changes feed (see src/crawl_state.py).
+    Returns (files to (re)ingest, file names to remove). Only removals the
+    site confirmed (404 / 410) are returned, unless purge_unseen is set.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        feed = json.load(f)
+    files = [os.path.join(data_dir, page["file_name"]) for page in feed["new"] + feed["changed"]]
+    removed = [page["file_name"] for page in feed["removed"]
+               if page["file_name"] and (purge_unseen or page.get("confirmed"))]
+    return [f for f in files if os.path.exists(f)], removed
+
+
+def commit_file(client, manifest, file_name, file_hash, chunk_ids, known_ids, collection_name=COLLECTION_NAME):
+    """Runs once all of a file's new points are persisted: drop stale points, then checkpoint."""
+    stale = list(known_ids - set(chunk_ids))
+    if stale:
+        client.delete(collection_name=collection_name, points_selector=PointIdsList(points=stale))
+    manifest.record(file_name, file_hash, chunk_ids)
+
+
+def new_chunks(ids, texts, payloads, known_ids):
+    """Only chunks whose uuid5 isn't already indexed need encoding."""
+    return [(uid, text, p) for uid, text, p in zip(ids, texts, payloads) if uid not in known_ids]
+
+
+def ingest_sequential(plan, client, embedding_model, manifest, collection_name=COLLECTION_NAME):
+    """
+    Original loop: read, split, encode and upsert one file at a time.
+    `plan` comes from plan_ingestion. Returns the number of chunks encoded.
+    """
+    total_chunks = 0
     # We process file-by-file to ensure we can save progress instantly
-    for filepath in tqdm(files_to_process, desc="Ingesting", unit="file"):
+    for filepath, (file_hash, known_ids) in tqdm(plan.items(), desc="Ingesting", unit="file"):
         try:
-            file_name = os.path.basename(filepath)
-            
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # --- Extract Metadata ---
-            lines = content.split('\n')
-            source_url = "https://www.maa.ac.in/"
-            clean_content = content
-            if lines and lines[0].startswith("Source:"):
-                source_url = lines[0].replace("Source:", "").strip()
-                clean_content = "\n".join(lines[1:])
-
-            # --- Splitting ---
-            header_splits = markdown_splitter.split_text(clean_content)
-            final_chunks = text_splitter.split_documents(header_splits)
-
-            if not final_chunks:
-                # Mark empty files as processed so we don't try again
-                with open(LOG_FILE, "a", encoding="utf-8") as log:
-                    log.write(file_name + "\n")
-                continue
+            file_name, ids, texts, payloads = split_file(filepath)
+            todo = new_chunks(ids, texts, payloads, known_ids)
 
-            # --- Prepare Batch ---
-            texts_to_encode = []
-            payloads = []
-            ids = []
-
-            for chunk in final_chunks:
-                header_context = " > ".join(chunk.metadata.values())
-                full_text = f"{header_context}\n{chunk.page_content}"
-                
-                # 1. Generate Valid UUID (Deterministic based on content)
-                # This fixes the "ValueError: badly formed hexadecimal UUID string"
-                chunk_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, full_text + file_name))
-                
-                ids.append(chunk_id)
-                texts_to_encode.append("passage: " + full_text)
-                payloads.append({
-                    "text": chunk.page_content,
-                    "context": header_context,
-                    "source_url": source_url,
-                    "file_name": file_name
-                })
-
-            # --- Encode & Upload (Per File) ---
-            # Even if a file has 50 chunks, we encode them all at once
-            vectors = embedding_model.encode(texts_to_encode, batch_size=64, show_progress_bar=False)
+            if todo:
+                # --- Encode & Upload (Per File) ---
+                # Even if a file has 50 chunks, we encode them all at once
+                vectors = embedding_model.encode([t for _, t, _ in todo], batch_size=BATCH_SIZE, show_progress_bar=False)
 
-            points = [
-                PointStruct(id=uid, vector=v.tolist(), payload=p)
-                for uid, v, p in zip(ids, vectors, payloads)
-            ]
+                points = [
+                    PointStruct(id=uid, vector=v.tolist(), payload=p)
+                    for (uid, _, p), v in zip(todo, vectors)
+                ]
 
-            client.upsert(collection_name=COLLECTION_NAME, points=points)
+                client.upsert(collection_name=collection_name, points=points)
+                total_chunks += len(points)
 
             # --- Save Checkpoint ---
-            # We only write to log if upload succeeded
-            with open(LOG_FILE, "a", encoding="utf-8") as log:
-                log.write(file_name + "\n")
+            # We only record the file once its upload succeeded
+            # (empty files are recorded too, so we don't try again)
+            commit_file(client, manifest, file_name, file_hash, ids, known_ids, collection_name)
 
         except Exception as e:
             print(f"\n❌ Error on {os.path.basename(filepath)}: {e}")
-            # We do NOT write to log, so this file will be retried next time
+            # Not recorded in the manifest, so this file will be retried next time
+
+    return total_chunks
+
+
+class ChunkPipeline:
+    """
+    Packs new chunks from many files into full encode batches and upserts each
+    batch on a background thread while the next one encodes.
+
+    A file is recorded in the manifest only once ALL of its new points have been
+    upserted (and its stale points deleted), so an interrupted run resumes
+    exactly like the sequential loop. Used by ingest_pipelined and by the
+    streaming crawl-to-index mode (src/stream_ingest.py).
+    """
+
+    def __init__(self, client, embedding_model, manifest, upsert_pool, collection_name=COLLECTION_NAME,
+                 batch_size=BATCH_SIZE, on_file_done=None):
+        self.client = client
+        self.embedding_model = embedding_model
+        self.manifest = manifest
+        self.upsert_pool = upsert_pool
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.on_file_done = on_file_done
+        self.remaining = {}   # file_name -> new chunks not yet persisted
+        self.pending = {}     # file_name -> (file_hash, all chunk ids, known ids)
+        self.failed = set()   # files with a failed encode/upsert: never recorded this run
+        self.buffer = []      # (file_name, id, text, payload) waiting to be encoded
+        self.upserts = deque()  # (future, {file_name: n_chunks}) in submission order
+        self.stored = 0
+
+    def add(self, file_name, file_hash, ids, texts, payloads, known_ids=None):
+        """
+        Queues one split file; encodes as soon as a full batch is ready.
+        known_ids=None looks them up (manifest, else Qdrant).
+        """
+        if file_name in self.pending:
+            # Same page again (e.g. re-emitted by the crawler) while the old version is in flight
+            self.drain()
+        if known_ids is None:
+            entry = self.manifest.get(file_name)
+            known_ids = set(entry["chunks"]) if entry else indexed_ids(self.client, file_name, self.collection_name)
+        self.pending[file_name] = (file_hash, ids, known_ids)
+        todo = new_chunks(ids, texts, payloads, known_ids)
+
+        if not todo:
+            # Unchanged chunks only (or an empty file): nothing to encode
+            self._finish(file_name)
+            return
+
+        self.remaining[file_name] = len(todo)
+        self.buffer.extend((file_name, uid, text, p) for uid, text, p in todo)
+
+        while len(self.buffer) >= self.batch_size:
+            batch, self.buffer = self.buffer[:self.batch_size], self.buffer[self.batch_size:]
+            self._flush(batch)
+
+    def flush_partial(self):
+        """Encodes whatever is buffered, even if it is less than a full batch."""
+        if self.buffer:
+            batch, self.buffer = self.buffer, []
+            self._flush(batch)
+
+    def drain(self):
+        """Flushes the buffer and waits until every queued upsert has settled."""
+        self.flush_partial()
+        while self.upserts:
+            self._settle(*self.upserts.popleft())
+
+    def _finish(self, file_name):
+        file_hash, ids, known_ids = self.pending.pop(file_name)
+        if file_name not in self.failed:
+            try:
+                commit_file(self.client, self.manifest, file_name, file_hash, ids, known_ids, self.collection_name)
+            except Exception as e:
+                print(f"\n❌ Error on {file_name}: {e}")
+        if self.on_file_done:
+            self.on_file_done(file_name)
+
+    def _settle(self, future, counts):
+        try:
+            future.result()
+            self.stored += sum(counts.values())
+        except Exception as e:
+            print(f"\n❌ Upsert failed for {', '.join(counts)}: {e}")
+            self.failed.update(counts)
+        for file_name, n in counts.items():
+            self.remaining[file_name] -= n
+            if self.remaining[file_name] == 0:
+                del self.remaining[file_name]
+                self._finish(file_name)
+
+    def _flush(self, batch):
+        try:
+            vectors = self.embedding_model.encode([b[2] for b in batch], batch_size=self.batch_size,
+                                                  show_progress_bar=False)
+        except Exception as e:
+            print(f"\n❌ Encoding failed: {e}")
+            self.failed.update(b[0] for b in batch)
+            vectors = None
+
+        counts = {}
+        for file_name, *_ in batch:
+            counts[file_name] = counts.get(file_name, 0) + 1
+
+        # Backpressure: don't let encoded batches pile up in RAM
+        while len(self.upserts) >= MAX_PENDING_UPSERTS:
+            self._settle(*self.upserts.popleft())
+
+        if vectors is None:
+            # Still count the chunks down so the files leave `pending`
+            future = self.upsert_pool.submit(lambda: None)
+        else:
+            points = [
+                PointStruct(id=uid, vector=v.tolist(), payload=p)
+                for (_, uid, _, p), v in zip(batch, vectors)
+            ]
+            future = self.upsert_pool.submit(self.client.upsert, collection_name=self.collection_name,
+                                             points=points)
+        self.upserts.append((future, counts))
+
+
+def ingest_pipelined(plan, client, embedding_model, manifest, collection_name=COLLECTION_NAME,
+                     workers=SPLIT_WORKERS, batch_size=BATCH_SIZE):
+    """
+    Staged pipeline:
+      1. Split workers (process pool) read + split files ahead of the encoder.
+      2. The main thread packs new chunks from many files into full encode batches.
+      3. A background thread upserts each batch while the next one is encoding.
+
+    See ChunkPipeline for when files are checkpointed. Returns the number of
+    chunks encoded.
+    """
+    progress = tqdm(total=len(plan), desc="Ingesting", unit="file")
+
+    with ProcessPoolExecutor(max_workers=workers) as split_pool, \
+            ThreadPoolExecutor(max_workers=1) as upsert_pool:
+        pipeline = ChunkPipeline(client, embedding_model, manifest, upsert_pool, collection_name, batch_size,
+                                 on_file_done=lambda _: progress.update(1))
+
+        # Keep a bounded window of files in flight in the split pool
+        files_iter = iter(plan)
+        in_flight = deque()
+        for filepath in files_iter:
+            in_flight.append((filepath, split_pool.submit(split_file, filepath)))
+            if len(in_flight) >= workers * 4:
+                break
+
+        while in_flight:
+            filepath, future = in_flight.popleft()
+            next_path = next(files_iter, None)
+            if next_path is not None:
+                in_flight.append((next_path, split_pool.submit(split_file, next_path)))
+
+            try:
+                file_name, ids, texts, payloads = future.result()
+            except Exception as e:
+                print(f"\n❌ Error on {os.path.basename(filepath)}: {e}")
+                progress.update(1)
+                continue
+
+            file_hash, known_ids = plan[filepath]
+            pipeline.add(file_name, file_hash, ids, texts, payloads, known_ids)
+
+        pipeline.drain()
+
+    progress.close()
+    return pipeline.stored
+
+
+def build_keyword_index(client, collection_name=COLLECTION_NAME, path=KEYWORD_INDEX_PATH):
+    """Rebuilds the BM25 index used by hybrid retrieval from what is now in Qdrant."""
+    index = KeywordIndex.build_from_collection(client, collection_name)
+    index.save(path)
+    print(f"🔤 Keyword index rebuilt: {len(index)} chunks, {len(index.terms)} terms.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed markdown files into Qdrant.")
+    parser.add_argument("--sequential", action="store_true", help="use the original one-file-at-a-time loop")
+    parser.add_argument("--workers", type=int, default=SPLIT_WORKERS, help="split worker processes")
+    parser.add_argument("--no-embedding-cache", action="store_true", help="always call the model")
+    parser.add_argument("--embedder", choices=BACKENDS, help="encoder backend (default: $EMBEDDER_BACKEND or torch)")
+    parser.add_argument("--profile", choices=PROFILES,
+                        help="storage profile when creating the collection (default: $COLLECTION_PROFILE or default)")
+    parser.add_argument("--changes", metavar="FEED",
+                        help="only apply a crawl changes feed (crawl_changes.json) instead of scanning DATA_DIR")
+    parser.add_argument("--purge-unseen", action="store_true",
+                        help="with --changes, also delete pages the crawl only didn't reach (not 404 / 410)")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--site", default=index_manager.SITE, help="which site's collection to update")
+    args = parser.parse_args()
+
+    # 1. INITIALIZE DB & MODEL
+    print("🔌 Connecting to Qdrant...")
+    client = index_manager.connect()
+
+    # Updates the serving version in place, file by file. For a full rebuild
+    # that only goes live once validated: python -m src.index_manager rebuild
+    # (An empty store gets a first version, served once it is complete and validated)
+    # (Quantization / on-disk options of a new collection: see src/collection_config.py)
+    collection = index_manager.ingest_target(client, args.site, args.profile)
+    print(f"📚 Updating '{collection}' (served as '{index_manager.alias_name(args.site)}')")
+
+    # 2. LOAD PROGRESS & DIFF AGAINST DISK
+    manifest_file = index_manager.manifest_path(collection)
+    first_manifest = not os.path.exists(manifest_file)
+    manifest = IngestManifest(manifest_file)
+    if first_manifest and os.path.exists(LOG_FILE):
+        seeded = seed_manifest(manifest, client, collection, args.data_dir)
+        print(f"🌱 Seeded the manifest with {seeded} files from {LOG_FILE} (no longer needed after this run).")
+    if manifest.files:
+        print(f"🔄 Resuming... Manifest has {len(manifest.files)} indexed files.")
+
+    removed = None
+    if args.changes:
+        files, removed = load_changes(args.changes, args.data_dir, args.purge_unseen)
+        print(f"📰 Changes feed: {len(files)} new or changed pages, {len(removed)} removed.")
+    else:
+        files = glob.glob(os.path.join(args.data_dir, "*.md"))
+    indexed_before = len(manifest.files)
+    plan = plan_ingestion(files, client, manifest, collection, removed=removed)
+    removed_files = len(manifest.files) < indexed_before
+
+    if not plan:
+        if removed_files or not os.path.exists(index_manager.keyword_index_path(collection)):
+            index_manager.refresh_keyword_index(client, collection, args.site)
+        print("✅ All files are already up to date!")
+        if index_manager.serving_version(client, args.site) is None and not index_manager.is_legacy(client, args.site):
+            # A first build whose validation failed earlier: try again
+            promoted = index_manager.promote_first(client, collection, connect_embedder(args.embedder),
+                                                   args.site, manifest)
+            raise SystemExit(0 if promoted else 1)
+        return
+
+    print(f"📂 Processing {len(plan)} new or changed files...")
+
+    print("🧠 Loading Embedding Model...")
+    embedding_model = connect_embedder(args.embedder)
+    store = None
+    if not args.no_embedding_cache:
+        # Keyed per backend: int8 / ONNX vectors differ slightly from fp32
+        store = EmbeddingStore(embedder_id(args.embedder))
+        embedding_model = CachedEmbedder(embedding_model, store)
+
+    # 3. PROCESSING LOOP
+    if args.sequential:
+        encoded = ingest_sequential(plan, client, embedding_model, manifest, collection)
+    else:
+        encoded = ingest_pipelined(plan, client, embedding_model, manifest, collection, workers=args.workers)
+
+    index_manager.refresh_keyword_index(client, collection, args.site)
+    print(f"\n✅ Ingestion complete. Encoded {encoded} new chunks.")
+    if store:
+        store.flush()
+        store.report()
 
-    print("\n✅ Ingestion complete.")
+    # 4. GO LIVE (first build only: nothing is served until it validates)
+    if not index_manager.promote_first(client, collection, embedding_model, args.site, manifest):
+        raise SystemExit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
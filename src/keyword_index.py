@@ -0,0 +1,162 @@
+# src/keyword_index.py
+"""
+Compact BM25 keyword index over the chunks in the Qdrant collection.
+
+Dense E5 retrieval is weak on exact tokens (circular numbers, phone numbers,
+school codes, Devanagari proper nouns). This index is built at ingestion time
+from the same `text` + `context` payloads and fused with the dense hits in
+MarathiRAG.retrieve(mode="hybrid").
+
+Stored as one .npz (CSR postings), so loading is a few array reads and the
+corpus is never re-tokenized at startup:
+
+    python -m src.keyword_index build     # rebuild for the serving collection
+"""
+import argparse
+import os
+import re
+import unicodedata
+from collections import Counter
+import numpy as np
+from src.index_manager import QDRANT_PATH, SERVING_COLLECTION, connect, keyword_index_path
+
+# Lives next to the Qdrant data so it ships with it (Dockerfile copies qdrant_db/).
+# One file per collection version; the serving alias's copy is what MarathiRAG loads.
+KEYWORD_INDEX_PATH = keyword_index_path(SERVING_COLLECTION)
+
+# Devanagari letters, vowel signs and virama (U+0900-U+0963) + Devanagari digits,
+# but not the danda / double danda (U+0964, U+0965) which are punctuation
+TOKEN_PATTERN = re.compile(r"[0-9a-z\u0900-\u0963\u0966-\u097F]+")
+# Phone numbers, circular / outward numbers: 020-2447 6938, 2024/345
+NUMBER_PATTERN = re.compile(r"\d[\d\-/. ]{3,}\d")
+DEVANAGARI_DIGITS = str.maketrans("\u0966\u0967\u0968\u0969\u096A\u096B\u096C\u096D\u096E\u096F", "0123456789")
+INVISIBLES = dict.fromkeys([0x200B, 0x200C, 0x200D, 0xFEFF])  # zero-width chars from copy-pasted HTML
+
+
+def tokenize(text):
+    """Lowercased word tokens; Devanagari digits folded to ASCII; joined numbers kept whole."""
+    text = unicodedata.normalize("NFC", text).translate(INVISIBLES).translate(DEVANAGARI_DIGITS).lower()
+    tokens = TOKEN_PATTERN.findall(text)
+    # "020-24476938" also becomes "02024476938", so either spelling matches
+    tokens.extend(re.sub(r"\D", "", m) for m in NUMBER_PATTERN.findall(text))
+    return tokens
+
+
+class KeywordIndex:
+    def __init__(self, terms, indptr, postings, tfs, doc_len, doc_ids, k1=1.2, b=0.75):
+        self.terms = terms
+        self.vocab = {t: i for i, t in enumerate(terms.tolist())}
+        self.indptr = indptr
+        self.postings = postings
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.doc_ids = doc_ids
+        self.k1 = k1
+        self.b = b
+        self.avgdl = float(doc_len.mean()) if len(doc_len) else 0.0
+
+    @classmethod
+    def build(cls, docs):
+        """docs: iterable of (point_id, text)."""
+        doc_ids, doc_len = [], []
+        term_docs = {}  # term -> ([doc index], [tf])
+        for doc_index, (point_id, text) in enumerate(docs):
+            counts = Counter(tokenize(text))
+            doc_ids.append(str(point_id))
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                entry = term_docs.setdefault(term, ([], []))
+                entry[0].append(doc_index)
+                entry[1].append(tf)
+
+        terms = sorted(term_docs)
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            indptr[i + 1] = indptr[i] + len(term_docs[term][0])
+        postings = np.fromiter((d for t in terms for d in term_docs[t][0]), dtype=np.int32, count=int(indptr[-1]))
+        tfs = np.fromiter((min(f, 65535) for t in terms for f in term_docs[t][1]), dtype=np.uint16, count=int(indptr[-1]))
+
+        return cls(np.array(terms, dtype=str), indptr, postings, tfs,
+                   np.array(doc_len, dtype=np.int32), np.array(doc_ids, dtype=str))
+
+    @classmethod
+    def build_from_collection(cls, client, collection_name):
+        """Indexes `context` + `text` of every point in the collection."""
+        def docs():
+            offset = None
+            while True:
+                records, offset = client.scroll(
+                    collection_name=collection_name, limit=1000, offset=offset,
+                    with_payload=["text", "context"], with_vectors=False
+                )
+                for r in records:
+                    yield r.id, f"{r.payload.get('context', '')}\n{r.payload.get('text', '')}"
+                if offset is None:
+                    return
+        return cls.build(docs())
+
+    def save(self, path=KEYWORD_INDEX_PATH):
+        # Write to a temp file then rename, so a running app never loads half an index
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, terms=self.terms, indptr=self.indptr, postings=self.postings,
+                 tfs=self.tfs, doc_len=self.doc_len, doc_ids=self.doc_ids)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=KEYWORD_INDEX_PATH):
+        with np.load(path) as data:
+            return cls(data["terms"], data["indptr"], data["postings"], data["tfs"],
+                       data["doc_len"], data["doc_ids"])
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def search(self, query, top_k=20):
+        """Returns [(point_id, bm25_score)] best first."""
+        n_docs = len(self.doc_ids)
+        if not n_docs:
+            return []
+
+        scores = np.zeros(n_docs, dtype=np.float32)
+        for term in set(tokenize(query)):
+            i = self.vocab.get(term)
+            if i is None:
+                continue
+            docs = self.postings[self.indptr[i]:self.indptr[i + 1]]
+            tf = self.tfs[self.indptr[i]:self.indptr[i + 1]].astype(np.float32)
+            idf = np.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_len[docs] / self.avgdl)
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        top = matched[np.argsort(-scores[matched])[:top_k]]
+        return [(str(self.doc_ids[i]), float(scores[i])) for i in top]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuses several ranked id lists. Returns [(id, score)] best first."""
+    fused = {}
+    for ranking in rankings:
+        for rank, point_id in enumerate(ranking):
+            fused[point_id] = fused.get(point_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: -item[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the BM25 keyword index from Qdrant.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--qdrant-path", default=QDRANT_PATH)
+    parser.add_argument("--collection", default=SERVING_COLLECTION)
+    parser.add_argument("--output", default=KEYWORD_INDEX_PATH)
+    args = parser.parse_args()
+
+    client = connect(args.qdrant_path)
+    index = KeywordIndex.build_from_collection(client, args.collection)
+    index.save(args.output)
+    print(f"🔤 Keyword index: {len(index)} chunks, {len(index.terms)} terms -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
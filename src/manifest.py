@@ -0,0 +1,82 @@
+# src/manifest.py
+"""
+Ingestion manifest: what is currently indexed, per file.
+
+Stored as append-only JSON lines (like processed_files.txt, a crash can at
+worst lose the last line). Each record is
+
+    {"file_name": ..., "file_hash": <sha256 of the file>, "chunks": [<chunk ids>]}
+
+or a tombstone {"file_name": ..., "deleted": true}. The last record for a
+file wins. Chunk ids are the uuid5 of the chunk text + file name used as
+Qdrant point ids, so they double as per-chunk content hashes.
+"""
+import hashlib
+import json
+import os
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    def __init__(self, path):
+        self.path = path
+        self.files = {}  # file_name -> {"file_hash": str, "chunks": [ids]}
+        self._lines = 0
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line from an interrupted run
+                    self._lines += 1
+                    if record.get("deleted"):
+                        self.files.pop(record["file_name"], None)
+                    else:
+                        self.files[record["file_name"]] = record
+
+            # Keep the log from growing without bound across many runs
+            if self._lines > 2 * len(self.files) + 100:
+                self.compact()
+
+    def get(self, file_name):
+        return self.files.get(file_name)
+
+    def is_unchanged(self, file_name, file_hash):
+        entry = self.files.get(file_name)
+        return entry is not None and entry["file_hash"] == file_hash
+
+    def _append(self, record):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._lines += 1
+
+    def record(self, file_name, file_hash, chunk_ids):
+        """Marks a file as fully indexed. Call only after its points are persisted."""
+        record = {"file_name": file_name, "file_hash": file_hash, "chunks": list(chunk_ids)}
+        self._append(record)
+        self.files[file_name] = record
+
+    def forget(self, file_name):
+        self._append({"file_name": file_name, "deleted": True})
+        self.files.pop(file_name, None)
+
+    def compact(self):
+        """Rewrites the log with one record per live file (atomic replace)."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in self.files.values():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        self._lines = len(self.files)
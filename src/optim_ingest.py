@@ -1,133 +1,148 @@
 import os
 import glob
+import argparse
+from collections import deque
 from tqdm import tqdm
-from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
-from sentence_transformers import SentenceTransformer
-from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, VectorParams, Distance
+from src import index_manager
+from src.embedders import connect_embedder, embedder_id
+from src.embedding_store import CachedEmbedder, EmbeddingStore
+from src.ingest import iter_chunks
+from src.keyword_index import KeywordIndex
+from src.manifest import IngestManifest, file_sha256
+
+# Run from the project root: python -m src.optim_ingest
+# Full rebuild into a new collection version; the serving alias only moves to
+# it after validation, so the app never answers from a half-built index.
+#
+# Streams the corpus in fixed windows of WINDOW_CHUNKS chunks: split -> encode
+# -> upload, then the next window. Files are chunked lazily, so only one window
+# of texts and one (WINDOW_CHUNKS, 1024) float32 matrix (~2 MB) is in RAM at a
+# time, however large the corpus or any single file in it (plus that file's
+# chunk ids for the manifest; peak RSS: python -m src.bench_optim_ingest).
+# Chunk ids and payloads are ingest.py's (uuid5 of the chunk), and a manifest
+# is written, so src/ingest.py can later update this version incrementally.
 
 # --- CONFIGURATION ---
 DATA_DIR = r"C:\Users\sahil\OneDrive\Desktop\Projects\AI Projects\Scert Chatbot\data\raw_markdown"
-COLLECTION_NAME = "scert_bot"
-QDRANT_PATH = "qdrant_db"
 BATCH_SIZE = 64  # Optimized for 16GB RAM (Safe range: 32-128)
+WINDOW_CHUNKS = 512   # Chunks split, encoded and uploaded together
+UPLOAD_BATCH = 256    # Points per request to Qdrant
+
+
+def iter_files(files):
+    """Yields (file_name, file_hash, chunk iterator) one file at a time; chunks are read lazily."""
+    for filepath in files:
+        file_name = os.path.basename(filepath)
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                yield file_name, file_sha256(filepath), iter_chunks(file_name, f)
+        except Exception as e:
+            print(f"⚠️ Error reading {file_name}: {e}")
+
+
+def ingest_stream(files, client, collection_name, embedding_model, manifest=None,
+                  window=WINDOW_CHUNKS, batch_size=BATCH_SIZE):
+    """
+    Indexes `files` window by window, however many chunks one file has. A
+    file is recorded in `manifest` once the window holding its last chunk is
+    uploaded (only its chunk ids are kept until then). Returns the number of chunks.
+    """
+    progress = tqdm(total=len(files), desc="Ingesting", unit="file")
+    ids, texts, payloads = [], [], []
+    waiting = deque()       # (file_name, file_hash, chunk ids, chunks appended up to its end)
+    appended = uploaded = 0
+
+    def upload(n):
+        nonlocal uploaded
+        if n:
+            vectors = embedding_model.encode(texts[:n], batch_size=batch_size, show_progress_bar=False)
+            # The array goes in as is: the client converts whole batches, not one vector at a time
+            client.upload_collection(collection_name=collection_name, ids=ids[:n], vectors=vectors,
+                                     payload=payloads[:n], batch_size=UPLOAD_BATCH, wait=True)
+            del ids[:n], texts[:n], payloads[:n]
+            uploaded += n
+
+        while waiting and waiting[0][3] <= uploaded:
+            file_name, file_hash, chunk_ids, _ = waiting.popleft()
+            if manifest is not None:
+                manifest.record(file_name, file_hash, chunk_ids)
+            progress.update(1)
+
+    for file_name, file_hash, chunks in iter_files(files):
+        file_ids = []
+        try:
+            for chunk_id, text, payload in chunks:
+                ids.append(chunk_id)
+                texts.append(text)
+                payloads.append(payload)
+                file_ids.append(chunk_id)
+                appended += 1
+                if len(ids) >= window:
+                    upload(window)
+        except Exception as e:
+            # Not recorded: the file is ingested again next time (its uploaded chunks are overwritten)
+            print(f"⚠️ Error reading {file_name}: {e}")
+            buffered = min(len(file_ids), len(ids))
+            del ids[len(ids) - buffered:], texts[len(texts) - buffered:], payloads[len(payloads) - buffered:]
+            appended -= buffered
+            progress.update(1)
+            continue
+        waiting.append((file_name, file_hash, file_ids, appended))
+    if ids or waiting:
+        upload(len(ids))
+
+    progress.close()
+    return uploaded
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Full rebuild of the collection, streamed in fixed windows.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--window", type=int, default=WINDOW_CHUNKS, help="chunks per split/encode/upload window")
+    parser.add_argument("--site", default=index_manager.SITE, help="which site's collection to rebuild")
+    args = parser.parse_args()
+
     # 1. INITIALIZE DATABASE & MODEL
     print("🔌 Connecting to Qdrant...")
-    client = QdrantClient(path=QDRANT_PATH)
-    
-    # Create collection if it doesn't exist
-    if not client.collection_exists(COLLECTION_NAME):
-        client.create_collection(
-            collection_name=COLLECTION_NAME,
-            vectors_config=VectorParams(size=1024, distance=Distance.COSINE)
-        )
+    client = index_manager.connect()
 
     print("🧠 Loading Embedding Model (intfloat/multilingual-e5-large)...")
     # This might take a moment to load into RAM
-    embedding_model = SentenceTransformer('intfloat/multilingual-e5-large')
-
-    # 2. SETUP SPLITTERS
-    # Split by Markdown headers first to preserve structure
-    markdown_splitter = MarkdownHeaderTextSplitter(headers_to_split_on=[
-        ("#", "Header 1"),
-        ("##", "Header 2"),
-        ("###", "Header 3"),
-        ("####", "Header 4"),
-    ])
-    
-    # Then split purely by characters for large sections
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=800,
-        chunk_overlap=100,
-        separators=["\n\n", "\n", " | ", "。", " "]
-    )
-
-    # 3. LOAD & CHUNK FILES (Stage 1)
-    files = glob.glob(os.path.join(DATA_DIR, "*.md"))
+    # Backend from $EMBEDDER_BACKEND (see src/embedders.py)
+    embedding_model = connect_embedder()
+    # Re-runs only encode chunks whose text changed (see src/embedding_store.py)
+    store = EmbeddingStore(embedder_id())
+    embedding_model = CachedEmbedder(embedding_model, store)
+
+    # 2. FIND FILES (split below)
+    # Split by Markdown headers first to preserve structure, then by characters
+    # for large sections (800/100), keeping each chunk under e5's 512 tokens
+    files = glob.glob(os.path.join(args.data_dir, "*.md"))
     if not files:
-        print(f"❌ No markdown files found in '{DATA_DIR}'. Please check the path.")
+        print(f"❌ No markdown files found in '{args.data_dir}'. Please check the path.")
         return
 
-    all_chunks_data = [] # Buffer to hold processed text before encoding
-    
-    print(f"\n📂 Step 1: Processing {len(files)} files...")
-    
-    for file_index, filepath in enumerate(tqdm(files, desc="Reading Files", unit="file")):
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # --- Extract Metadata ---
-            lines = content.split('\n')
-            source_url = "https://www.maa.ac.in/"
-            clean_content = content
-
-            if lines and lines[0].startswith("Source:"):
-                source_url = lines[0].replace("Source:", "").strip()
-                clean_content = "\n".join(lines[1:])
-
-            # --- Splitting ---
-            header_splits = markdown_splitter.split_text(clean_content)
-            final_chunks = text_splitter.split_documents(header_splits)
-
-            # --- Buffer Data ---
-            for chunk_index, chunk in enumerate(final_chunks):
-                # Context string (e.g. "History > Establishment")
-                header_context = " > ".join(chunk.metadata.values())
-                full_text = f"{header_context}\n{chunk.page_content}"
-                
-                all_chunks_data.append({
-                    "id": f"{file_index}_{chunk_index}",
-                    "full_text": full_text,  # Text to embed
-                    "payload": {             # Data to store
-                        "text": chunk.page_content,
-                        "context": header_context,
-                        "source_url": source_url,
-                        "file_name": os.path.basename(filepath)
-                    }
-                })
+    # 3. SPLIT -> ENCODE -> UPLOAD, ONE WINDOW AT A TIME
+    # Into a new version of the site's collection (not serving until step 5)
+    # Profile from $COLLECTION_PROFILE (quantization / on-disk, see src/collection_config.py)
+    collection_name = index_manager.create_version(client, args.site)
+    manifest = IngestManifest(index_manager.manifest_path(collection_name))
+    print(f"\n⚡ Streaming {len(files)} files into '{collection_name}' ({args.window} chunks per window)...")
+    total_chunks = ingest_stream(files, client, collection_name, embedding_model, manifest, window=args.window)
 
-        except Exception as e:
-            print(f"⚠️ Error reading {os.path.basename(filepath)}: {e}")
-
-    # 4. BATCH ENCODING (Stage 2)
-    total_chunks = len(all_chunks_data)
-    print(f"\n⚡ Step 2: Encoding {total_chunks} chunks (Batch Size: {BATCH_SIZE})...")
-    
-    # Prepare texts with the "passage:" prefix required by E5 models
-    texts_to_encode = ["passage: " + item["full_text"] for item in all_chunks_data]
-    
-    # Encode all at once (fastest method on CPU/GPU)
-    # This automatically shows a progress bar
-    vectors = embedding_model.encode(
-        texts_to_encode, 
-        batch_size=BATCH_SIZE, 
-        show_progress_bar=True
-    )
-
-    # 5. UPLOAD TO QDRANT (Stage 3)
-    print(f"\n💾 Step 3: Uploading to Database...")
-    
-    points_batch = []
-    
-    # We upload in batches of 100 to avoid locking the DB
-    for i, (data, vector) in enumerate(zip(all_chunks_data, vectors)):
-        points_batch.append(
-            PointStruct(
-                id=data["id"],
-                vector=vector.tolist(),
-                payload=data["payload"]
-            )
-        )
-        
-        # Upload when batch is full or at the very end
-        if len(points_batch) >= 100 or i == total_chunks - 1:
-            client.upsert(collection_name=COLLECTION_NAME, points=points_batch)
-            points_batch = [] # Reset batch
-
-    print(f"✅ Success! Indexed {total_chunks} chunks into '{COLLECTION_NAME}'.")
+    store.flush()
+    store.report()
+
+    # 4. KEYWORD INDEX (for hybrid retrieval)
+    keyword_index = KeywordIndex.build_from_collection(client, collection_name)
+    keyword_index.save(index_manager.keyword_index_path(collection_name))
+    print(f"🔤 Keyword index rebuilt: {len(keyword_index)} chunks.")
+    print(f"✅ Success! Indexed {total_chunks} chunks into '{collection_name}'.")
+
+    # 5. GO LIVE (point count + smoke queries, then atomic alias swap)
+    # promote() prints each failed check; a non-zero exit tells cron / CI the rebuild didn't go live
+    promoted = index_manager.promote(client, collection_name, embedding_model, args.site, expected_points=total_chunks)
+    raise SystemExit(0 if promoted else 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
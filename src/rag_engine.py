@@ -1,10 +1,25 @@
 # src/rag_engine.py
+import asyncio
 import os
+import re
+import threading
+import time
+import unicodedata
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
 import google.generativeai as genai
 from pathlib import Path
+from qdrant_client.models import QueryRequest, ScoredPoint
+from src.batching import QueryBatcher, make_embedding_pool
+from src.collection_config import search_params_for
+from src.context_budget import DEFAULT_TOKEN_BUDGET, ContextBudgeter, estimate_tokens, format_block, source_link
+from src.embedders import connect_embedder
+from src.index_manager import QDRANT_PATH, SERVING_COLLECTION, connect, manifest_path, resolve
+from src.keyword_index import KEYWORD_INDEX_PATH, KeywordIndex, reciprocal_rank_fusion
+from src.tracing import Tracer, annotate, span
 
 # Load environment variables
 load_dotenv()
@@ -12,54 +27,390 @@ load_dotenv()
 # Configure Gemini
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
+NOT_FOUND_ANSWER = "Maaf kara, mala yabadal mahiti sapadli nahi. (Sorry, I couldn't find info on this.)"
+
+
+class AnswerCache:
+    """
+    Two-tier cache for query embeddings and generated answers.
+
+    1. Exact tier: keyed on the normalized query text. A hit skips both the
+       E5 encode and the LLM call.
+    2. Semantic tier (off by default): a new query whose embedding is at
+       least `similarity_threshold` cosine-similar to a cached query reuses
+       that answer (skips the LLM call, the encode has already been paid).
+       e5 query cosines sit in a compressed high range, so the same template
+       with another number or office can score above any fixed cutoff: only
+       set a threshold calibrated on labeled paraphrase / non-paraphrase pairs.
+
+    Entries expire after `ttl_seconds` and the least recently used entry is
+    evicted once `max_entries` is reached. The whole cache is dropped when the
+    Qdrant collection changes (see `MarathiRAG._check_collection_version`).
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=6 * 3600, similarity_threshold=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries = OrderedDict()  # normalized query -> entry dict
+        self._lock = threading.Lock()  # Streamlit sessions share one engine
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.embedding_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def normalize(query):
+        """Canonical form used as the exact-match key."""
+        text = unicodedata.normalize("NFC", query).casefold()
+        text = re.sub(r"\s+", " ", text).strip()
+        # "प्रवेश कधी आहे?" and "प्रवेश कधी आहे" are the same question
+        return text.rstrip(" ?.!।॥")
+
+    def _expired(self, entry, now):
+        return now - entry["created"] > self.ttl_seconds
+
+    def _get(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry, now):
+            del self._entries[key]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get_vector(self, query):
+        """Returns the cached query embedding, or None."""
+        with self._lock:
+            entry = self._get(self.normalize(query), time.time())
+            if entry is None:
+                return None
+            self.embedding_hits += 1
+            return entry["vector"]
+
+    def get_answer(self, query, query_vector=None):
+        """
+        Looks up a cached (answer, sources) pair.
+        Tries the exact tier first, then the semantic tier if a vector is given.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._get(self.normalize(query), now)
+            if entry is not None and entry["answer"] is not None:
+                self.exact_hits += 1
+                return entry["answer"], list(entry["sources"])
+
+            if query_vector is not None and self.similarity_threshold is not None:
+                match = self._most_similar(query_vector, now)
+                if match is not None:
+                    self.semantic_hits += 1
+                    return match["answer"], list(match["sources"])
+
+            self.misses += 1
+            return None
+
+    def _most_similar(self, query_vector, now):
+        candidates = [
+            e for e in self._entries.values()
+            if e["answer"] is not None and not self._expired(e, now)
+        ]
+        if not candidates:
+            return None
+
+        matrix = np.stack([e["unit"] for e in candidates])
+        scores = matrix @ _unit(query_vector)
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        return candidates[best]
+
+    def put(self, query, query_vector, answer=None, sources=None):
+        """Stores a query embedding and (optionally) its answer. Blank answers are not kept."""
+        if answer is not None and not answer.strip():
+            # e.g. a safety-blocked response or a stream with only a finish_reason chunk
+            answer = None
+        key = self.normalize(query)
+        vector = np.asarray(query_vector, dtype=np.float32)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if answer is None and previous is not None:
+                # Don't lose an answer when only refreshing the embedding
+                answer, sources = previous["answer"], previous["sources"]
+            self._entries[key] = {
+                "vector": vector,
+                "unit": _unit(vector),
+                "answer": answer,
+                "sources": list(sources or []),
+                "created": time.time(),
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "embedding_hits": self.embedding_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def _file_marker(path):
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
 class MarathiRAG:
-    def __init__(self, db_path=r"qdrant_db", collection_name="scert_bot"):
+    def __init__(self, db_path=QDRANT_PATH, collection_name=SERVING_COLLECTION, cache=None,
+                 cache_check_interval=30, embedder=None, client=None, model=None,
+                 embed_workers=1, embed_batch_size=32, embed_wait_ms=10, llm_concurrency=8,
+                 keyword_index_path=KEYWORD_INDEX_PATH, retrieval_mode=None,
+                 context_token_budget=DEFAULT_TOKEN_BUDGET, context_budgeter=None,
+                 embedder_backend=None, tracer=None, top_k=20):
 
         base_dir = Path(__file__).resolve().parent
         paf = base_dir / ".." / db_path
+        self.project_dir = base_dir / ".."
 
-        # Load the same model used in ingestion
-        self.embedder = SentenceTransformer('intfloat/multilingual-e5-large')
-        self.client = QdrantClient(path=paf)
+        # embedder / client / model can be injected (see src/fakes.py for local stand-ins)
+        # Load the same model used in ingestion (backend from $EMBEDDER_BACKEND, see src/embedders.py)
+        self.embedder = embedder or connect_embedder(embedder_backend)
+        self.client = client or connect(paf)
+        # Usually a serving alias: re-pointed atomically by src/index_manager.py
         self.collection = collection_name
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.top_k = top_k  # Hits retrieved per question, before context budgeting
+        self.model = model or genai.GenerativeModel('gemini-2.5-flash')
+        # Rescoring / hnsw_ef params if the collection uses quantization
+        self.search_params = None
+        if self.client.collection_exists(self.collection):
+            self.search_params = search_params_for(self.client, self.collection)
+
+        # Pass cache=False to disable caching entirely
+        self.cache = AnswerCache() if cache is None else (cache or None)
+        self.cache_check_interval = cache_check_interval
+        self._collection_version = None
+        self._last_version_check = 0.0
+
+        # Async path: one bounded encode pool shared by all event loops,
+        # plus a batcher + LLM semaphore per loop (asyncio objects are loop-bound)
+        self._embed_pool = make_embedding_pool(embed_workers)
+        self._llm_pool = ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix="llm")
+        self.embed_batch_size = embed_batch_size
+        self.embed_wait_ms = embed_wait_ms
+        self.llm_concurrency = llm_concurrency
+        self._loop_state = weakref.WeakKeyDictionary()
+
+        # Hybrid retrieval: "dense" (default) or "hybrid" (dense + BM25, fused with RRF)
+        self.retrieval_mode = retrieval_mode or os.getenv("RETRIEVAL_MODE", "dense")
+        self.keyword_index_path = base_dir / ".." / keyword_index_path
+        self.keyword_index = None
+        self._keyword_index_mtime = None
+        self._load_keyword_index()
+
+        # Context assembly: merge / dedupe / token-cap hits before prompting.
+        # Pass context_budgeter=False to send all hits verbatim.
+        if context_budgeter is None:
+            context_budgeter = ContextBudgeter(max_tokens=context_token_budget)
+        self.context_budgeter = context_budgeter or None
+
+        # Per-request spans + token counts (see src/tracing.py)
+        self.tracer = tracer or Tracer()
+
+    def _load_keyword_index(self):
+        """(Re)loads the BM25 index if the file changed since it was last loaded."""
+        try:
+            mtime = os.path.getmtime(self.keyword_index_path)
+        except OSError:
+            return None
+        if mtime != self._keyword_index_mtime:
+            self.keyword_index = KeywordIndex.load(self.keyword_index_path)
+            self._keyword_index_mtime = mtime
+        return self.keyword_index
+
+    def _check_collection_version(self):
+        """Drops the cache if the collection was re-ingested (or the alias swapped) since the last check."""
+        now = time.time()
+        if now - self._last_version_check < self.cache_check_interval:
+            return
+        self._last_version_check = now
+
+        info = self.client.get_collection(self.collection)
+        target = resolve(self.client, self.collection)
+        # Re-ingesting a page can replace its chunks without changing the point count,
+        # but every ingest records the file in the version's manifest and rebuilds the BM25 index
+        version = (target, info.points_count, str(info.status),
+                   _file_marker(self.project_dir / manifest_path(target)), _file_marker(self.keyword_index_path))
+        if self._collection_version is not None and version != self._collection_version:
+            self.cache.invalidate()
+            if version[0] != self._collection_version[0]:
+                # The new version may use another storage profile
+                self.search_params = search_params_for(self.client, self.collection)
+        self._collection_version = version
+
+    def embed_query(self, query):
+        """Encodes a query with E5, reusing a cached embedding when possible."""
+        if self.cache:
+            self._check_collection_version()
+            cached = self.cache.get_vector(query)
+            if cached is not None:
+                annotate(embedding_cached=True)
+                return cached
 
-    def retrieve(self, query, top_k=20):
-        """Searches the vector DB for relevant chunks."""
         # 'query:' prefix is required for E5 models
-        query_vector = self.embedder.encode(f"query: {query}").tolist()
+        with span("embed"):
+            vector = self.embedder.encode(f"query: {query}")
+        if self.cache:
+            self.cache.put(query, vector)
+        return vector
+
+    def retrieve(self, query, top_k=20, query_vector=None, mode=None, with_vectors=False):
+        """Searches the vector DB for relevant chunks (mode: "dense" or "hybrid")."""
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+        query_vector = np.asarray(query_vector).tolist()
+
+        mode = mode or self.retrieval_mode
+        keyword_index = self._load_keyword_index() if mode == "hybrid" else None
+        # Hybrid needs a deeper dense list so fusion has something to re-order
+        limit = top_k * 2 if keyword_index else top_k
         
-        # Use query_points (Robust Fallback)
-        # This is the direct API call which is less likely to break than .search()
-        results = self.client.query_points(
-            collection_name=self.collection,
-            query=query_vector,
-            limit=top_k
-        ).points  # Note: We access .points attribute here
+        with span("search"):
+            # Use query_points (Robust Fallback)
+            # This is the direct API call which is less likely to break than .search()
+            results = self.client.query_points(
+                collection_name=self.collection,
+                query=query_vector,
+                limit=limit,
+                with_vectors=with_vectors,
+                search_params=self.search_params
+            ).points  # Note: We access .points attribute here
 
+            if keyword_index is not None:
+                results = self._fuse(results, keyword_index.search(query, limit), top_k, with_vectors)
+
+        annotate(mode=mode, hits=len(results), top_scores=[round(hit.score, 4) for hit in results[:5]])
         return results
 
-    def generate_answer(self, user_query):
-        """Orchestrates the RAG flow."""
-        
-        # 1. Retrieve Context
-        hits = self.retrieve(user_query)
-        
-        if not hits:
-            return "Maaf kara, mala yabadal mahiti sapadli nahi. (Sorry, I couldn't find info on this.)", []
+    def embed_queries(self, queries):
+        """Batch embed_query: one encode call for all queries without a cached embedding."""
+        vectors = [None] * len(queries)
+        if self.cache:
+            self._check_collection_version()
+            vectors = [self.cache.get_vector(query) for query in queries]
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            with span("embed"):
+                encoded = self.embedder.encode([f"query: {queries[i]}" for i in missing],
+                                               batch_size=self.embed_batch_size, show_progress_bar=False)
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+                if self.cache:
+                    self.cache.put(queries[i], vector)
+        return vectors
+
+    def retrieve_batch(self, queries, query_vectors, top_k=20, mode=None, with_vectors=False):
+        """retrieve() for many queries, with one query_batch_points call for the dense search."""
+        mode = mode or self.retrieval_mode
+        keyword_index = self._load_keyword_index() if mode == "hybrid" else None
+        limit = top_k * 2 if keyword_index else top_k
+
+        with span("search"):
+            responses = self.client.query_batch_points(
+                collection_name=self.collection,
+                requests=[
+                    QueryRequest(query=np.asarray(vector).tolist(), limit=limit, with_payload=True,
+                                 with_vector=with_vectors, params=self.search_params)
+                    for vector in query_vectors
+                ]
+            )
+            results = [response.points for response in responses]
+            if keyword_index is not None:
+                results = [self._fuse(hits, keyword_index.search(query, limit), top_k, with_vectors)
+                           for query, hits in zip(queries, results)]
+        return results
+
+    def _fuse(self, dense_hits, keyword_hits, top_k, with_vectors=False):
+        """Reciprocal rank fusion of dense and BM25 hits; returns ScoredPoints."""
+        by_id = {str(hit.id): hit for hit in dense_hits}
+        fused = reciprocal_rank_fusion([list(by_id), [pid for pid, _ in keyword_hits]])[:top_k]
 
-        # 2. Build Context String & Collect Sources
+        # Keyword-only hits have no payload yet
+        missing = [pid for pid, _ in fused if pid not in by_id]
+        if missing:
+            records = self.client.retrieve(
+                collection_name=self.collection,
+                ids=[int(pid) if pid.isdigit() else pid for pid in missing],
+                with_payload=True,
+                with_vectors=with_vectors
+            )
+            for r in records:
+                by_id[str(r.id)] = r
+
+        return [
+            ScoredPoint(id=by_id[pid].id, version=0, score=score,
+                        payload=by_id[pid].payload, vector=by_id[pid].vector)
+            for pid, score in fused if pid in by_id
+        ]
+
+    def _build_prompt(self, user_query, hits):
+        """Turns retrieved hits into the Gemini prompt. Returns (prompt, sources)."""
+        with span("context"):
+            prompt, sources, report = self._format_prompt(user_query, hits)
+        annotate(prompt_tokens=estimate_tokens(prompt), sources=len(sources))
+        # The report lives in this request's trace (the engine is shared by every session)
+        if report:
+            annotate(context_blocks=report["blocks"], context_tokens=report["tokens_after"],
+                     context_tokens_saved=report["tokens_saved"])
+        return prompt, sources
+
+    def _format_prompt(self, user_query, hits):
+        """Returns (prompt, sources, context report or None without a budgeter)."""
+        # Merge overlapping chunks, drop near-duplicates, cap tokens
+        report = None
+        if self.context_budgeter:
+            blocks, report = self.context_budgeter.assemble(user_query, hits)
+        else:
+            blocks = [{
+                "url": source_link(hit.payload),
+                "section": hit.payload.get('context', ''),
+                "text": hit.payload.get('text', ''),
+            } for hit in hits]
+
+        # Build Context String & Collect Sources
         context_parts = []
         sources = []
         unique_urls = set()
 
-        for hit in hits:
-            url = hit.payload.get('source_url', '#')
-            text = hit.payload.get('text', '')
-            section = hit.payload.get('context', '')
-            
-            # Format: [Source URL] Content...
-            context_parts.append(f"Source: {url}\nSection: {section}\nContent: {text}")
+        for block in blocks:
+            url = block["url"]
+            context_parts.append(format_block(block))
             
             if url not in unique_urls and url != "https://www.maa.ac.in/":
                 unique_urls.add(url)
@@ -67,7 +418,7 @@ class MarathiRAG:
 
         context_str = "\n\n---\n\n".join(context_parts)
 
-        # 3. Construct the Prompt
+        # Construct the Prompt
         # We explicitly tell Gemini to handle the mixed language.
         system_prompt = f"""
         You are an official academic assistant for **SCERT Maharashtra** (State Council of Educational Research and Training).
@@ -95,7 +446,184 @@ class MarathiRAG:
         ### USER QUESTION:
         {user_query}
         """
+        return system_prompt, sources, report
+
+    def _prepare(self, user_query):
+        """
+        Shared front half of the RAG flow (cache lookup, retrieval, prompt).
+        Returns (cached_answer, query_vector, prompt, sources); cached_answer is
+        None unless the cache or the "nothing found" path already has the answer.
+        """
+        # 0. Cache Lookup (exact query first, then near-duplicate embedding)
+        query_vector = self.embed_query(user_query)
+        if self.cache:
+            cached = self.cache.get_answer(user_query, query_vector)
+            if cached is not None:
+                answer, sources = cached
+                annotate(cache="hit")
+                return answer, query_vector, None, sources
+            annotate(cache="miss")
+
+        # 1. Retrieve Context (vectors too, for near-duplicate removal)
+        hits = self.retrieve(user_query, top_k=self.top_k, query_vector=query_vector,
+                             with_vectors=bool(self.context_budgeter))
+        
+        if not hits:
+            annotate(not_found=True)
+            return NOT_FOUND_ANSWER, query_vector, None, []
+
+        # 2. Build Context & Prompt
+        prompt, sources = self._build_prompt(user_query, hits)
+        return None, query_vector, prompt, sources
+
+    def prepare_batch(self, user_queries):
+        """
+        _prepare for many questions at once (batched encode and search), for
+        offline runs like src/batch_answer.py. Returns one
+        (cached_answer, query_vector, prompt, sources) tuple per question.
+        """
+        vectors = self.embed_queries(user_queries)
+        prepared = [None] * len(user_queries)
+        to_retrieve = []
+        for i, (user_query, query_vector) in enumerate(zip(user_queries, vectors)):
+            cached = self.cache.get_answer(user_query, query_vector) if self.cache else None
+            if cached is not None:
+                prepared[i] = (cached[0], query_vector, None, cached[1])
+            else:
+                to_retrieve.append(i)
+
+        if to_retrieve:
+            hit_lists = self.retrieve_batch([user_queries[i] for i in to_retrieve],
+                                            [vectors[i] for i in to_retrieve], top_k=self.top_k,
+                                            with_vectors=bool(self.context_budgeter))
+            for i, hits in zip(to_retrieve, hit_lists):
+                if not hits:
+                    prepared[i] = (NOT_FOUND_ANSWER, vectors[i], None, [])
+                    continue
+                prompt, sources = self._build_prompt(user_queries[i], hits)
+                prepared[i] = (None, vectors[i], prompt, sources)
+        return prepared
+
+    def generate_answer(self, user_query):
+        """Orchestrates the RAG flow."""
+        with self.tracer.request(user_query):
+            cached_answer, query_vector, prompt, sources = self._prepare(user_query)
+            if cached_answer is not None:
+                return cached_answer, sources
+
+            # 3. Generate Response
+            with span("llm"):
+                response = self.model.generate_content(prompt)
+            annotate(answer_tokens=estimate_tokens(response.text))
+
+            if self.cache:
+                self.cache.put(user_query, query_vector, response.text, sources)
+            return response.text, sources
+
+    def stream_answer(self, user_query):
+        """
+        Streaming version of generate_answer.
+        Yields ("text", delta) events as Gemini produces them, then a single
+        ("sources", [urls]) event once the answer is complete.
+        """
+        with self.tracer.request(user_query) as trace:
+            cached_answer, query_vector, prompt, sources = self._prepare(user_query)
+            if cached_answer is not None:
+                trace.spans["ttft"] = time.perf_counter() - trace.started
+                yield "text", cached_answer
+                yield "sources", sources
+                return
+
+            parts = []
+            llm_start = time.perf_counter()
+            for chunk in self.model.generate_content(prompt, stream=True):
+                try:
+                    delta = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. the final finish_reason chunk)
+                    continue
+                if delta:
+                    if not parts:
+                        trace.spans["ttft"] = time.perf_counter() - trace.started
+                    parts.append(delta)
+                    yield "text", delta
+            # Wall time while streaming includes the consumer (e.g. UI rendering between chunks)
+            trace.spans["llm"] = time.perf_counter() - llm_start
+            answer = "".join(parts)
+            annotate(answer_tokens=estimate_tokens(answer))
+
+            if self.cache:
+                self.cache.put(user_query, query_vector, answer, sources)
+            yield "sources", sources
+
+    # --- ASYNC PATH ---
+
+    def _async_state(self):
+        """Returns (batcher, llm_semaphore) for the running event loop."""
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None:
+            batcher = QueryBatcher(
+                self.embedder, self._embed_pool,
+                max_batch_size=self.embed_batch_size, max_wait_ms=self.embed_wait_ms
+            )
+            state = (batcher, asyncio.Semaphore(self.llm_concurrency))
+            self._loop_state[loop] = state
+        return state
+
+    async def aembed_query(self, query):
+        """Async embed_query: concurrent callers share one batched encode."""
+        if self.cache:
+            await asyncio.to_thread(self._check_collection_version)
+            cached = self.cache.get_vector(query)
+            if cached is not None:
+                annotate(embedding_cached=True)
+                return cached
+
+        batcher, _ = self._async_state()
+        with span("embed"):
+            vector = await batcher.encode(f"query: {query}")
+        if self.cache:
+            self.cache.put(query, vector)
+        return vector
+
+    async def aretrieve(self, query, top_k=20, query_vector=None, mode=None, with_vectors=False):
+        """Async retrieve; the Qdrant call runs in a worker thread."""
+        if query_vector is None:
+            query_vector = await self.aembed_query(query)
+        return await asyncio.to_thread(self.retrieve, query, top_k, query_vector, mode, with_vectors)
+
+    async def agenerate_answer(self, user_query):
+        """Async generate_answer with batched encodes and bounded LLM concurrency."""
+        with self.tracer.request(user_query):
+            query_vector = await self.aembed_query(user_query)
+            if self.cache:
+                cached = self.cache.get_answer(user_query, query_vector)
+                annotate(cache="miss" if cached is None else "hit")
+                if cached is not None:
+                    return cached
+
+            hits = await self.aretrieve(user_query, top_k=self.top_k, query_vector=query_vector,
+                                        with_vectors=bool(self.context_budgeter))
+            if not hits:
+                annotate(not_found=True)
+                return NOT_FOUND_ANSWER, []
+
+            prompt, sources = self._build_prompt(user_query, hits)
+
+            _, llm_semaphore = self._async_state()
+            async with llm_semaphore:
+                # Started after the semaphore: queueing for a slot isn't model latency
+                with span("llm"):
+                    if hasattr(self.model, "generate_content_async"):
+                        response = await self.model.generate_content_async(prompt)
+                    else:
+                        # Blocking SDK call: run on our own pool so it isn't capped by
+                        # the (small) default executor
+                        loop = asyncio.get_running_loop()
+                        response = await loop.run_in_executor(self._llm_pool, self.model.generate_content, prompt)
+            annotate(answer_tokens=estimate_tokens(response.text))
 
-        # 4. Generate Response
-        response = self.model.generate_content(system_prompt)
-        return response.text, sources
\ No newline at end of file
+            if self.cache:
+                self.cache.put(user_query, query_vector, response.text, sources)
+            return response.text, sources
@@ -1,22 +1,39 @@
 import asyncio
+import hashlib
+import itertools
+import json
 import os
 import re
-from urllib.parse import urlparse, urljoin
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin, parse_qsl, urlencode
 from bs4 import BeautifulSoup
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+from src.crawl_state import CHANGES_FILE, CRAWL_STATE_FILE, CrawlState, content_hash
 
 # --- CONFIGURATION ---
 BASE_URL = "https://www.maa.ac.in/"
 MAX_PAGES = 100
+MAX_DEPTH = 6
 OUTPUT_DIR = "crawled_data"
+CONCURRENCY = 4             # Parallel page fetches
+REQUESTS_PER_SECOND = 4.0   # Per-host politeness limit
+CHECKPOINT_FILE = "crawl_checkpoint.json"
+CHECKPOINT_EVERY = 10       # Pages between checkpoint writes
+
+# Documents downloaded and converted to markdown when crawl() gets a DocumentFetcher (src/documents.py)
+DOCUMENT_EXTENSIONS = ('.pdf', '.docx', '.xlsx')
+MAX_DOCUMENT_MB = 50        # Larger downloads (and re-crawl probes) are abandoned
 
 # File extensions to IGNORE
 IGNORED_EXTENSIONS = (
-    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp',
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp',
     '.css', '.js', '.json', '.xml', '.ico',
     '.zip', '.tar', '.gz', '.rar', '.7z',
     '.mp3', '.mp4', '.avi', '.mov', '.mkv',
-    '.xls', '.xlsx', '.csv', '.doc', '.docx', '.ppt', '.pptx',
+    '.xls', '.csv', '.doc', '.ppt', '.pptx',
     '.exe', '.bin', '.iso', '.dmg'
 )
 
@@ -25,6 +42,23 @@ def normalize_domain(url):
     netloc = urlparse(url).netloc
     return netloc.replace('www.', '')
 
+def canonicalize_url(url):
+    """
+    Dedupe key for a URL. Pages that differ only by fragment, 'www.', default
+    port, trailing slash, host case or query-parameter order map to one key.
+    (The original URL is still the one fetched.)
+    """
+    parts = urlparse(url.split('#')[0])
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and (parts.scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    # Scheme is ignored: http and https serve the same pages here
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
 def get_safe_filename(url):
     """
     Converts a URL into a Windows-safe filename.
@@ -34,104 +68,498 @@ def get_safe_filename(url):
     """
     # Remove http/https
     clean_name = url.replace("https://", "").replace("http://", "")
-    
+
     # Replace ALL illegal characters with underscore
     # Forbidden on Windows: < > : " / \ | ? *
     clean_name = re.sub(r'[<>:"/\\|?*]', '_', clean_name)
-    
+
     # Limit length (Windows has a 255 char path limit)
     return clean_name[:100]
 
-async def crawl_recursive():
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    visited = set()
-    queue = [BASE_URL]
-    target_domain = normalize_domain(BASE_URL)
-    
-    print(f"🚀 Starting Deep Crawl for: {BASE_URL}")
-    print(f"🎯 Target Domain: {target_domain}")
-
-    browser_conf = BrowserConfig(
-        headless=True,
-        accept_downloads=True, # Prevents crash on download links
-        verbose=False
-    )
-    
-    run_conf = CrawlerRunConfig(
-        cache_mode=CacheMode.BYPASS
-    )
-
-    async with AsyncWebCrawler(config=browser_conf) as crawler:
-        while queue and len(visited) < MAX_PAGES:
-            current_url = queue.pop(0)
-            
-            # Normalize URL (strip fragment #)
-            current_url = current_url.split('#')[0]
-
-            if current_url in visited:
-                continue
-
-            # Skip binary files
-            if current_url.lower().split('?')[0].endswith(IGNORED_EXTENSIONS):
-                continue
-            
-            visited.add(current_url)
-            print(f"🕷️ Crawling ({len(visited)}/{MAX_PAGES}): {current_url}")
 
-            try:
-                # 1. SCRAPE
-                result = await crawler.arun(url=current_url, config=run_conf)
-                
-                if not result.success:
-                    print(f"   ⚠️ Failed to load: {current_url}")
-                    continue
-
-                # 2. SAVE CONTENT (With Fixed Filename Logic)
-                safe_name = get_safe_filename(current_url)
-                filepath = os.path.join(OUTPUT_DIR, f"{safe_name}.md")
-                
-                with open(filepath, "w", encoding="utf-8") as f:
-                    f.write(f"Source: {current_url}\n\n")
-                    f.write(result.markdown)
-
-                # 3. EXTRACT LINKS (Hybrid: Crawl4AI + BeautifulSoup)
-                found_links = set()
-
-                # Method A: Crawl4AI detected links
-                if result.links and "internal" in result.links:
-                    for link in result.links['internal']:
-                        found_links.add(link['href'])
-
-                # Method B: Manual BS4 Parse (catches what Method A misses)
-                soup = BeautifulSoup(result.html, 'html.parser')
-                for a_tag in soup.find_all('a', href=True):
-                    raw_link = a_tag['href']
-                    absolute_link = urljoin(current_url, raw_link)
-                    found_links.add(absolute_link)
-
-                # 4. FILTER & QUEUE
-                new_links_count = 0
-                for link in found_links:
-                    clean_link = link.split('#')[0]
-                    link_domain = normalize_domain(clean_link)
-
-                    if (link_domain == target_domain and 
-                        clean_link not in visited and 
-                        clean_link not in queue and
-                        not clean_link.lower().split('?')[0].endswith(IGNORED_EXTENSIONS)):
-                        
-                        queue.append(clean_link)
-                        new_links_count += 1
-                
-                print(f"   ↳ Added {new_links_count} new pages.")
+class Frontier:
+    """
+    URLs waiting to be crawled, shallowest first (one FIFO deque per depth).
+    push / pop / membership are O(1); dedupe is on canonicalize_url().
+    """
+
+    def __init__(self, max_depth=MAX_DEPTH):
+        self.max_depth = max_depth
+        self.levels = [deque() for _ in range(max_depth + 1)]
+        self.seen = set()   # canonical keys ever queued
+        self._min_level = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, url, depth):
+        """Queues url unless it was seen before or is too deep. Returns True if queued."""
+        key = canonicalize_url(url)
+        if depth > self.max_depth or key in self.seen:
+            return False
+        self.seen.add(key)
+        self.levels[depth].append(url)
+        self._min_level = min(self._min_level, depth)
+        self._size += 1
+        return True
+
+    def pop(self):
+        """Returns (url, depth) of the next page, or None if empty."""
+        while self._min_level <= self.max_depth:
+            level = self.levels[self._min_level]
+            if level:
+                self._size -= 1
+                return level.popleft(), self._min_level
+            self._min_level += 1
+        return None
+
+    def to_state(self, in_flight=()):
+        # Pages being fetched right now go back in the queue, so a resumed crawl refetches them
+        queued = [[url, depth] for url, depth in in_flight]
+        queued += [[url, depth] for depth, level in enumerate(self.levels) for url in level]
+        return {"queued": queued, "seen": sorted(self.seen)}
+
+    @classmethod
+    def from_state(cls, state, max_depth=MAX_DEPTH):
+        frontier = cls(max_depth)
+        for url, depth in state["queued"]:
+            frontier.push(url, depth)
+        frontier.seen.update(state["seen"])
+        return frontier
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host to at most `rate` per second."""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}  # host -> earliest start time of the next request
+
+    async def wait(self, url):
+        host = normalize_domain(url)
+        now = time.monotonic()
+        # Reserve the slot before sleeping so concurrent tasks queue up behind it
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class PageResult:
+    __slots__ = ("url", "success", "html", "markdown", "links", "headers", "status", "body_hash", "markdown_path")
+
+    def __init__(self, url, success, html="", markdown="", links=(), headers=None, status=None, body_hash=None,
+                 markdown_path=None):
+        self.url = url
+        self.success = success
+        self.html = html
+        self.markdown = markdown
+        self.links = list(links)
+        self.headers = headers or {}
+        self.status = status
+        self.body_hash = body_hash  # hash of the raw HTTP body, when the fetcher has it
+        self.markdown_path = markdown_path  # markdown left on disk instead (converted documents)
+
+
+class Crawl4AIFetcher:
+    """Renders pages in a headless browser (the original crawl4ai setup)."""
+
+    async def __aenter__(self):
+        from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+
+        browser_conf = BrowserConfig(
+            headless=True,
+            accept_downloads=True, # Prevents crash on download links
+            verbose=False
+        )
+        self.run_conf = CrawlerRunConfig(
+            cache_mode=CacheMode.BYPASS
+        )
+        self.crawler = AsyncWebCrawler(config=browser_conf)
+        await self.crawler.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.crawler.__aexit__(*exc)
+
+    async def fetch(self, url):
+        result = await self.crawler.arun(url=url, config=self.run_conf)
+        if not result.success:
+            return PageResult(url, False, status=getattr(result, "status_code", None))
+
+        # Method A: Crawl4AI detected links
+        links = []
+        if result.links and "internal" in result.links:
+            links = [link['href'] for link in result.links['internal']]
+        return PageResult(url, True, result.html, str(result.markdown), links,
+                          getattr(result, "response_headers", None))
+
+
+class HttpFetcher:
+    """Plain HTTP GET without a browser (fast; no JavaScript rendering)."""
+
+    def __init__(self, max_workers=16):
+        self.max_workers = max_workers
+
+    async def __aenter__(self):
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="http")
+        return self
+
+    async def __aexit__(self, *exc):
+        self.pool.shutdown(wait=False)
+
+    def _get(self, url):
+        request = urllib.request.Request(url, headers={"User-Agent": "SCERT-Sahayak-Crawler"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.read(), dict(response.headers)
+
+    async def fetch(self, url):
+        try:
+            body, headers = await asyncio.get_running_loop().run_in_executor(self.pool, self._get, url)
+        except urllib.error.HTTPError as e:
+            return PageResult(url, False, status=e.code)
+        except OSError:
+            return PageResult(url, False)
+        html = body.decode("utf-8", errors="replace")
+        text = BeautifulSoup(html, 'html.parser').get_text("\n", strip=True)
+        return PageResult(url, True, html, text, headers=headers, body_hash=content_hash(body))
+
+
+def conditional_probe(url, entry, max_bytes=MAX_DOCUMENT_MB * 1_000_000):
+    """
+    Cheap plain-HTTP check of a page seen on an earlier crawl, sent with its
+    stored ETag / Last-Modified. Returns (status, headers, body_hash); a 304
+    has no body, so body_hash is None. Network errors return status None.
+    The body is hashed in blocks; past max_bytes it is dropped unhashed.
+    """
+    headers = {"User-Agent": "SCERT-Sahayak-Crawler"}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30) as response:
+            digest, size = hashlib.sha256(), 0
+            for block in iter(lambda: response.read(1 << 20), b""):
+                size += len(block)
+                if size > max_bytes:
+                    return response.status, dict(response.headers), None   # Too large to compare
+                digest.update(block)
+            return response.status, dict(response.headers), digest.hexdigest()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers or {}), None
+    except OSError:
+        return None, {}, None
+
+
+def extract_links(page):
+    """Hybrid link extraction: fetcher-reported links + a BeautifulSoup pass."""
+    found_links = set(page.links)
 
+    # Method B: Manual BS4 Parse (catches what Method A misses)
+    soup = BeautifulSoup(page.html, 'html.parser')
+    for a_tag in soup.find_all('a', href=True):
+        found_links.add(urljoin(page.url, a_tag['href']))
+    return found_links
+
+
+def is_document(url):
+    return url.lower().split('?')[0].endswith(DOCUMENT_EXTENSIONS)
+
+
+def is_crawlable(url, target_domain, documents=False):
+    if normalize_domain(url) != target_domain:
+        return False
+    if is_document(url):
+        return documents
+    return not url.lower().split('?')[0].endswith(IGNORED_EXTENSIONS)
+
+
+def page_document(url, markdown):
+    """A page as ingest.py reads it: source URL on the first line, then the markdown."""
+    return f"Source: {url}\n\n{markdown}"
+
+
+def page_document_lines(url, lines):
+    """page_document() line by line, for markdown streamed from a file."""
+    return itertools.chain([f"Source: {url}\n", "\n"], lines)
+
+
+def read_blocks(path, size=1 << 20):
+    """A text file in blocks of `size` characters."""
+    with open(path, "r", encoding="utf-8") as f:
+        yield from iter(lambda: f.read(size), "")
+
+
+def markdown_blocks(page):
+    """A page's markdown as text blocks: a document's is read from disk, never whole."""
+    return read_blocks(page.markdown_path) if page.markdown_path else [page.markdown]
+
+
+def page_hashes(url, blocks):
+    """(hash of the markdown, hash of its page_document) from markdown blocks, in one pass."""
+    markdown, document = hashlib.sha256(), hashlib.sha256(page_document(url, "").encode("utf-8"))
+    for block in blocks:
+        data = block.encode("utf-8")
+        markdown.update(data)
+        document.update(data)
+    return markdown.hexdigest(), document.hexdigest()
+
+
+def save_page(output_dir, url, markdown):
+    """Writes page_document(url, markdown); `markdown` may also be an iterable of text blocks."""
+    # SAVE CONTENT (With Fixed Filename Logic)
+    safe_name = get_safe_filename(url)
+    filepath = os.path.join(output_dir, f"{safe_name}.md")
+    with open(filepath, "w", encoding="utf-8", newline="") as f:
+        f.write(page_document(url, ""))
+        f.writelines([markdown] if isinstance(markdown, str) else markdown)
+    return filepath
+
+
+def remove_page(output_dir, file_name):
+    if output_dir and file_name:
+        filepath = os.path.join(output_dir, file_name)
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+
+def save_checkpoint(path, frontier, in_flight, pages_done, unreachable=0):
+    state = frontier.to_state(in_flight.values())
+    state["pages_done"] = pages_done
+    state["unreachable"] = unreachable
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+async def crawl(start_url=BASE_URL, fetcher=None, max_pages=MAX_PAGES, max_depth=MAX_DEPTH,
+                concurrency=CONCURRENCY, rate=REQUESTS_PER_SECOND, output_dir=OUTPUT_DIR,
+                checkpoint_path=None, resume=False, verbose=True, state=None, changes_path=CHANGES_FILE,
+                sink=None, documents=None):
+    """
+    Crawls same-domain pages from start_url with `concurrency` fetch tasks,
+    shallowest pages first, at most `rate` requests/sec per host.
+    With checkpoint_path, progress is saved periodically (and on interruption),
+    and `resume=True` continues an interrupted crawl; the checkpoint is removed
+    once a crawl completes. Returns the number of pages fetched.
+
+    With a CrawlState, pages seen before are first probed with a conditional
+    plain-HTTP GET: a 304 (or an identical body) skips the browser fetch and
+    follows the stored links. Only new / changed pages are written, 404 / 410
+    pages are deleted (pages only missing from a complete run keep their
+    file), and the run's changes go to `changes_path`. A page that fails
+    otherwise (timeout, 5xx) is kept and its stored links are followed;
+    a run with such failures reports no unseen page as removed. (Pages
+    without validators first fetched by the browser have no body hash yet, so
+    they are rendered once more on the next run.)
+
+    `sink` receives pages as they are crawled: `await sink.add(url, file_name,
+    markdown, markdown_path)` for new / changed pages (a converted document's
+    markdown stays in its file at markdown_path, `markdown` is then empty) and `await sink.remove(file_name,
+    confirmed)` for removed ones: confirmed=True for a 404 / 410, False for a
+    page only missing from a complete run (see src/stream_ingest.py). Its
+    awaits are the backpressure:
+    a slow sink slows the crawl down. output_dir=None then skips the disk copy.
+
+    With `documents` (a src/documents.py DocumentFetcher), PDF / DOCX / XLSX
+    links are followed too and fetched through it: their extracted markdown
+    is saved, recorded and sent to the sink like any page.
+    """
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    target_domain = normalize_domain(start_url)
+
+    frontier, pages_done, unreachable = Frontier(max_depth), 0, 0
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        frontier = Frontier.from_state(checkpoint, max_depth)
+        pages_done = checkpoint.get("pages_done", 0)
+        unreachable = checkpoint.get("unreachable", 0)
+        print(f"🔄 Resuming crawl: {len(frontier)} queued, {pages_done} pages already done.")
+    else:
+        frontier.push(start_url, 0)
+    if state:
+        state.begin_run(resume=resume and pages_done > 0)
+
+    limiter = HostRateLimiter(rate)
+    in_flight = {}   # task name -> (url, depth)
+    wakeup = asyncio.Condition()
+    # unreachable: pages that failed for a reason other than 404 / 410
+    stats = {"fetched": pages_done, "failed": 0, "skipped": 0, "unreachable": unreachable}
+
+    def follow(links, depth):
+        added = 0
+        for link in links:
+            link = link.split('#')[0]
+            if is_crawlable(link, target_domain, documents is not None) and frontier.push(link, depth + 1):
+                added += 1
+        return added
+
+    def keep(url, depth):
+        """
+        A page failed (timeout, 5xx, error). A known one is kept, and its stored
+        links followed so the pages behind it aren't taken for removed.
+        """
+        stats["unreachable"] += 1
+        entry = state.get(url)
+        if entry is None:
+            return 0
+        state.touch(url)
+        return follow(entry.get("links", ()), depth)
+
+    async def forget(entry, confirmed=True):
+        """
+        A known page is gone from the site: drop its local copy and its chunks.
+        An unconfirmed one (only not reached) keeps its file, or a plain ingest
+        of output_dir would delete it from the index after all.
+        """
+        if entry:
+            if confirmed:
+                remove_page(output_dir, entry.get("file_name"))
+            if sink:
+                await sink.remove(entry.get("file_name"), confirmed)
+
+    async def probe_unchanged(url, depth):
+        """True if the stored copy of url is still current (its links are then queued)."""
+        entry = state.get(url)
+        if entry is None:
+            return False, None   # never seen: nothing to compare against
+        if output_dir and not os.path.exists(os.path.join(output_dir, entry.get("file_name") or "")):
+            return False, None   # local copy gone: render it again
+        status, headers, body_hash = await asyncio.get_running_loop().run_in_executor(
+            None, conditional_probe, url, entry)
+        if status in (404, 410):
+            await forget(state.mark_removed(url))
+            print(f"   🗑️ Removed ({status}): {url}")
+            return True, None
+        if status == 304 or (body_hash and body_hash == entry.get("probe_hash")):
+            state.mark_unchanged(url, headers)
+            stats["skipped"] += 1
+            new_links = follow(entry.get("links", ()), depth)
+            if verbose:
+                print(f"   ⏭️ Unchanged ({status}), added {new_links} new pages.")
+            return True, None
+        await limiter.wait(url)   # the browser fetch is a second request
+        return False, (headers, body_hash)
+
+    async def worker(name):
+        while True:
+            async with wakeup:
+                # Wait for work, or stop when nothing is queued and nothing can add more
+                while not len(frontier) and in_flight:
+                    await wakeup.wait()
+                if stats["fetched"] >= max_pages or not len(frontier):
+                    wakeup.notify_all()
+                    return
+                url, depth = frontier.pop()
+                in_flight[name] = (url, depth)
+                stats["fetched"] += 1
+                n = stats["fetched"]
+
+            try:
+                await limiter.wait(url)
+                if verbose:
+                    print(f"🕷️ Crawling ({n}/{max_pages}, depth {depth}): {url}")
+                probe = None
+                if state:
+                    done, probe = await probe_unchanged(url, depth)
+                    if done:
+                        continue
+                page = await (documents if documents and is_document(url) else fetcher).fetch(url)
+                new_links = 0
+                if not page.success:
+                    stats["failed"] += 1
+                    if state and page.status in (404, 410):
+                        await forget(state.mark_removed(url))
+                    elif state:
+                        new_links = keep(url, depth)
+                    print(f"   ⚠️ Failed to load: {url}")
+                else:
+                    links = extract_links(page)
+                    file_name = f"{get_safe_filename(url)}.md"
+                    change = "new"
+                    if state:
+                        headers, body_hash = probe or (page.headers, page.body_hash)
+                        markdown_hash, file_hash = page_hashes(url, markdown_blocks(page))
+                        change = state.record(url, file_name, headers={**page.headers, **headers},
+                                              probe_hash=body_hash, links=links, file_hash=file_hash,
+                                              markdown_hash=markdown_hash)
+                    if output_dir and change != "unchanged":
+                        save_page(output_dir, url, markdown_blocks(page))
+                    if sink and change != "unchanged":
+                        await sink.add(url, file_name, page.markdown, page.markdown_path)
+                    new_links = follow(links, depth)
+                if verbose:
+                    print(f"   ↳ Added {new_links} new pages.")
             except Exception as e:
+                stats["failed"] += 1
+                if state:
+                    keep(url, depth)
                 print(f"   ❌ Error: {e}")
+            finally:
+                async with wakeup:
+                    del in_flight[name]
+                    if checkpoint_path and stats["fetched"] % CHECKPOINT_EVERY == 0:
+                        save_checkpoint(checkpoint_path, frontier, in_flight, stats["fetched"], stats["unreachable"])
+                        if state:
+                            state.save()
+                    wakeup.notify_all()
+
+    owns_fetcher = fetcher is None
+    fetcher = fetcher or Crawl4AIFetcher()
+    if owns_fetcher:
+        await fetcher.__aenter__()
+    finished = False
+    try:
+        await asyncio.gather(*(worker(f"w{i}") for i in range(concurrency)))
+        finished = True
+    finally:
+        if owns_fetcher:
+            await fetcher.__aexit__(None, None, None)
+        if checkpoint_path:
+            if finished:
+                # A completed crawl starts fresh next time
+                if os.path.exists(checkpoint_path):
+                    os.remove(checkpoint_path)
+            else:
+                save_checkpoint(checkpoint_path, frontier, in_flight, stats["fetched"], stats["unreachable"])
+        if state:
+            if finished:
+                # Pages missing from a crawl that ran out of links (not out of budget) are gone,
+                # unless some known page failed: only a 404 / 410 proves that a page was removed
+                complete = not len(frontier) and not stats["unreachable"]
+                if not len(frontier) and stats["unreachable"] and verbose:
+                    print(f"⚠️ {stats['unreachable']} pages failed to load: "
+                          f"not reporting unseen pages as removed this run.")
+                for entry in state.finish_run(complete=complete):
+                    await forget(entry, confirmed=False)
+                state.write_feed(changes_path)
+            state.save()
+
+    if state and verbose:
+        feed = state.feed()
+        print(f"📰 Changes: {len(feed['new'])} new, {len(feed['changed'])} changed, "
+              f"{len(feed['removed'])} removed, {feed['unchanged']} unchanged "
+              f"({stats['skipped']} browser fetches skipped).")
+    return stats["fetched"] - stats["failed"]
+
+
+async def crawl_recursive():
+    print(f"🚀 Starting Deep Crawl for: {BASE_URL}")
+    print(f"🎯 Target Domain: {normalize_domain(BASE_URL)}")
+
+    from src.documents import DocumentFetcher
 
-            await asyncio.sleep(0.2)
+    state = CrawlState(CRAWL_STATE_FILE, key=canonicalize_url)
+    async with DocumentFetcher() as documents:
+        pages = await crawl(BASE_URL, checkpoint_path=CHECKPOINT_FILE, resume=True, state=state,
+                            documents=documents)
 
-    print(f"✅ DONE. Scraped {len(visited)} pages.")
+    print(f"✅ DONE. Scraped {pages} pages.")
 
 if __name__ == "__main__":
-    asyncio.run(crawl_recursive())
\ No newline at end of file
+    asyncio.run(crawl_recursive())
@@ -0,0 +1,188 @@
+# src/startup.py
+"""
+Background engine startup for app.py.
+
+The UI renders immediately; EngineLoader builds MarathiRAG on a background
+thread, phase by phase:
+
+    imports    rag_engine and its heavy dependencies (qdrant_client, genai)
+    embedder   e5 model (or the embedding server, see src/embed_server.py)  } in
+    qdrant     local Qdrant store (loads the points into memory)            } parallel
+    engine     MarathiRAG itself (keyword index, Gemini model, pools)
+    warmup     one query encode + one search, so the first real query isn't slow
+
+Liveness and readiness are separate signals:
+  - liveness: Streamlit's own /_stcore/health (the Docker HEALTHCHECK), up as
+    soon as the server runs, so it doesn't flap while the model loads
+  - readiness: GET http://<host>:READINESS_PORT/ready -> 200 once the engine is
+    warm, 503 with the current phase before (or "failed" + the error);
+    /health on the same port is plain liveness for this process
+  - metrics: /metrics on the same port serves the engine's request traces
+    (span p50/p95, token counts, cache outcomes) as Prometheus text, see src/tracing.py
+
+STARTUP_MODE=eager restores the old behaviour (build the engine before the
+first render).
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# --- CONFIGURATION ---
+STARTUP_MODE = os.getenv("STARTUP_MODE", "background")   # "background" | "eager"
+READINESS_PORT = int(os.getenv("READINESS_PORT", "8502"))  # 0 disables the endpoint
+DB_PATH = Path(__file__).resolve().parent / ".." / os.getenv("QDRANT_PATH", "qdrant_db")  # Or QDRANT_URL, see src/index_manager.py
+WARMUP_QUERY = "SCERT प्रवेश प्रक्रिया"
+
+
+class EngineLoader:
+    """Builds MarathiRAG in the background and records how long each phase took."""
+
+    def __init__(self, engine_kwargs=None):
+        self.engine_kwargs = engine_kwargs or {}
+        self.state = "starting"      # starting -> loading -> ready | failed
+        self.phase = None
+        self.phases = {}             # phase -> seconds
+        self.error = None
+        self.engine = None
+        self.started_at = time.time()
+        self.total = None            # seconds from start to ready / failed
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._load, name="engine-loader", daemon=True).start()
+        return self
+
+    def _timed(self, phase, fn, *args):
+        with self._lock:
+            self.phase = phase
+        start = time.perf_counter()
+        result = fn(*args)
+        with self._lock:
+            self.phases[phase] = time.perf_counter() - start
+        return result
+
+    def _load(self):
+        self.state = "loading"
+        try:
+            rag_engine = self._timed("imports", _import_engine)
+
+            # The model and the Qdrant store don't depend on each other: load them side by side
+            kwargs = dict(self.engine_kwargs)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                embedder = None
+                if "embedder" not in kwargs:
+                    embedder = pool.submit(self._timed, "embedder", rag_engine.connect_embedder,
+                                           kwargs.get("embedder_backend"))
+                client = None
+                if "client" not in kwargs:
+                    client = pool.submit(self._timed, "qdrant", rag_engine.connect, DB_PATH)
+                if embedder:
+                    kwargs["embedder"] = embedder.result()
+                if client:
+                    kwargs["client"] = client.result()
+
+            engine = self._timed("engine", lambda: rag_engine.MarathiRAG(**kwargs))
+            self._timed("warmup", warm_up, engine)
+            self.engine = engine
+            self.state = "ready"
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.state = "failed"
+        finally:
+            self.phase = None
+            self.total = time.time() - self.started_at
+            self._ready.set()
+            print(f"🚀 Startup {self.state}: {self.report()}")
+
+    def wait(self, timeout=None):
+        """Blocks until loading finished; returns the engine (raises if loading failed)."""
+        self._ready.wait(timeout)
+        if self.state == "failed":
+            raise RuntimeError(f"Engine failed to start: {self.error}")
+        return self.engine
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def status(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "phase": self.phase,
+                "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+                "total_s": round(self.total, 2) if self.total is not None else None,
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "error": self.error,
+            }
+
+    def report(self):
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.status()["phases"].items())
+        return f"{phases} (total {self.total or time.time() - self.started_at:.1f}s)"
+
+
+def _import_engine():
+    from src import rag_engine
+    return rag_engine
+
+
+def warm_up(engine):
+    """First encode / search pay one-off costs (lazy weights, allocator, caches): pay them now."""
+    vector = engine.embedder.encode(f"query: {WARMUP_QUERY}")
+    if engine.client.collection_exists(engine.collection):
+        engine.retrieve(WARMUP_QUERY, top_k=1, query_vector=vector)
+
+
+def start_readiness_server(loader, port=READINESS_PORT, host="0.0.0.0"):
+    """Serves /health (process alive), /ready (engine loaded and warm) and /metrics on a side port."""
+    if not port:
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                engine = loader.engine
+                text = engine.tracer.metrics.render() if engine else ""
+                self._send(200, text.encode(), "text/plain; version=0.0.4")
+                return
+            if self.path == "/health":
+                status, body = 200, {"state": "alive"}
+            elif self.path == "/ready":
+                body = loader.status()
+                status = 200 if loader.ready else 503
+            else:
+                status, body = 404, {"error": "not found"}
+            self._send(status, json.dumps(body).encode(), "application/json")
+
+        def _send(self, status, data, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+    except OSError as e:
+        # Another replica on this host already has the port
+        print(f"⚠️ Readiness endpoint not started on port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name="readiness", daemon=True).start()
+    return server
+
+
+def start_engine(engine_kwargs=None, mode=STARTUP_MODE):
+    """Starts loading (and the readiness endpoint); in eager mode, waits for it."""
+    loader = EngineLoader(engine_kwargs).start()
+    start_readiness_server(loader)
+    if mode == "eager":
+        loader.wait()
+    return loader
@@ -0,0 +1,221 @@
+# src/stream_ingest.py
+"""
+Streaming crawl-to-index: pages go from the crawler straight into Qdrant.
+
+    crawler workers --(bounded queue)--> split --> batch encode --> upsert thread
+
+Each new or changed page is split exactly like ingest.py would split the
+markdown file the scraper writes (same "Source:" URL, file_name, chunk ids
+and payloads), so both paths share the manifest and the collection and can
+be mixed freely. Pages that answer 404 / 410 are deleted from the index;
+pages merely not reached by a complete crawl are kept and only listed (the
+changes feed marks them "confirmed": false; once checked, `python -m
+src.ingest --changes crawl_changes.json --purge-unseen` deletes them), so a
+flaky crawl never empties the live collection. Memory stays
+bounded: at most MAX_QUEUED_PAGES pages wait for the indexer (the crawler
+blocks when the queue is full), plus one encode batch and
+MAX_PENDING_UPSERTS batches being written.
+
+Linked PDF / DOCX / XLSX documents are downloaded and converted page by
+page (src/documents.py) and indexed like pages; --no-documents skips them.
+Writing the markdown to disk is optional (--tap-dir). Run from the project root:
+
+    python -m src.stream_ingest
+    python -m src.stream_ingest --tap-dir crawled_data --fetcher http --pages 500
+"""
+import argparse
+import asyncio
+import contextlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src import index_manager, scraper
+from src.collection_config import PROFILES
+from src.crawl_state import CRAWL_STATE_FILE, CrawlState, content_hash
+from src.documents import DocumentFetcher
+from src.embedders import BACKENDS, connect_embedder, embedder_id
+from src.embedding_store import CachedEmbedder, EmbeddingStore
+from src.ingest import BATCH_SIZE, COLLECTION_NAME, ChunkPipeline, file_filter, split_document, split_lines
+from src.manifest import IngestManifest
+
+# --- CONFIGURATION ---
+MAX_QUEUED_PAGES = 32       # Crawler blocks once this many pages wait for the indexer
+IDLE_FLUSH_SECONDS = 0.5    # Encode a partial batch when no page arrived for this long
+STREAM_CHECKPOINT_FILE = "stream_checkpoint.json"
+
+
+class IndexSink:
+    """
+    Page sink for scraper.crawl(). Splitting, encoding and manifest updates
+    run on one dedicated thread (in page order); upserts on another.
+    """
+
+    def __init__(self, client, embedding_model, manifest, collection_name=COLLECTION_NAME,
+                 batch_size=BATCH_SIZE, max_queued=MAX_QUEUED_PAGES, idle_flush=IDLE_FLUSH_SECONDS):
+        self.client = client
+        self.manifest = manifest
+        self.collection_name = collection_name
+        self.idle_flush = idle_flush
+        self.queue = asyncio.Queue(maxsize=max_queued)
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="index")
+        self.upsert_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upsert")
+        self.pipeline = ChunkPipeline(client, embedding_model, manifest, self.upsert_pool,
+                                      collection_name, batch_size, on_file_done=self._indexed)
+        self.stats = {"pages": 0, "skipped": 0, "removed": 0, "indexed": 0}
+        self.unseen = []    # Pages missing from a complete crawl, kept in the index
+        self.max_queue_seen = 0
+
+    async def __aenter__(self):
+        self.consumer = asyncio.create_task(self._consume())
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.queue.put(None)
+        await self.consumer
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.worker, self.pipeline.drain)
+        self.worker.shutdown()
+        self.upsert_pool.shutdown()
+
+    async def add(self, url, file_name, markdown, markdown_path=None):
+        # Waits while the queue is full: the crawler slows to the indexer's pace.
+        # A converted document is queued as its file and only read by the indexer.
+        await self.queue.put(("add", file_name, (url, markdown, markdown_path)))
+        self.max_queue_seen = max(self.max_queue_seen, self.queue.qsize())
+
+    async def remove(self, file_name, confirmed=True):
+        # Only a 404 / 410 deletes from the live collection; a page the crawl
+        # didn't reach may just sit behind one that failed to load
+        if not file_name:
+            return
+        if confirmed:
+            await self.queue.put(("remove", file_name, None))
+        else:
+            self.unseen.append(file_name)
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                item = await asyncio.wait_for(self.queue.get(), self.idle_flush)
+            except asyncio.TimeoutError:
+                # Crawl is slower than the encoder: don't hold pages back waiting for a full batch
+                await loop.run_in_executor(self.worker, self.pipeline.flush_partial)
+                continue
+            if item is None:
+                return
+            await loop.run_in_executor(self.worker, self._handle, *item)
+
+    def _handle(self, kind, file_name, page):
+        try:
+            if kind == "remove":
+                self._remove(file_name)
+                return
+            self.stats["pages"] += 1
+            url, markdown, markdown_path = page
+            if markdown_path:
+                _, file_hash = scraper.page_hashes(url, scraper.read_blocks(markdown_path))
+            else:
+                document = scraper.page_document(url, markdown)
+                file_hash = content_hash(document)
+            if self.manifest.is_unchanged(file_name, file_hash):
+                self.stats["skipped"] += 1
+                return
+            if markdown_path:
+                with open(markdown_path, "r", encoding="utf-8") as f:
+                    _, ids, texts, payloads = split_lines(file_name, scraper.page_document_lines(url, f))
+            else:
+                _, ids, texts, payloads = split_document(file_name, document)
+            self.pipeline.add(file_name, file_hash, ids, texts, payloads)
+        except Exception as e:
+            print(f"\n❌ Indexing failed for {file_name}: {e}")
+
+    def _remove(self, file_name):
+        if file_name in self.pipeline.pending:
+            self.pipeline.drain()
+        self.client.delete(collection_name=self.collection_name, points_selector=file_filter(file_name))
+        self.manifest.forget(file_name)
+        self.stats["removed"] += 1
+
+    def _indexed(self, file_name):
+        self.stats["indexed"] += 1
+
+
+def reconcile_state(state, manifest):
+    """
+    Pages the crawl state knows but the index doesn't (e.g. still queued when
+    the last run was interrupted) are forgotten, so this crawl renders them again.
+    """
+    return state.forget_unless(lambda e: (manifest.get(e.get("file_name")) or {}).get("file_hash") == e.get("file_hash"))
+
+
+async def stream(args, client, embedding_model, manifest, collection):
+    state = None
+    if not args.no_state:
+        state = CrawlState(CRAWL_STATE_FILE, key=scraper.canonicalize_url)
+        stale = reconcile_state(state, manifest)
+        if stale:
+            print(f"🔄 {stale} crawled pages are missing from the index; they will be fetched again.")
+
+    fetcher = scraper.HttpFetcher() if args.fetcher == "http" else scraper.Crawl4AIFetcher()
+    documents = None if args.no_documents else DocumentFetcher()
+    async with fetcher, documents or contextlib.nullcontext(), \
+            IndexSink(client, embedding_model, manifest, collection) as sink:
+        pages = await scraper.crawl(args.url, fetcher=fetcher, max_pages=args.pages, max_depth=args.depth,
+                                    concurrency=args.concurrency, rate=args.rate, output_dir=args.tap_dir,
+                                    checkpoint_path=STREAM_CHECKPOINT_FILE, resume=True, state=state,
+                                    sink=sink, documents=documents)
+    return pages, sink
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=scraper.BASE_URL)
+    parser.add_argument("--pages", type=int, default=scraper.MAX_PAGES)
+    parser.add_argument("--depth", type=int, default=scraper.MAX_DEPTH)
+    parser.add_argument("--concurrency", type=int, default=scraper.CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=scraper.REQUESTS_PER_SECOND)
+    parser.add_argument("--fetcher", choices=["crawl4ai", "http"], default="crawl4ai")
+    parser.add_argument("--tap-dir", help="also write each page's markdown here (off by default)")
+    parser.add_argument("--no-documents", action="store_true", help="don't follow PDF / DOCX / XLSX links")
+    parser.add_argument("--no-state", action="store_true", help="re-render every page (no conditional re-crawl)")
+    parser.add_argument("--no-embedding-cache", action="store_true", help="always call the model")
+    parser.add_argument("--embedder", choices=BACKENDS, help="encoder backend (default: $EMBEDDER_BACKEND or torch)")
+    parser.add_argument("--profile", choices=PROFILES,
+                        help="storage profile when creating the collection (default: $COLLECTION_PROFILE or default)")
+    parser.add_argument("--site", default=index_manager.SITE, help="which site's collection to update")
+    args = parser.parse_args()
+
+    print("🔌 Connecting to Qdrant...")
+    client = index_manager.connect()
+    collection = index_manager.ingest_target(client, args.site, args.profile)
+    manifest = IngestManifest(index_manager.manifest_path(collection))
+
+    print("🧠 Loading Embedding Model...")
+    embedding_model = connect_embedder(args.embedder)
+    store = None
+    if not args.no_embedding_cache:
+        store = EmbeddingStore(embedder_id(args.embedder))
+        embedding_model = CachedEmbedder(embedding_model, store)
+
+    print(f"🚀 Streaming {args.url} into '{collection}'...")
+    start = time.perf_counter()
+    pages, sink = asyncio.run(stream(args, client, embedding_model, manifest, collection))
+    elapsed = time.perf_counter() - start
+
+    index_manager.refresh_keyword_index(client, collection, args.site)
+    s = sink.stats
+    print(f"✅ {pages} pages crawled in {elapsed:.1f}s: {s['indexed']} indexed, {s['skipped']} already up to date, "
+          f"{s['removed']} removed; {sink.pipeline.stored} chunks encoded "
+          f"(indexer queue peaked at {sink.max_queue_seen}/{MAX_QUEUED_PAGES}).")
+    if sink.unseen:
+        print(f"⚠️ {len(sink.unseen)} indexed pages were not seen in this crawl and were kept; "
+              f"'python -m src.ingest --changes {scraper.CHANGES_FILE} --purge-unseen' removes them.")
+    if store:
+        store.flush()
+        store.report()
+    if not index_manager.promote_first(client, collection, embedding_model, args.site, manifest):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# src/tracing.py
+"""
+Per-request latency tracing for the RAG path.
+
+Every generate_answer / stream_answer / agenerate_answer call records one
+trace: spans (seconds) for the stages plus attributes such as token counts
+and hit scores.
+
+    embed     query encode (0 when the vector came from the cache)
+    search    Qdrant query_points (+ BM25 and fusion in hybrid mode)
+    context   merge / dedupe / budget and prompt formatting
+    llm       Gemini call until the last token (ttft: time to first token)
+    total     whole request
+
+Finished traces go to pluggable sinks:
+    JsonLinesSink       one JSON object per request (file or stream)
+    PrometheusSink      counters + rolling p50/p95, rendered as Prometheus text
+                        (served on the readiness port's /metrics, see src/startup.py)
+
+TRACE_LOG=<path> adds a JSON lines sink to the default tracer.
+"""
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+
+# --- CONFIGURATION ---
+WINDOW = 1000   # Recent requests kept for p50 / p95
+SPANS = ("embed", "search", "context", "llm", "ttft", "total")
+
+_current = contextvars.ContextVar("rag_trace", default=None)
+
+
+class Trace:
+    __slots__ = ("id", "query", "started", "spans", "attrs")
+
+    def __init__(self, query):
+        self.id = uuid.uuid4().hex[:12]
+        self.query = query
+        self.started = time.perf_counter()
+        self.spans = {}
+        self.attrs = {}
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "ts": round(time.time(), 3),
+            "query": self.query[:200],
+            "spans_ms": {name: round(seconds * 1000, 2) for name, seconds in self.spans.items()},
+            **self.attrs,
+        }
+
+
+def current():
+    """The trace of the request running in this thread / task, or None."""
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    """Times a block into the current trace (no-op outside a traced request)."""
+    trace = _current.get()
+    if trace is None:
+        yield None
+        return
+    start = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.spans[name] = trace.spans.get(name, 0.0) + time.perf_counter() - start
+
+
+def annotate(**attrs):
+    """Adds attributes (token counts, scores, cache outcome...) to the current trace."""
+    trace = _current.get()
+    if trace is not None:
+        trace.attrs.update(attrs)
+
+
+class JsonLinesSink:
+    """Writes each finished trace as one JSON line."""
+
+    def __init__(self, path=None, stream=None):
+        self.stream = stream or (open(path, "a", encoding="utf-8", buffering=1) if path else sys.stdout)
+        self.lock = threading.Lock()
+
+    def emit(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.stream.write(line + "\n")
+
+
+class PrometheusSink:
+    """Aggregates traces into counters and rolling quantiles; render() gives Prometheus text."""
+
+    def __init__(self, window=WINDOW):
+        self.lock = threading.Lock()
+        self.requests = {}   # cache outcome ("hit" / "miss" / "off") -> count
+        self.spans = {name: deque(maxlen=window) for name in SPANS}
+        self.tokens = {"prompt": deque(maxlen=window), "answer": deque(maxlen=window)}
+
+    def emit(self, record):
+        with self.lock:
+            outcome = record.get("cache", "off")
+            self.requests[outcome] = self.requests.get(outcome, 0) + 1
+            for name, ms in record["spans_ms"].items():
+                if name in self.spans:
+                    self.spans[name].append(ms / 1000)
+            for name, values in self.tokens.items():
+                if f"{name}_tokens" in record:
+                    values.append(record[f"{name}_tokens"])
+
+    def summary(self):
+        """{span: {"count", "p50_ms", "p95_ms"}} over the rolling window."""
+        with self.lock:
+            return {
+                name: {"count": len(values),
+                       "p50_ms": round(float(np.percentile(values, 50)) * 1000, 1),
+                       "p95_ms": round(float(np.percentile(values, 95)) * 1000, 1)}
+                for name, values in self.spans.items() if values
+            }
+
+    def render(self):
+        with self.lock:
+            lines = ["# TYPE rag_requests_total counter"]
+            lines += [f'rag_requests_total{{cache="{k}"}} {v}' for k, v in sorted(self.requests.items())]
+            lines.append("# TYPE rag_span_seconds summary")
+            for name, values in self.spans.items():
+                if values:
+                    for q in (50, 95):
+                        lines.append(f'rag_span_seconds{{span="{name}",quantile="{q / 100}"}} '
+                                     f'{np.percentile(values, q):.6g}')
+                    lines.append(f'rag_span_seconds_count{{span="{name}"}} {len(values)}')
+            lines.append("# TYPE rag_tokens summary")
+            for name, values in self.tokens.items():
+                if values:
+                    for q in (50, 95):
+                        lines.append(f'rag_tokens{{kind="{name}",quantile="{q / 100}"}} '
+                                     f'{np.percentile(values, q):.6g}')
+        return "\n".join(lines) + "\n"
+
+
+class Tracer:
+    """Starts / finishes request traces and fans them out to the sinks."""
+
+    def __init__(self, sinks=None):
+        self.metrics = PrometheusSink()
+        self.sinks = [self.metrics] + list(sinks or [])
+        if os.getenv("TRACE_LOG"):
+            self.sinks.append(JsonLinesSink(os.getenv("TRACE_LOG")))
+        self._last = threading.local()
+
+    @contextmanager
+    def request(self, query):
+        trace = Trace(query)
+        token = _current.set(trace)
+        try:
+            yield trace
+        except BaseException as e:
+            # GeneratorExit: a streamed answer the caller stopped reading
+            trace.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            trace.spans["total"] = time.perf_counter() - trace.started
+            try:
+                _current.reset(token)
+            except ValueError:
+                _current.set(None)  # Generator finished from another context
+            self.finish(trace)
+
+    def finish(self, trace):
+        record = trace.to_dict()
+        self._last.record = record
+        for sink in self.sinks:
+            try:
+                sink.emit(record)
+            except Exception as e:
+                print(f"⚠️ Trace sink {type(sink).__name__} failed: {e}")
+
+    def last(self):
+        """The last trace finished on this thread (e.g. this Streamlit session's last answer)."""
+        return getattr(self._last, "record", None)
+
+    def summary(self):
+        return self.metrics.summary()
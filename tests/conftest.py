@@ -0,0 +1,44 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+
+class LocalSite:
+    """path -> (status, body bytes, content type) served on 127.0.0.1; editable between crawls."""
+
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+
+    def page(self, path, html, status=200):
+        self.pages[path] = (status, html.encode("utf-8"), "text/html; charset=utf-8")
+
+    def file(self, path, data, content_type="application/octet-stream"):
+        self.pages[path] = (200, data, content_type)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+
+@pytest.fixture
+def site():
+    local = LocalSite()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            local.requests.append(self.path)
+            status, body, content_type = local.pages.get(self.path, (404, b"not found", "text/plain"))
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    local.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=local.server.serve_forever, daemon=True).start()
+    yield local
+    local.server.shutdown()
+    local.server.server_close()
@@ -0,0 +1,98 @@
+import json
+import threading
+import pytest
+from src import batch_answer, rag_engine
+from src.batch_answer import RateLimiter, generate, load_done, read_questions, run_batch
+from src.fakes import FakeEmbedder, FakeGenerativeModel, make_memory_collection
+
+TEXTS = [f"SCERT notice {i}: admission and exam details for district {i}" for i in range(20)]
+QUESTIONS = [{"id": f"q{i}", "question": f"notice {i} admission details"} for i in range(6)]
+
+
+class FlakyModel(FakeGenerativeModel):
+    """Raises `error` for the first `failures` calls per question, then answers."""
+
+    def __init__(self, failures, error=ConnectionError("quota exceeded")):
+        super().__init__(answer="उत्तर", first_token_delay=0, chunk_delay=0)
+        self.failures = failures
+        self.error = error
+        self.seen = {}
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        with self.lock:
+            n = self.seen[prompt] = self.seen.get(prompt, 0) + 1
+        if n <= self.failures:
+            raise self.error
+        return super().generate_content(prompt, stream=stream, **kwargs)
+
+
+def make_engine(model):
+    embedder = FakeEmbedder(dim=64)
+    return rag_engine.MarathiRAG(embedder=embedder, client=make_memory_collection(embedder, TEXTS),
+                                 model=model, cache=False, collection_name="scert_bot")
+
+
+def read_output(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(batch_answer, "RETRY_BASE_SECONDS", 0)
+
+
+def test_transient_errors_are_retried():
+    model = FlakyModel(failures=2)
+    assert generate(model, "prompt", RateLimiter(0), retries=2) == ("उत्तर", 3)
+    with pytest.raises(ConnectionError):
+        generate(FlakyModel(failures=3), "prompt", RateLimiter(0), retries=2)
+
+
+def test_blocked_responses_are_not_retried():
+    model = FlakyModel(failures=5, error=ValueError("blocked"))
+    with pytest.raises(ValueError):
+        generate(model, "prompt", RateLimiter(0), retries=4)
+    assert model.seen == {"prompt": 1}
+
+
+def test_failed_questions_are_retried_on_the_next_run(tmp_path):
+    out = str(tmp_path / "answers.jsonl")
+    stats = run_batch(make_engine(FlakyModel(failures=1)), QUESTIONS, out, batch_size=4, rpm=0, retries=0)
+    assert stats["failed"] == 6 and stats["answered"] == 0
+    assert load_done(out) == set()
+
+    stats = run_batch(make_engine(FlakyModel(failures=0)), QUESTIONS, out, batch_size=4, rpm=0, retries=0)
+    assert (stats["answered"], stats["failed"], stats["skipped"]) == (6, 0, 0)
+    assert load_done(out) == {q["id"] for q in QUESTIONS}
+
+    records = read_output(out)
+    assert len(records) == 12
+    assert all(r["answer"] == "उत्तर" and r["attempts"] == 1 for r in records if "error" not in r)
+
+
+def test_rerun_skips_answered_questions_and_survives_a_cut_off_line(tmp_path):
+    out = tmp_path / "answers.jsonl"
+    model = FlakyModel(failures=0)
+    run_batch(make_engine(model), QUESTIONS[:4], str(out), rpm=0)
+    with open(out, "a", encoding="utf-8") as f:
+        f.write('{"id": "q4", "answ')  # interrupted mid-write
+
+    model = FlakyModel(failures=0)
+    stats = run_batch(make_engine(model), QUESTIONS, str(out), rpm=0)
+    assert (stats["skipped"], stats["answered"]) == (4, 2)
+    assert len(model.seen) == 2
+
+
+def test_read_questions_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "faq.csv"
+    csv_path.write_text("question,id\nप्रवेश कधी?,a1\nप्रवेश कधी?,a1\n,x\nशुल्क किती?,\n", encoding="utf-8")
+    questions = read_questions(str(csv_path))
+    assert [q["question"] for q in questions] == ["प्रवेश कधी?", "शुल्क किती?"]
+    assert questions[0]["id"] == "a1"
+    assert questions[1]["id"] == batch_answer.question_id("शुल्क किती?")
+
+    jsonl_path = tmp_path / "faq.jsonl"
+    jsonl_path.write_text('{"query": "शुल्क किती?"}\n\n', encoding="utf-8")
+    assert read_questions(str(jsonl_path)) == [questions[1]]
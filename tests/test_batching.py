@@ -0,0 +1,50 @@
+import asyncio
+import numpy as np
+from src.batching import QueryBatcher, make_embedding_pool
+from src.fakes import FakeEmbedder
+
+
+class FailingEmbedder:
+    def encode(self, sentences, **kwargs):
+        raise RuntimeError("model crashed")
+
+
+def test_concurrent_encodes_share_one_batch():
+    embedder = FakeEmbedder(dim=8)
+    texts = [f"query: question {i}" for i in range(5)]
+
+    async def run():
+        with make_embedding_pool() as pool:
+            batcher = QueryBatcher(embedder, pool, max_batch_size=32, max_wait_ms=20)
+            vectors = await asyncio.gather(*(batcher.encode(t) for t in texts))
+            return batcher, vectors
+
+    batcher, vectors = asyncio.run(run())
+    assert embedder.calls == 1
+    assert (batcher.batches, batcher.items) == (1, 5)
+    for text, vector in zip(texts, vectors):
+        assert np.allclose(vector, embedder.encode(text))
+
+
+def test_full_batch_flushes_without_waiting():
+    embedder = FakeEmbedder(dim=8)
+
+    async def run():
+        with make_embedding_pool() as pool:
+            batcher = QueryBatcher(embedder, pool, max_batch_size=2, max_wait_ms=60_000)
+            await asyncio.wait_for(asyncio.gather(*(batcher.encode(f"q{i}") for i in range(4))), timeout=5)
+            return batcher
+
+    batcher = asyncio.run(run())
+    assert (batcher.batches, batcher.items) == (2, 4)
+
+
+def test_encode_errors_reach_every_caller():
+    async def run():
+        with make_embedding_pool() as pool:
+            batcher = QueryBatcher(FailingEmbedder(), pool, max_wait_ms=1)
+            return await asyncio.gather(batcher.encode("a"), batcher.encode("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [str(r) for r in results] == ["model crashed", "model crashed"]
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,37 @@
+import copy
+from src.bench_suite import compare, lookup
+
+BASELINE = {
+    "meta": {"git_commit": "abc123", "timestamp": "2026-01-01T00:00:00"},
+    "config": {"files": 300, "embedder": "fake"},
+    "ingest": {"chunks_per_sec": 1000.0},
+    "retrieval": {"latency": {"p50_ms": 10.0, "p95_ms": 20.0}, "recall": {"1": 0.5, "5": 0.8}},
+    "memory": {"peak_rss_mb": 500.0},
+}
+
+
+def test_lookup_follows_dotted_paths():
+    assert lookup(BASELINE, "retrieval.recall.5") == 0.8
+    assert lookup(BASELINE, "retrieval.recall.20") is None
+    assert lookup(BASELINE, "ingest.chunks_per_sec.x") is None
+
+
+def test_compare_flags_only_changes_beyond_tolerance(capsys):
+    results = copy.deepcopy(BASELINE)
+    results["ingest"]["chunks_per_sec"] = 800.0                # 20% slower: regression
+    results["retrieval"]["latency"]["p50_ms"] = 10.4           # within 5%
+    results["retrieval"]["latency"]["p95_ms"] = 15.0           # faster: improvement
+    results["retrieval"]["recall"]["1"] = 0.4                  # worse recall: regression
+    results["memory"]["peak_rss_mb"] = 600.0                   # more memory: regression
+    del results["retrieval"]["recall"]["5"]                    # missing metrics are skipped
+
+    assert compare(results, BASELINE, tolerance=0.05) == [
+        "ingest.chunks_per_sec", "retrieval.recall.1", "memory.peak_rss_mb"]
+    assert "retrieval.recall.5" not in capsys.readouterr().out
+
+
+def test_compare_reports_config_changes(capsys):
+    results = copy.deepcopy(BASELINE)
+    results["config"]["files"] = 50
+    assert compare(results, BASELINE, tolerance=0.05) == []
+    assert "Config differs from the baseline: files" in capsys.readouterr().out
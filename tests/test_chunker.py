@@ -0,0 +1,36 @@
+import random
+import pytest
+
+# The LangChain splitters are the reference (pip install -r requirements-dev.txt)
+pytest.importorskip("langchain_text_splitters")
+
+from src.bench_chunker import EDGE_CASES, check_parity, fast_chunks, langchain_chunks, langchain_splitters
+from src.bench_utils import write_synthetic_corpus
+from src.chunker import MarkdownChunker
+
+LINES = ["#", "##", "###", "# A", "## B", "### C", "#### D", "##### E", "#x", "```", "```py", "``` a ```",
+         "~~~", "text", "more text", "x | y", "", "", "  # A  ", "\u200b", "word " * 200, "क" * 900]
+
+
+@pytest.fixture(scope="module")
+def splitters():
+    return langchain_splitters()
+
+
+def test_edge_cases_match_langchain(splitters):
+    assert check_parity(splitters, EDGE_CASES) == []
+
+
+def test_synthetic_corpus_matches_langchain(splitters, tmp_path):
+    documents = {}
+    for path in write_synthetic_corpus(str(tmp_path), 40, seed=7):
+        with open(path, encoding="utf-8") as f:
+            documents[path] = f.read()
+    assert check_parity(splitters, documents) == []
+
+
+def test_random_markdown_matches_langchain(splitters):
+    rng, chunker = random.Random(0), MarkdownChunker(count_tokens=None)
+    for _ in range(2000):
+        text = "\n".join(rng.choice(LINES) for _ in range(rng.randint(1, 10)))
+        assert fast_chunks(chunker, text) == langchain_chunks(splitters, text), repr(text)
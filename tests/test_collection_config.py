@@ -0,0 +1,44 @@
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+from src import index_manager
+from src.collection_config import create_collection, migrate
+from src.fakes import FakeEmbedder
+
+TEXTS = ["इयत्ता पाचवी शिष्यवृत्ती परीक्षा", "शिक्षक प्रशिक्षण वेळापत्रक", "SCERT circulars 2024"]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_manager, "QDRANT_PATH", str(tmp_path))
+    return QdrantClient(":memory:")
+
+
+def fill(client, collection, embedder):
+    vectors = embedder.encode([f"passage: {t}" for t in TEXTS])
+    client.upsert(collection, [PointStruct(id=i, vector=v.tolist(), payload={"text": t})
+                               for i, (t, v) in enumerate(zip(TEXTS, vectors))])
+
+
+def test_migrate_builds_a_new_version_and_swaps_it_in(client):
+    embedder = FakeEmbedder()
+    old = index_manager.create_version(client)
+    fill(client, old, embedder)
+    index_manager.swap(client, index_manager.SITE, old)
+
+    new, copied = migrate(client, "scalar")
+    assert copied == len(TEXTS) and index_manager.serving_version(client) == old
+    assert index_manager.promote(client, new, embedder, expected_points=copied)
+
+    alias = index_manager.alias_name()
+    assert index_manager.resolve(client, alias) == new
+    # (Embedded mode drops quantization_config; the profile's on-disk vectors show it was applied)
+    assert client.get_collection(alias).config.params.vectors.on_disk
+    assert not client.get_collection(old).config.params.vectors.on_disk   # kept for rollback
+    assert sorted(c.name for c in client.get_collections().collections) == sorted([old, new])
+
+
+def test_migrate_refuses_a_plain_collection(client):
+    create_collection(client, index_manager.alias_name())
+    with pytest.raises(RuntimeError, match="adopt"):
+        migrate(client, "scalar")
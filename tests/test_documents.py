@@ -0,0 +1,121 @@
+import asyncio
+import os
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+from src.bench_utils import write_synthetic_docx, write_synthetic_pdf, write_synthetic_xlsx
+from src.crawl_state import CrawlState
+from src.documents import PAGE_MARKER, DocumentFetcher, extract_to_markdown
+from src.fakes import FakeEmbedder
+from src.ingest import COLLECTION_NAME, split_file
+from src.manifest import IngestManifest, file_sha256
+from src.scraper import HttpFetcher, canonicalize_url, crawl
+from src.stream_ingest import IndexSink
+
+
+def serve_pdf(site, tmp_path, name="circular.pdf", n_pages=4):
+    with open(write_synthetic_pdf(str(tmp_path / name), n_pages), "rb") as f:
+        site.file(f"/docs/{name}", f.read(), "application/pdf")
+    site.page("/index.html", f'<html><body><h1>परिपत्रके</h1><a href="/docs/{name}">{name}</a></body></html>')
+
+
+def stream_site(site, tmp_path):
+    client = QdrantClient(":memory:")
+    client.create_collection(COLLECTION_NAME, vectors_config=VectorParams(size=1024, distance=Distance.COSINE))
+    manifest = IngestManifest(str(tmp_path / "manifest.jsonl"))
+
+    async def go():
+        state = CrawlState(str(tmp_path / "crawl_state.json"), key=canonicalize_url)
+        async with HttpFetcher() as fetcher, DocumentFetcher(str(tmp_path / "store"), workers=1) as docs, \
+                IndexSink(client, FakeEmbedder(), manifest) as sink:
+            await crawl(site.url("/index.html"), fetcher=fetcher, max_pages=10, concurrency=2, rate=0,
+                        output_dir=str(tmp_path / "crawled"), state=state, verbose=False, sink=sink,
+                        documents=docs, changes_path=str(tmp_path / "changes.json"))
+    asyncio.run(go())
+    return client, manifest
+
+
+@pytest.mark.parametrize("write, name, pages, expected", [
+    (lambda p: write_synthetic_pdf(p, 3, table_rows=2), "circular.pdf", 3,
+     ["## Circular 2: Exam Timetable", "| 2 | Subject 3-2 | 2024-06-02 |"]),
+    (lambda p: write_synthetic_docx(p, 2), "syllabus.docx", 2, ["# Syllabus part 2", "| 2 | Topic 2 |"]),
+    (lambda p: write_synthetic_xlsx(p, 3), "schools.xlsx", 1, ["## Schools 2024", "| District 3 |  | 40 |"]),
+])
+def test_extraction_keeps_pages_headings_and_rows(tmp_path, write, name, pages, expected):
+    path = write(str(tmp_path / name))
+    out = path + ".md"
+    assert extract_to_markdown(path, out, source_url=f"https://www.maa.ac.in/docs/{name}") == (pages, pages)
+    with open(out, encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    assert all(line in lines for line in expected)
+    assert [line for line in lines if line.startswith("<!-- page")] == [PAGE_MARKER.format(n) for n in range(1, pages + 1)]
+
+    _, _, _, payloads = split_file(out)
+    assert sorted({p["page"] for p in payloads}) == list(range(1, pages + 1))
+    assert {p["source_url"] for p in payloads} == {f"https://www.maa.ac.in/docs/{name}"}
+
+
+def test_same_bytes_under_two_urls_are_extracted_once(site, tmp_path):
+    with open(write_synthetic_pdf(str(tmp_path / "timetable.pdf"), 3), "rb") as f:
+        data = f.read()
+    for name in ("timetable.pdf", "timetable-copy.pdf"):
+        site.file(f"/docs/{name}", data, "application/pdf")
+
+    async def fetch_both():
+        async with DocumentFetcher(str(tmp_path / "store"), workers=1) as docs:
+            pages = await asyncio.gather(docs.fetch(site.url("/docs/timetable.pdf")),
+                                         docs.fetch(site.url("/docs/timetable-copy.pdf")))
+            return pages, docs.stats
+    (first, second), stats = asyncio.run(fetch_both())
+    assert first.markdown_path == second.markdown_path and first.body_hash == second.body_hash
+    assert stats["extracted"] == 1 and stats["reused"] == 1
+    assert sorted(os.listdir(tmp_path / "store")) == [f"{first.body_hash}.md", f"{first.body_hash}.pdf"]
+
+
+def test_failed_extraction_is_not_reused(site, tmp_path):
+    site.file("/docs/broken.pdf", b"%PDF-1.4 not really a pdf", "application/pdf")
+
+    async def fetch_twice():
+        async with DocumentFetcher(str(tmp_path / "store"), workers=1) as docs:
+            for _ in range(2):
+                with pytest.raises(Exception):
+                    await docs.fetch(site.url("/docs/broken.pdf"))
+                assert docs.extractions == {}
+            return docs.stats
+    stats = asyncio.run(fetch_twice())
+    assert stats["downloaded"] == 2 and stats["reused"] == 0
+
+
+def test_document_404_is_a_removal_signal(site, tmp_path):
+    async def fetch():
+        async with DocumentFetcher(str(tmp_path / "store"), workers=1) as docs:
+            return await docs.fetch(site.url("/docs/missing.pdf"))
+    page = asyncio.run(fetch())
+    assert not page.success and page.status == 404
+
+
+def test_fetch_leaves_the_markdown_on_disk(site, tmp_path):
+    serve_pdf(site, tmp_path)
+
+    async def fetch():
+        async with DocumentFetcher(str(tmp_path / "store"), workers=1) as docs:
+            return await docs.fetch(site.url("/docs/circular.pdf"))
+    page = asyncio.run(fetch())
+    assert page.success and page.markdown == ""
+    assert page.markdown_path == str(tmp_path / "store" / f"{page.body_hash}.md")
+
+
+def test_streamed_document_matches_ingesting_its_saved_file(site, tmp_path):
+    serve_pdf(site, tmp_path)
+    client, manifest = stream_site(site, tmp_path)
+
+    saved = next(f for f in os.listdir(tmp_path / "crawled") if "circular" in f)
+    path = str(tmp_path / "crawled" / saved)
+    file_name, ids, _, payloads = split_file(path)
+    assert manifest.get(file_name)["file_hash"] == file_sha256(path)
+
+    points, _ = client.scroll(COLLECTION_NAME, limit=1000, with_payload=True)
+    streamed = {str(p.id): p.payload for p in points if p.payload["file_name"] == file_name}
+    assert sorted(streamed) == sorted(ids)
+    assert sorted({p["page"] for p in streamed.values()}) == [1, 2, 3, 4]
+    assert {p["page"] for p in payloads} == {1, 2, 3, 4}
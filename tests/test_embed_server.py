@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from src.embed_server import DynamicBatcher, EmbeddingClient, make_server
+from src.fakes import FakeEmbedder
+
+
+@pytest.fixture
+def server():
+    batcher = DynamicBatcher(FakeEmbedder(dim=8), max_batch_size=16, max_wait_ms=5)
+    httpd = make_server(batcher, "fake", port=0)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_concurrent_requests_share_batches():
+    embedder = FakeEmbedder(dim=8, call_delay=0.05)
+    batcher = DynamicBatcher(embedder, max_batch_size=64, max_wait_ms=20)
+    texts = [[f"query: q{i}", f"query: r{i}"] for i in range(8)]
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(batcher.encode, texts))
+
+    for pair, vectors in zip(texts, results):
+        assert vectors.shape == (2, 8)
+        assert np.allclose(vectors, embedder.encode(pair))
+    assert batcher.stats["requests"] == 8
+    assert batcher.stats["texts"] == 16
+    assert batcher.stats["batches"] < 8
+    assert batcher.queued_texts == 0
+
+
+def test_encode_error_is_raised_to_the_caller():
+    class Broken:
+        def encode(self, texts, **kwargs):
+            raise RuntimeError("out of memory")
+
+    batcher = DynamicBatcher(Broken(), max_wait_ms=1)
+    with pytest.raises(RuntimeError, match="out of memory"):
+        batcher.encode(["query: x"])
+    assert batcher.stats["errors"] == 1
+    assert "embed_errors_total 1" in batcher.metrics()
+
+
+def test_client_round_trip(server):
+    client = EmbeddingClient(server.url)
+    assert (client.embedder_id, client.dim) == ("fake", 8)
+
+    vectors = client.encode(["passage: a", "passage: b"])
+    assert vectors.shape == (2, 8)
+    assert np.allclose(vectors, FakeEmbedder(dim=8).encode(["passage: a", "passage: b"]))
+    assert client.encode("passage: a").shape == (8,)
+
+
+def test_client_falls_back_in_process_when_server_goes_away(server):
+    local = FakeEmbedder(dim=8)
+    client = EmbeddingClient(server.url, fallback=lambda: local)
+    server.shutdown()
+    server.server_close()
+
+    # A fresh thread has no kept-alive connection, so it sees the server is gone
+    with ThreadPoolExecutor(1) as pool:
+        vectors = pool.submit(client.encode, ["passage: a"]).result()
+    assert local.calls == 1
+    assert np.allclose(vectors, local.encode(["passage: a"]))
+
+    client.encode(["passage: b"])
+    assert local.calls == 3  # stays local from then on
+
+
+def test_client_without_fallback_raises(server):
+    client = EmbeddingClient(server.url)
+    server.shutdown()
+    server.server_close()
+    with ThreadPoolExecutor(1) as pool:
+        with pytest.raises(OSError):
+            pool.submit(client.encode, ["passage: a"]).result()
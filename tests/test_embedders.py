@@ -0,0 +1,51 @@
+import socket
+import threading
+import pytest
+from src.embed_server import DynamicBatcher, EmbeddingClient, make_server
+from src.embedders import backend_name, connect_embedder, embedder_id, load_embedder
+from src.fakes import FakeEmbedder
+
+
+def serve(model_id):
+    server = make_server(DynamicBatcher(FakeEmbedder(dim=8), max_wait_ms=1), model_id, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def unused_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def test_backend_selection(monkeypatch):
+    monkeypatch.setenv("EMBEDDER_BACKEND", "fake")
+    assert backend_name() == "fake"
+    assert backend_name("onnx") == "onnx"
+    with pytest.raises(ValueError, match="Unknown embedder backend"):
+        backend_name("gpu")
+    assert embedder_id("torch") == "intfloat/multilingual-e5-large"
+    assert embedder_id("int8") == "intfloat/multilingual-e5-large@int8"
+    assert isinstance(load_embedder(), FakeEmbedder)
+
+
+def test_connect_uses_a_matching_server():
+    server, url = serve(embedder_id("fake"))
+    try:
+        embedder = connect_embedder("fake", url)
+        assert isinstance(embedder, EmbeddingClient)
+        assert embedder.encode(["query: x"]).shape == (1, 8)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_connect_loads_in_process_without_a_matching_server():
+    assert isinstance(connect_embedder("fake", unused_url()), FakeEmbedder)
+
+    server, url = serve(embedder_id("torch"))  # different vectors: must not be mixed in
+    try:
+        assert isinstance(connect_embedder("fake", url), FakeEmbedder)
+    finally:
+        server.shutdown()
+        server.server_close()
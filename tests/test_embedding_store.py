@@ -0,0 +1,68 @@
+import numpy as np
+from src.embedding_store import CachedEmbedder, EmbeddingStore
+from src.fakes import FakeEmbedder
+
+
+def test_in_batch_duplicates_count_as_saved_encodes(tmp_path):
+    model = FakeEmbedder(dim=8)
+    store = EmbeddingStore("fake", dim=8, store_dir=str(tmp_path))
+    embedder = CachedEmbedder(model, store)
+
+    vectors = embedder.encode(["passage: footer", "passage: body", "passage: footer"])
+    assert np.allclose(vectors[0], vectors[2])
+    stats = store.stats()
+    assert stats["encoded"] == 2
+    assert stats["encodes_saved"] == 1
+
+    embedder.encode(["passage: footer", "passage: body"])
+    stats = store.stats()
+    assert stats["encoded"] == 2
+    assert stats["encodes_saved"] == 3
+
+
+def test_interrupted_append_is_truncated_on_load(tmp_path):
+    store = EmbeddingStore("fake", dim=4, store_dir=str(tmp_path))
+    store.add(["a", "b"], np.eye(4, dtype=np.float32)[:2])
+
+    # A crash after the vectors were written but before the keys
+    with open(store.vectors_path, "ab") as f:
+        f.write(np.ones(4, dtype=np.float32).tobytes())
+
+    reopened = EmbeddingStore("fake", dim=4, store_dir=str(tmp_path))
+    assert reopened.count == 2
+    assert (tmp_path / "fake.f32").stat().st_size == 2 * 4 * 4
+    assert np.allclose(reopened.get("b"), [0, 1, 0, 0])
+    assert reopened.get("c") is None
+
+
+def test_compact_keeps_recently_used_rows_across_reopen(tmp_path):
+    store = EmbeddingStore("fake", dim=4, store_dir=str(tmp_path))
+    store.add(["a", "b", "c"], np.eye(4, dtype=np.float32)[:3])
+    store.get("a")
+    store.get("c")
+    store.flush()
+
+    # LRU ticks come back from the .used file
+    reopened = EmbeddingStore("fake", dim=4, store_dir=str(tmp_path))
+    assert reopened.compact(max_entries=2) == 1
+    assert reopened.count == 2
+    assert reopened.get("b") is None
+    assert np.allclose(reopened.get("a"), [1, 0, 0, 0])
+    assert np.allclose(reopened.get("c"), [0, 0, 1, 0])
+
+    again = EmbeddingStore("fake", dim=4, store_dir=str(tmp_path))
+    assert again.count == 2
+    assert again.get("b") is None
+
+
+def test_missing_used_file_starts_rows_cold(tmp_path):
+    store = EmbeddingStore("fake", dim=4, store_dir=str(tmp_path))
+    store.add(["a", "b"], np.eye(4, dtype=np.float32)[:2])
+
+    reopened = EmbeddingStore("fake", dim=4, store_dir=str(tmp_path))
+    assert reopened.count == 2
+    assert not reopened._used.any()
+    reopened.get("b")
+    assert reopened.compact(max_entries=1) == 1
+    assert reopened.get("a") is None
+    assert reopened.get("b") is not None
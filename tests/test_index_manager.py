@@ -0,0 +1,30 @@
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+from src import index_manager
+from src.fakes import FakeEmbedder
+
+TEXTS = ["इयत्ता पाचवी शिष्यवृत्ती परीक्षा", "शिक्षक प्रशिक्षण वेळापत्रक", "SCERT circulars 2024"]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_manager, "QDRANT_PATH", str(tmp_path))
+    return QdrantClient(":memory:")
+
+
+def test_first_ingest_is_served_only_once_validated(client):
+    embedder = FakeEmbedder()
+    target = index_manager.ingest_target(client)
+    assert index_manager.serving_version(client) is None   # Nothing served while it fills
+    assert index_manager.ingest_target(client) == target   # An interrupted first build is resumed
+
+    assert not index_manager.promote_first(client, target, embedder)   # Still empty
+    assert index_manager.serving_version(client) is None
+
+    vectors = embedder.encode([f"passage: {t}" for t in TEXTS])
+    client.upsert(target, [PointStruct(id=i, vector=v.tolist(), payload={"text": t})
+                           for i, (t, v) in enumerate(zip(TEXTS, vectors))])
+    assert index_manager.promote_first(client, target, embedder)
+    assert index_manager.serving_version(client) == target
+    assert index_manager.ingest_target(client) == target
@@ -0,0 +1,24 @@
+import os
+from src.fakes import FakeEmbedder, make_memory_collection
+from src.ingest import plan_ingestion, seed_manifest
+from src.manifest import IngestManifest, file_sha256
+
+
+def test_manifest_is_seeded_from_the_old_progress_log(tmp_path):
+    client = make_memory_collection(FakeEmbedder(dim=8), ["प्रवेश", "परीक्षा"])  # fake_0.md, fake_1.md
+    data_dir = tmp_path / "raw_markdown"
+    data_dir.mkdir()
+    for name in ("fake_0.md", "fake_1.md", "empty.md", "new.md"):
+        (data_dir / name).write_text(f"Source: https://www.maa.ac.in/{name}\n\n# {name}\n", encoding="utf-8")
+    log = tmp_path / "processed_files.txt"
+    log.write_text("fake_0.md\nfake_1.md\nempty.md\ngone.md\nfake_0.md\n", encoding="utf-8")
+
+    manifest = IngestManifest(str(tmp_path / "ingest_manifest.jsonl"))
+    assert seed_manifest(manifest, client, "scert_bot", str(data_dir), str(log)) == 2
+    assert set(manifest.files) == {"fake_0.md", "fake_1.md"}
+    assert manifest.is_unchanged("fake_1.md", file_sha256(str(data_dir / "fake_1.md")))
+    assert len(manifest.get("fake_0.md")["chunks"]) == 1
+
+    files = [str(data_dir / name) for name in os.listdir(data_dir)]
+    plan = plan_ingestion(files, client, IngestManifest(manifest.path), "scert_bot")
+    assert sorted(os.path.basename(path) for path in plan) == ["empty.md", "new.md"]
@@ -0,0 +1,48 @@
+from src.fakes import FakeEmbedder, make_memory_collection
+from src.keyword_index import KeywordIndex, reciprocal_rank_fusion, tokenize
+
+DOCS = [
+    "परिपत्रक क्रमांक २०२४/३४५ शाळा प्रवेश",
+    "Contact the office at 020-2447 6938 for admissions",
+    "शिक्षक प्रशिक्षण कार्यक्रम वेळापत्रक",
+]
+
+
+def test_tokenize_folds_digits_and_keeps_numbers_whole():
+    tokens = tokenize("परिपत्रक २०२४/३४५ ​call 020-2447 6938।")
+    assert "परिपत्रक" in tokens
+    assert "2024345" in tokens
+    assert "02024476938" in tokens
+    assert "।" not in "".join(tokens)
+
+
+def test_save_load_round_trip(tmp_path):
+    index = KeywordIndex.build(enumerate(DOCS))
+    path = str(tmp_path / "keywords.npz")
+    index.save(path)
+    loaded = KeywordIndex.load(path)
+
+    assert len(loaded) == len(index) == 3
+    assert loaded.terms.tolist() == index.terms.tolist()
+    for query in ["२०२४/३४५", "02024476938", "प्रशिक्षण वेळापत्रक"]:
+        assert loaded.search(query) == index.search(query)
+    assert loaded.search("02024476938")[0][0] == "1"
+    assert loaded.search("absent") == []
+
+
+def test_build_from_collection_indexes_payload_text():
+    client = make_memory_collection(FakeEmbedder(dim=8), DOCS)
+    index = KeywordIndex.build_from_collection(client, "scert_bot")
+    assert len(index) == 3
+    assert index.search("2024/345")[0][0] == "0"
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+    ids = [point_id for point_id, _ in fused]
+    assert ids[0] == "b"
+    assert set(ids) == {"a", "b", "c", "d"}
+    scores = dict(fused)
+    assert scores["b"] == 1 / 62 + 1 / 61
+    assert scores["a"] > scores["d"] > scores["c"]
+    assert reciprocal_rank_fusion([]) == []
@@ -0,0 +1,46 @@
+import hashlib
+from src.manifest import IngestManifest, file_sha256
+
+
+def test_last_record_wins_and_tombstones_drop_files(tmp_path):
+    path = str(tmp_path / "manifest.jsonl")
+    manifest = IngestManifest(path)
+    manifest.record("a.md", "h1", ["c1", "c2"])
+    manifest.record("b.md", "h2", ["c3"])
+    manifest.record("a.md", "h3", ["c4"])
+    manifest.forget("b.md")
+
+    reloaded = IngestManifest(path)
+    assert set(reloaded.files) == {"a.md"}
+    assert reloaded.get("a.md")["chunks"] == ["c4"]
+    assert reloaded.is_unchanged("a.md", "h3")
+    assert not reloaded.is_unchanged("a.md", "h1")
+    assert not reloaded.is_unchanged("b.md", "h2")
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    IngestManifest(str(path)).record("a.md", "h1", ["c1"])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"file_name": "b.md", "file_ha')
+
+    reloaded = IngestManifest(str(path))
+    assert set(reloaded.files) == {"a.md"}
+
+
+def test_long_log_is_compacted_on_load(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    manifest = IngestManifest(str(path))
+    for i in range(150):
+        manifest.record("a.md", f"h{i}", [f"c{i}"])
+
+    reloaded = IngestManifest(str(path))
+    assert reloaded.get("a.md")["file_hash"] == "h149"
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1
+
+
+def test_file_sha256_reads_in_blocks(tmp_path):
+    path = tmp_path / "a.md"
+    data = b"SCERT " * 400_000  # larger than one read block
+    path.write_bytes(data)
+    assert file_sha256(str(path)) == hashlib.sha256(data).hexdigest()
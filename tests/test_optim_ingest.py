@@ -0,0 +1,33 @@
+from src import optim_ingest
+from src.bench_utils import write_synthetic_corpus
+from src.fakes import FakeEmbedder
+from src.ingest import split_file
+from src.manifest import IngestManifest
+
+
+class RecordingClient:
+    """Keeps the ids of each upload_collection call."""
+
+    def __init__(self):
+        self.uploads = []
+
+    def upload_collection(self, collection_name, vectors, payload=None, ids=None, **kwargs):
+        self.uploads.append(list(ids))
+
+
+def test_a_file_larger_than_the_window_is_uploaded_in_windows(tmp_path):
+    big = tmp_path / "big.md"
+    big.write_text("Source: https://www.maa.ac.in/big\n\n" +
+                   "\n\n".join(f"## Notice {i}\n" + f"परिपत्रक क्रमांक {i} " * 60 for i in range(40)),
+                   encoding="utf-8")
+    files = write_synthetic_corpus(str(tmp_path / "corpus"), 3) + [str(big)]
+    client, manifest = RecordingClient(), IngestManifest(str(tmp_path / "manifest.jsonl"))
+
+    total = optim_ingest.ingest_stream(files, client, "bench", FakeEmbedder(), manifest, window=16)
+    expected = {f: split_file(f)[1] for f in files}
+    assert total == sum(len(ids) for ids in expected.values())
+    assert len(expected[str(big)]) > 16
+    assert max(len(ids) for ids in client.uploads) <= 16
+    assert [i for ids in client.uploads for i in ids] == [i for f in files for i in expected[f]]
+    assert {name: entry["chunks"] for name, entry in manifest.files.items()} == \
+        {f.rsplit("/", 1)[-1]: ids for f, ids in expected.items()}
@@ -0,0 +1,100 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src import rag_engine
+from src.fakes import FakeEmbedder, FakeGenerativeModel, make_memory_collection
+from src.tracing import Tracer
+
+TEXTS = [f"SCERT notice {i}: " + "admission and exam details " * (1 + i % 7) for i in range(60)]
+QUERIES = ["notice 3 admission", "notice 40 exam details details details"]
+
+
+class ListSink:
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_engine(sink, **kwargs):
+    embedder = FakeEmbedder()
+    return rag_engine.MarathiRAG(embedder=embedder, client=make_memory_collection(embedder, TEXTS), cache=False,
+                      model=FakeGenerativeModel(first_token_delay=0.01, chunk_delay=0),
+                      tracer=Tracer(sinks=[sink]), **kwargs)
+
+
+def context_attrs(records):
+    return {r["query"]: (r["context_blocks"], r["context_tokens"]) for r in records}
+
+
+def test_concurrent_requests_trace_their_own_context_report(monkeypatch):
+    sequential, concurrent = ListSink(), ListSink()
+    engine = make_engine(sequential, context_token_budget=300)
+    for q in QUERIES:
+        engine.generate_answer(q)
+    assert len(set(context_attrs(sequential.records).values())) == 2
+
+    # Both requests have assembled their context before either annotates its trace
+    barrier, count = threading.Barrier(2, timeout=10), rag_engine.estimate_tokens
+
+    def estimate_together(text):
+        barrier.wait()
+        return count(text)
+
+    monkeypatch.setattr(rag_engine, "estimate_tokens", estimate_together)
+    engine = make_engine(concurrent, context_token_budget=300)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(engine.generate_answer, QUERIES))
+    assert context_attrs(concurrent.records) == context_attrs(sequential.records)
+
+
+def test_format_prompt_returns_the_report():
+    engine = make_engine(ListSink())
+    hits = engine.client.query_points("scert_bot", query=engine.embedder.encode(["query: exam"])[0].tolist(),
+                                      limit=5).points
+    prompt, sources, report = engine._format_prompt("exam", hits)
+    assert report["blocks"] >= 1 and sources
+    assert make_engine(ListSink(), context_budgeter=False)._format_prompt("exam", hits)[2] is None
+
+
+def test_cache_dropped_when_a_reingest_keeps_the_point_count(tmp_path, monkeypatch):
+    manifest = tmp_path / "manifest.jsonl"
+    monkeypatch.setattr(rag_engine, "manifest_path", lambda collection: str(manifest))
+    embedder = FakeEmbedder()
+    engine = rag_engine.MarathiRAG(embedder=embedder, client=make_memory_collection(embedder, TEXTS),
+                                   model=FakeGenerativeModel(chunk_delay=0), cache_check_interval=0,
+                                   keyword_index_path=str(tmp_path / "keywords.npz"))
+    engine.generate_answer(QUERIES[0])
+    engine.generate_answer(QUERIES[0])
+    assert engine.cache.stats()["exact_hits"] == 1
+
+    manifest.write_text('{"file_name": "fake_3.md"}\n', encoding="utf-8")   # Chunks replaced in place
+    engine.generate_answer(QUERIES[0])
+    stats = engine.cache.stats()
+    assert stats["invalidations"] == 1 and stats["exact_hits"] == 1
+
+
+def test_semantic_tier_is_off_unless_a_threshold_is_set():
+    vector = FakeEmbedder().encode(["query: शाळा क्रमांक 12 ची वेळ"])[0]
+    cache = rag_engine.AnswerCache()
+    cache.put("शाळा क्रमांक 12 ची वेळ", vector, "answer 12", [])
+    assert cache.get_answer("शाळा क्रमांक 12 ची वेळ?", vector) == ("answer 12", [])
+    assert cache.get_answer("शाळा क्रमांक 13 ची वेळ", vector) is None   # Same vector, other question
+
+    cache = rag_engine.AnswerCache(similarity_threshold=0.99)
+    cache.put("शाळा क्रमांक 12 ची वेळ", vector, "answer 12", [])
+    assert cache.get_answer("school 12 timing", vector) == ("answer 12", [])
+
+
+def test_blank_answers_are_not_cached():
+    embedder = FakeEmbedder()
+    engine = rag_engine.MarathiRAG(embedder=embedder, client=make_memory_collection(embedder, TEXTS),
+                                   model=FakeGenerativeModel(answer=" \n", chunk_delay=0))
+    assert list(engine.stream_answer(QUERIES[0]))[-1][0] == "sources"
+    engine.generate_answer(QUERIES[0])
+    assert engine.cache.get_answer(QUERIES[0]) is None
+    assert engine.cache.get_vector(QUERIES[0]) is not None   # The embedding is still reused
+
+    engine.model = FakeGenerativeModel(answer="प्रवेश 15 जून पासून", chunk_delay=0)
+    assert engine.generate_answer(QUERIES[0])[0] == "प्रवेश 15 जून पासून"
+    assert engine.cache.get_answer(QUERIES[0])[0] == "प्रवेश 15 जून पासून"
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+from src.crawl_state import CrawlState, content_hash
+from src.ingest import load_changes
+from src.scraper import Frontier, HttpFetcher, canonicalize_url, conditional_probe, crawl, is_crawlable
+
+
+def make_site(site, n_pages):
+    links = "".join(f'<a href="/p{i}.html">page {i}</a>' for i in range(1, n_pages))
+    site.page("/index.html", f"<html><body><h1>SCERT</h1>{links}</body></html>")
+    for i in range(1, n_pages):
+        site.page(f"/p{i}.html", f'<html><body><p>सूचना {i}</p><a href="/index.html">home</a></body></html>')
+
+
+def run_crawl(site, tmp_path, state=None, **kwargs):
+    async def go():
+        async with HttpFetcher() as fetcher:
+            return await crawl(site.url("/index.html"), fetcher=fetcher, max_pages=100, concurrency=4, rate=0,
+                               output_dir=str(tmp_path / "crawled"), state=state, verbose=False,
+                               changes_path=str(tmp_path / "changes.json"), **kwargs)
+    return asyncio.run(go())
+
+
+def read_feed(tmp_path):
+    with open(tmp_path / "changes.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def new_state(tmp_path):
+    return CrawlState(str(tmp_path / "crawl_state.json"), key=canonicalize_url)
+
+
+def test_crawl_writes_every_page(site, tmp_path):
+    make_site(site, 5)
+    assert run_crawl(site, tmp_path) == 5
+    files = os.listdir(tmp_path / "crawled")
+    assert len(files) == 5
+    with open(tmp_path / "crawled" / next(f for f in files if "p3" in f), encoding="utf-8") as f:
+        assert f.readline().strip() == f"Source: {site.url('/p3.html')}"
+
+
+def test_unchanged_pages_are_not_reported(site, tmp_path):
+    make_site(site, 5)
+    run_crawl(site, tmp_path, new_state(tmp_path))
+    assert len(read_feed(tmp_path)["new"]) == 5
+
+    run_crawl(site, tmp_path, new_state(tmp_path))
+    feed = read_feed(tmp_path)
+    assert feed["complete"] and feed["unchanged"] == 5
+    assert feed["new"] == feed["changed"] == feed["removed"] == []
+
+
+def test_fetch_failure_then_complete_run_removes_nothing(site, tmp_path):
+    make_site(site, 6)
+    run_crawl(site, tmp_path, new_state(tmp_path))
+    before = sorted(os.listdir(tmp_path / "crawled"))
+
+    # The homepage is the only way to the other pages; a transient 503 must not make them "removed"
+    site.page("/index.html", "<html><body>busy</body></html>", status=503)
+    run_crawl(site, tmp_path, new_state(tmp_path))
+    feed = read_feed(tmp_path)
+    assert feed["removed"] == []
+    assert sorted(os.listdir(tmp_path / "crawled")) == before
+
+    # Next run the homepage is back and the crawl is complete again
+    make_site(site, 6)
+    run_crawl(site, tmp_path, new_state(tmp_path))
+    feed = read_feed(tmp_path)
+    assert feed["complete"] and feed["removed"] == []
+    assert sorted(os.listdir(tmp_path / "crawled")) == before
+
+
+def test_failure_on_page_without_outlinks_keeps_sweep_off(site, tmp_path):
+    make_site(site, 4)
+    run_crawl(site, tmp_path, new_state(tmp_path))
+    site.page("/p2.html", "oops", status=500)
+    run_crawl(site, tmp_path, new_state(tmp_path))
+    feed = read_feed(tmp_path)
+    assert not feed["complete"]
+    assert feed["removed"] == []
+
+
+def test_404_and_unlinked_pages_are_removed(site, tmp_path):
+    make_site(site, 5)
+    run_crawl(site, tmp_path, new_state(tmp_path))
+
+    del site.pages["/p4.html"]   # now a 404
+    site.page("/index.html", "<html><body>" + "".join(f'<a href="/p{i}.html">x</a>' for i in (1, 2, 4)) +
+              "</body></html>")   # p3 is no longer linked from anywhere
+    run_crawl(site, tmp_path, new_state(tmp_path))
+    feed = read_feed(tmp_path)
+    assert feed["complete"]
+    assert sorted(p["url"] for p in feed["removed"]) == [site.url("/p3.html"), site.url("/p4.html")]
+    assert {p["url"]: p["confirmed"] for p in feed["removed"]} == {site.url("/p3.html"): False,
+                                                                   site.url("/p4.html"): True}
+    files = os.listdir(tmp_path / "crawled")
+    assert not any("p4" in f for f in files) and any("p3" in f for f in files)
+
+    # Only the 404 is deleted by an ingest of the feed, unless unseen pages are purged explicitly
+    changes = str(tmp_path / "changes.json")
+    assert [("p4" in name) for name in load_changes(changes, str(tmp_path / "crawled"))[1]] == [True]
+    assert len(load_changes(changes, str(tmp_path / "crawled"), purge_unseen=True)[1]) == 2
+
+
+def test_document_links_only_followed_with_a_document_fetcher():
+    assert not is_crawlable("https://www.maa.ac.in/docs/circular.pdf", "maa.ac.in")
+    assert is_crawlable("https://www.maa.ac.in/docs/circular.pdf", "maa.ac.in", documents=True)
+    assert not is_crawlable("https://www.maa.ac.in/logo.png", "maa.ac.in", documents=True)
+    assert not is_crawlable("https://example.org/page", "maa.ac.in")
+
+
+def test_probe_hashes_the_body_within_the_size_cap(site):
+    data = os.urandom(3 << 20)
+    site.file("/docs/big.pdf", data, "application/pdf")
+    status, _, body_hash = conditional_probe(site.url("/docs/big.pdf"), None)
+    assert status == 200 and body_hash == content_hash(data)
+    status, _, body_hash = conditional_probe(site.url("/docs/big.pdf"), None, max_bytes=1 << 20)
+    assert status == 200 and body_hash is None
+
+
+def test_canonicalize_url_merges_equivalent_spellings():
+    key = canonicalize_url("https://www.maa.ac.in/notices/?b=2&a=1")
+    for url in ["http://maa.ac.in/notices?a=1&b=2#top", "https://WWW.MAA.AC.IN:443/notices/?a=1&b=2",
+                "http://maa.ac.in:80/notices?b=2&a=1"]:
+        assert canonicalize_url(url) == key
+    assert key == "maa.ac.in/notices?a=1&b=2"
+    assert canonicalize_url("https://maa.ac.in") == canonicalize_url("https://maa.ac.in/") == "maa.ac.in/"
+    assert canonicalize_url("https://maa.ac.in:8443/x") == "maa.ac.in:8443/x"
+    assert canonicalize_url("https://maa.ac.in/x?a=") != canonicalize_url("https://maa.ac.in/x")
+    assert canonicalize_url("https://maa.ac.in/Notices") != canonicalize_url("https://maa.ac.in/notices")
+
+
+def test_frontier_pops_shallowest_first_and_dedupes():
+    frontier = Frontier(max_depth=2)
+    assert frontier.push("https://maa.ac.in/a", 1)
+    assert frontier.push("https://maa.ac.in/b", 2)
+    assert frontier.push("https://maa.ac.in/", 0)
+    assert not frontier.push("https://www.maa.ac.in/a/#x", 0)   # already seen
+    assert not frontier.push("https://maa.ac.in/deep", 3)       # beyond max_depth
+    assert len(frontier) == 3
+
+    assert frontier.pop() == ("https://maa.ac.in/", 0)
+    assert frontier.push("https://maa.ac.in/c", 1)  # found while crawling depth 0
+    assert [frontier.pop() for _ in range(3)] == [
+        ("https://maa.ac.in/a", 1), ("https://maa.ac.in/c", 1), ("https://maa.ac.in/b", 2)]
+    assert frontier.pop() is None and len(frontier) == 0
+    assert not frontier.push("https://maa.ac.in/a", 1)  # popped urls stay seen
+
+
+def test_frontier_state_round_trip_requeues_in_flight_pages():
+    frontier = Frontier(max_depth=2)
+    for i, depth in enumerate([0, 1, 1, 2]):
+        frontier.push(f"https://maa.ac.in/p{i}", depth)
+    in_flight = [frontier.pop(), frontier.pop()]
+
+    state = json.loads(json.dumps(frontier.to_state(in_flight)))
+    resumed = Frontier.from_state(state, max_depth=2)
+    assert len(resumed) == 4
+    assert resumed.seen == frontier.seen
+    assert [resumed.pop()[0] for _ in range(4)] == [f"https://maa.ac.in/p{i}" for i in range(4)]
@@ -0,0 +1,89 @@
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from src.fakes import FakeEmbedder, FakeGenerativeModel, make_memory_collection
+from src.startup import EngineLoader, start_readiness_server
+
+
+class GatedEmbedder(FakeEmbedder):
+    """Blocks in encode() until `gate` is set; raises if `fail` is set."""
+
+    def __init__(self, fail=False):
+        super().__init__(dim=8)
+        self.gate = threading.Event()
+        self.fail = fail
+
+    def encode(self, sentences, **kwargs):
+        assert self.gate.wait(10)
+        if self.fail:
+            raise RuntimeError("model weights missing")
+        return super().encode(sentences, **kwargs)
+
+
+def engine_kwargs(embedder):
+    return {"embedder": embedder, "client": make_memory_collection(FakeEmbedder(dim=8), ["SCERT प्रवेश"]),
+            "model": FakeGenerativeModel(), "cache": False, "collection_name": "scert_bot"}
+
+
+@pytest.fixture
+def port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(port, path):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def test_ready_only_after_warmup(port):
+    embedder = GatedEmbedder()
+    loader = EngineLoader(engine_kwargs(embedder)).start()
+    server = start_readiness_server(loader, port=port, host="127.0.0.1")
+    try:
+        assert get(port, "/health")[0] == 200
+        status, body = get(port, "/ready")
+        assert status == 503
+        assert json.loads(body)["state"] in ("starting", "loading")
+
+        embedder.gate.set()
+        engine = loader.wait(timeout=10)
+        assert loader.ready and engine is loader.engine
+        status, body = get(port, "/ready")
+        assert status == 200
+        assert set(json.loads(body)["phases"]) == {"imports", "engine", "warmup"}
+        assert get(port, "/metrics")[0] == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_failed_load_is_reported(port):
+    embedder = GatedEmbedder(fail=True)
+    embedder.gate.set()
+    loader = EngineLoader(engine_kwargs(embedder)).start()
+    server = start_readiness_server(loader, port=port, host="127.0.0.1")
+    try:
+        with pytest.raises(RuntimeError, match="model weights missing"):
+            loader.wait(timeout=10)
+        assert loader.engine is None
+        status, body = get(port, "/ready")
+        assert status == 503
+        body = json.loads(body)
+        assert body["state"] == "failed"
+        assert body["error"] == "RuntimeError: model weights missing"
+        assert body["phase"] is None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_port_zero_disables_the_endpoint():
+    assert start_readiness_server(EngineLoader(), port=0) is None
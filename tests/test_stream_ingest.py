@@ -0,0 +1,44 @@
+import asyncio
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+from src.crawl_state import CrawlState
+from src.fakes import FakeEmbedder
+from src.ingest import COLLECTION_NAME
+from src.manifest import IngestManifest
+from src.scraper import HttpFetcher, canonicalize_url, crawl
+from src.stream_ingest import IndexSink
+
+
+def stream(site, tmp_path, client):
+    async def go():
+        state = CrawlState(str(tmp_path / "crawl_state.json"), key=canonicalize_url)
+        manifest = IngestManifest(str(tmp_path / "manifest.jsonl"))
+        async with HttpFetcher() as fetcher, IndexSink(client, FakeEmbedder(), manifest) as sink:
+            await crawl(site.url("/index.html"), fetcher=fetcher, max_pages=100, concurrency=4, rate=0,
+                        output_dir=None, state=state, verbose=False, sink=sink,
+                        changes_path=str(tmp_path / "changes.json"))
+        return sink
+    return asyncio.run(go())
+
+
+def indexed_urls(client):
+    points, _ = client.scroll(COLLECTION_NAME, limit=10_000, with_payload=True)
+    return {p.payload["source_url"] for p in points}
+
+
+def test_only_404_pages_leave_the_live_index(site, tmp_path):
+    client = QdrantClient(":memory:")
+    client.create_collection(COLLECTION_NAME, vectors_config=VectorParams(size=FakeEmbedder().dim, distance=Distance.COSINE))
+    links = "".join(f'<a href="/p{i}.html">x</a>' for i in (1, 2, 3))
+    site.page("/index.html", f"<html><body><h1>SCERT</h1>{links}</body></html>")
+    for i in (1, 2, 3):
+        site.page(f"/p{i}.html", f"<html><body><p>परिपत्रक {i}</p></body></html>")
+    stream(site, tmp_path, client)
+    assert indexed_urls(client) == {site.url(p) for p in ("/index.html", "/p1.html", "/p2.html", "/p3.html")}
+
+    del site.pages["/p3.html"]   # 404: deleted
+    site.page("/index.html", '<html><body><h1>SCERT</h1><a href="/p1.html">x</a><a href="/p3.html">x</a></body></html>')
+    sink = stream(site, tmp_path, client)   # p2 is only unlinked: kept, listed
+    assert sink.stats["removed"] == 1
+    assert len(sink.unseen) == 1
+    assert indexed_urls(client) == {site.url(p) for p in ("/index.html", "/p1.html", "/p2.html")}
@@ -0,0 +1,53 @@
+import re
+from src.tracing import PrometheusSink, Tracer, annotate, span
+
+# name{labels} value, as Prometheus' text format expects
+SAMPLE = re.compile(r'^[a-z_]+(\{[a-z]+="[^"]*"(,[a-z]+="[^"]*")*\})? [0-9.e+-]+$')
+
+
+def record(total_ms, cache="miss", **attrs):
+    return {"spans_ms": {"embed": total_ms / 4, "total": total_ms, "unknown": 1.0}, "cache": cache, **attrs}
+
+
+def test_render_is_valid_prometheus_text():
+    sink = PrometheusSink()
+    for ms in range(1, 101):
+        sink.emit(record(ms, prompt_tokens=ms * 10, answer_tokens=ms))
+    sink.emit(record(5, cache="hit"))
+    text = sink.render()
+
+    assert text.endswith("\n")
+    for line in text.splitlines():
+        assert line.startswith("# TYPE ") or SAMPLE.match(line), line
+    assert 'rag_requests_total{cache="hit"} 1' in text
+    assert 'rag_requests_total{cache="miss"} 100' in text
+    assert 'rag_span_seconds_count{span="total"} 101' in text
+    assert 'rag_span_seconds{span="total",quantile="0.5"} 0.05' in text
+    assert 'rag_tokens{kind="prompt",quantile="0.95"}' in text
+    assert 'span="unknown"' not in text
+    assert 'span="llm"' not in text  # no samples yet
+
+
+def test_empty_sink_renders_type_lines_only():
+    text = PrometheusSink().render()
+    assert all(line.startswith("# TYPE ") for line in text.splitlines())
+
+
+def test_rolling_window_drops_old_samples():
+    sink = PrometheusSink(window=10)
+    for ms in [1000] * 10 + [10] * 10:
+        sink.emit(record(ms))
+    assert sink.summary()["total"] == {"count": 10, "p50_ms": 10.0, "p95_ms": 10.0}
+
+
+def test_tracer_feeds_spans_and_attributes_to_metrics():
+    tracer = Tracer()
+    with tracer.request("प्रश्न"):
+        with span("embed"):
+            pass
+        annotate(cache="hit", prompt_tokens=12)
+    assert tracer.last()["cache"] == "hit"
+    assert set(tracer.last()["spans_ms"]) == {"embed", "total"}
+    text = tracer.metrics.render()
+    assert 'rag_requests_total{cache="hit"} 1' in text
+    assert 'rag_tokens{kind="prompt",quantile="0.5"} 12' in text